@@ -6,6 +6,10 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # Fork the batch/report parse workers first, while this is the only thread
+    from app.batch_merge import start_parse_pool
+    start_parse_pool()
+    
     # Register blueprints
     from app.routes import main_bp
     from app.auth_routes import auth_bp
@@ -21,4 +25,16 @@ def create_app():
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(report_bp)
     
+    # Track/reap leaked Chrome processes (no-op without psutil)
+    from app.crawlers.watchdog import browser_watchdog
+    browser_watchdog.start()
+    
+    # Automatic database backups / retention (auto_backup, backup_retention_days settings)
+    from app.backup import backup_manager
+    backup_manager.start()
+    
+    # Move old download logs into per-year archive databases (LOG_ARCHIVE_AFTER_DAYS)
+    from app.log_archive import log_archiver
+    log_archiver.start()
+    
     return app
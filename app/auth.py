@@ -4,94 +4,66 @@ Authentication and User Management Module
 from functools import wraps
 from flask import session, redirect, url_for, flash, request
 from werkzeug.security import generate_password_hash, check_password_hash
-import sqlite3
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from app.config import Config
+from app.db_pool import create_pool
+from app.migrations import run_migrations
+from app.migrations.users_db import MIGRATIONS as USERS_MIGRATIONS
+from app.migrations.users_pg import MIGRATIONS as USERS_PG_MIGRATIONS
 
 class AuthManager:
     """Manages authentication and user operations"""
     
-    def __init__(self, db_path='users.db'):
+    def __init__(self, db_path='users.db', settings_ttl=None):
         """Initialize auth manager with database path"""
-        self.db_path = db_path
+        self.pool = create_pool(db_path, schema='auth')  # users.db or postgresql:// URL
+        self.db_path = self.pool.db_path
+        # Settings cache: key -> row dict; refreshed after settings_ttl seconds
+        # (picks up edits made by other processes), written through on update.
+        # settings_ttl=0 re-reads on every call, float('inf') never re-reads
+        self.settings_ttl = Config.SETTINGS_CACHE_TTL if settings_ttl is None else settings_ttl
+        self._settings = None
+        self._settings_loaded_at = 0.0
+        self._settings_lock = threading.Lock()
         self._init_db()
+    
+    @contextmanager
+    def get_connection(self):
+        """Pooled connection to users.db (see app.db_pool)"""
+        with self.pool.connection() as conn:
+            yield conn
         
     def _init_db(self):
-        """Initialize users database and create default admin"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                email TEXT,
-                full_name TEXT,
-                role TEXT DEFAULT 'user',
-                is_active INTEGER DEFAULT 1,
-                created_at TEXT NOT NULL,
-                last_login TEXT
-            )
-        ''')
-        
-        # Create settings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS app_settings (
-                key TEXT PRIMARY KEY,
-                value TEXT,
-                description TEXT,
-                updated_at TEXT NOT NULL,
-                updated_by TEXT
-            )
-        ''')
-        
-        # Check if admin exists
-        cursor.execute("SELECT COUNT(*) FROM users WHERE username = 'admin'")
-        if cursor.fetchone()[0] == 0:
-            # Create default admin user
-            admin_hash = generate_password_hash('admin123')
-            cursor.execute('''
-                INSERT INTO users (username, password_hash, email, full_name, role, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', ('admin', admin_hash, 'admin@bps.go.id', 'Administrator', 'admin', datetime.now().isoformat()))
-            print("✓ Default admin user created (username: admin, password: admin123)")
-        
-        # Initialize default settings
-        default_settings = [
-            ('app_name', 'BPS Web Crawler System', 'Application name'),
-            ('maintenance_mode', 'false', 'Enable/disable maintenance mode'),
-            ('max_concurrent_jobs', '3', 'Maximum concurrent crawler jobs'),
-            ('session_timeout', '3600', 'Session timeout in seconds'),
-            ('enable_notifications', 'true', 'Enable email notifications'),
-            ('notification_email', 'admin@bps.go.id', 'Notification recipient email'),
-            ('auto_backup', 'true', 'Enable automatic database backup'),
-            ('backup_retention_days', '30', 'Days to keep backup files'),
-        ]
-        
-        for key, value, description in default_settings:
-            cursor.execute('''
-                INSERT OR IGNORE INTO app_settings (key, value, description, updated_at)
-                VALUES (?, ?, ?, ?)
-            ''', (key, value, description, datetime.now().isoformat()))
-        
-        conn.commit()
-        conn.close()
+        """Initialize users database (pending migrations) and create default admin"""
+        with self.get_connection() as conn:
+            migrations = USERS_MIGRATIONS if self.pool.dialect == 'sqlite' else USERS_PG_MIGRATIONS
+            run_migrations(conn, migrations, self.db_path)
+            cursor = conn.cursor()
+            
+            # Check if admin exists
+            cursor.execute("SELECT COUNT(*) FROM users WHERE username = 'admin'")
+            if cursor.fetchone()[0] == 0:
+                # Create default admin user
+                admin_hash = generate_password_hash('admin123')
+                cursor.execute('''
+                    INSERT INTO users (username, password_hash, email, full_name, role, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', ('admin', admin_hash, 'admin@bps.go.id', 'Administrator', 'admin', datetime.now().isoformat()))
+                print("✓ Default admin user created (username: admin, password: admin123)")
     
     def verify_user(self, username, password):
         """Verify user credentials"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM users 
-            WHERE username = ? AND is_active = 1
-        ''', (username,))
-        
-        user = cursor.fetchone()
-        conn.close()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM users 
+                WHERE username = ? AND is_active = 1
+            ''', (username,))
+            user = cursor.fetchone()
         
         if user and check_password_hash(user['password_hash'], password):
             return dict(user)
@@ -99,70 +71,50 @@ class AuthManager:
     
     def update_last_login(self, username):
         """Update user's last login timestamp"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE users 
-            SET last_login = ? 
-            WHERE username = ?
-        ''', (datetime.now().isoformat(), username))
-        
-        conn.commit()
-        conn.close()
+        with self.get_connection() as conn:
+            conn.execute('''
+                UPDATE users 
+                SET last_login = ? 
+                WHERE username = ?
+            ''', (datetime.now().isoformat(), username))
     
     def get_all_users(self):
         """Get all users (without password hashes)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, username, email, full_name, role, is_active, 
-                   created_at, last_login
-            FROM users
-            ORDER BY created_at DESC
-        ''')
-        
-        users = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return users
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, username, email, full_name, role, is_active, 
+                       created_at, last_login
+                FROM users
+                ORDER BY created_at DESC
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
     
     def get_user_by_id(self, user_id):
         """Get user by ID"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, username, email, full_name, role, is_active, 
-                   created_at, last_login
-            FROM users
-            WHERE id = ?
-        ''', (user_id,))
-        
-        user = cursor.fetchone()
-        conn.close()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, username, email, full_name, role, is_active, 
+                       created_at, last_login
+                FROM users
+                WHERE id = ?
+            ''', (user_id,))
+            user = cursor.fetchone()
         return dict(user) if user else None
     
     def create_user(self, username, password, email=None, full_name=None, role='user'):
         """Create new user"""
+        password_hash = generate_password_hash(password)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            password_hash = generate_password_hash(password)
-            
-            cursor.execute('''
-                INSERT INTO users (username, password_hash, email, full_name, role, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (username, password_hash, email, full_name, role, datetime.now().isoformat()))
-            
-            user_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            return user_id
-        except sqlite3.IntegrityError:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO users (username, password_hash, email, full_name, role, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (username, password_hash, email, full_name, role, datetime.now().isoformat()))
+                return cursor.lastrowid
+        except self.pool.IntegrityError:
             return None
     
     def update_user(self, user_id, **kwargs):
@@ -182,76 +134,91 @@ class AuthManager:
         values.append(user_id)
         query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(query, values)
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
-        return success
+        with self.get_connection() as conn:
+            return conn.execute(query, values).rowcount > 0
     
     def change_password(self, user_id, new_password):
         """Change user password"""
         password_hash = generate_password_hash(new_password)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE users 
-            SET password_hash = ? 
-            WHERE id = ?
-        ''', (password_hash, user_id))
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
-        return success
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                UPDATE users 
+                SET password_hash = ? 
+                WHERE id = ?
+            ''', (password_hash, user_id))
+            return cursor.rowcount > 0
     
     def delete_user(self, user_id):
         """Delete user (soft delete by setting is_active to 0)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE users SET is_active = 0 WHERE id = ?', (user_id,))
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
-        return success
+        with self.get_connection() as conn:
+            return conn.execute('UPDATE users SET is_active = 0 WHERE id = ?', (user_id,)).rowcount > 0
+    
+    # ==================== SETTINGS (cached) ====================
+    
+    def _cached_settings(self):
+        """Settings cache, loaded with one query and reloaded when older than settings_ttl"""
+        settings = self._settings
+        if settings is not None and time.monotonic() - self._settings_loaded_at < self.settings_ttl:
+            return settings
+        with self._settings_lock:
+            if self._settings is settings:
+                with self.get_connection() as conn:
+                    rows = conn.execute('SELECT * FROM app_settings ORDER BY key').fetchall()
+                self._settings = {row['key']: dict(row) for row in rows}
+                self._settings_loaded_at = time.monotonic()
+            return self._settings
+    
+    def invalidate_settings(self):
+        """Drop the settings cache (next read reloads from users.db)"""
+        with self._settings_lock:
+            self._settings = None
+    
+    def get_setting(self, key, default=None):
+        """Get application setting value (from cache)"""
+        setting = self._cached_settings().get(key)
+        return setting['value'] if setting else default
+    
+    def get_int_setting(self, key, default=0):
+        """Setting as int (default if missing or not a number)"""
+        try:
+            return int(self.get_setting(key))
+        except (TypeError, ValueError):
+            return default
     
-    def get_setting(self, key):
-        """Get application setting value"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT value FROM app_settings WHERE key = ?', (key,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
+    def get_bool_setting(self, key, default=False):
+        """Setting as bool ('true'/'1'/'yes'/'on')"""
+        value = self.get_setting(key)
+        if value is None:
+            return default
+        return str(value).strip().lower() in ('true', '1', 'yes', 'on')
     
     def get_all_settings(self):
         """Get all application settings"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM app_settings ORDER BY key')
-        settings = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return settings
+        return [dict(setting) for setting in self._cached_settings().values()]
     
     def update_setting(self, key, value, updated_by=None):
-        """Update application setting"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE app_settings 
-            SET value = ?, updated_at = ?, updated_by = ?
-            WHERE key = ?
-        ''', (value, datetime.now().isoformat(), updated_by, key))
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
+        """Update application setting (write-through to the cache)"""
+        updated_at = datetime.now().isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                UPDATE app_settings 
+                SET value = ?, updated_at = ?, updated_by = ?
+                WHERE key = ?
+            ''', (value, updated_at, updated_by, key))
+            success = cursor.rowcount > 0
+        
+        if success:
+            with self._settings_lock:
+                if self._settings is not None and key in self._settings:
+                    settings = dict(self._settings)
+                    settings[key] = dict(settings[key], value=value, updated_at=updated_at, updated_by=updated_by)
+                    self._settings = settings
         return success
 
 
 # Global auth manager instance
-auth_manager = AuthManager()
+auth_manager = AuthManager(Config.DATABASE_URL or 'users.db')
 
 
 def login_required(f):
@@ -0,0 +1,279 @@
+"""
+Database Backup - online backup via the sqlite3 backup API, compression, retention and catalog
+"""
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from app.config import Config
+from app.database import db
+
+# Backups written by the old shutil.copy2 implementation (pruned by mtime)
+LEGACY_BACKUP_NAME = re.compile(r'^(crawler|users)_\d{8}_\d{6}\.db$')
+
+
+class BackupRestarted(Exception):
+    """The source database kept changing during a paged backup"""
+
+
+class BackupManager:
+    """
+    Backup online crawler.db, users.db dan arsip download log per tahun.
+
+    - `sqlite3.Connection.backup` per `pages` halaman dengan jeda `sleep`, jadi
+      scheduler tetap bisa menulis selama backup berjalan (tidak ada file torn)
+    - Opsional gzip (`BACKUP_COMPRESS`)
+    - Setting `auto_backup` / `backup_retention_days` (users.db) mengatur
+      backup otomatis setiap `BACKUP_INTERVAL_HOURS` dan penghapusan backup lama
+    - Setiap file dicatat di tabel `backup_catalog` (ukuran, durasi, status)
+    """
+
+    # A paged backup restarts when another connection writes to the source;
+    # after this many restarts the rest is copied in one step (a WAL read
+    # snapshot, which still does not block writers)
+    MAX_RESTARTS = 3
+
+    def __init__(self, backup_dir=None, databases=None, compress=None, pages=None, sleep=None,
+                 interval_hours=None, settings=None, database=None):
+        self.db = database or db  # holds backup_catalog
+        self.backup_dir = backup_dir or Config.BACKUP_PATH
+        self._databases = databases
+        self.compress = Config.BACKUP_COMPRESS if compress is None else compress
+        self.pages = pages or Config.BACKUP_PAGES_PER_STEP
+        self.sleep = Config.BACKUP_STEP_SLEEP if sleep is None else sleep
+        self.interval_hours = interval_hours or Config.BACKUP_INTERVAL_HOURS
+        self._settings = settings
+        self._run_lock = threading.Lock()  # one backup run at a time
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ==================== CONFIGURATION ====================
+
+    @property
+    def databases(self):
+        """
+        name -> absolute path, taken from the live Database/AuthManager instances,
+        plus every download log archive (download_logs_<year>.db) of crawler.db
+        """
+        if self._databases is not None:
+            databases = dict(self._databases)
+        else:
+            from app.auth import auth_manager
+            # PostgreSQL databases are backed up with pg_dump, not here
+            databases = {}
+            if self.db.pool.dialect == 'sqlite':
+                databases['crawler'] = os.path.abspath(self.db.db_path)
+            if auth_manager.pool.dialect == 'sqlite':
+                databases['users'] = os.path.abspath(auth_manager.db_path)
+        if self.db.pool.dialect == 'sqlite':
+            for archive in self.db.list_log_archives():
+                databases[f"download_logs_{archive['year']}"] = os.path.abspath(archive['path'])
+        return databases
+
+    def _setting(self, key):
+        if self._settings is not None:
+            return self._settings.get(key)
+        from app.auth import auth_manager
+        return auth_manager.get_setting(key)
+
+    @property
+    def auto_backup_enabled(self):
+        return str(self._setting('auto_backup') or 'false').lower() == 'true'
+
+    @property
+    def retention_days(self):
+        try:
+            return int(self._setting('backup_retention_days') or 0)
+        except ValueError:
+            return 0
+
+    # ==================== BACKUP ====================
+
+    def backup_database(self, name, source_path, run_id):
+        """
+        Online backup of one database file into backup_dir
+
+        Returns:
+            dict: Catalog fields (file_path, size_bytes, duration_seconds, ...)
+        """
+        started = time.monotonic()
+        target = os.path.join(self.backup_dir, f'{name}_{run_id}.db')
+        partial = target + '.partial'
+        record = {
+            'db_name': name,
+            'source_path': source_path,
+            'compressed': self.compress,
+            'source_bytes': os.path.getsize(source_path),
+            'restarts': 0,
+        }
+        progress_state = {'remaining': None, 'total': 0}
+
+        def progress(status, remaining, total):
+            previous = progress_state['remaining']
+            if previous is not None and remaining > previous:
+                record['restarts'] += 1
+                if record['restarts'] > self.MAX_RESTARTS:
+                    raise BackupRestarted(f'{name} changed {record["restarts"]} times during backup')
+            progress_state['remaining'] = remaining
+            progress_state['total'] = total
+
+        source = sqlite3.connect(source_path)
+        try:
+            dest = sqlite3.connect(partial)
+            try:
+                try:
+                    source.backup(dest, pages=self.pages, progress=progress, sleep=self.sleep)
+                except BackupRestarted as e:
+                    logging.warning(f"⚠️ {e}, copying in one step")
+                    source.backup(dest, pages=-1)
+            finally:
+                dest.close()
+        except Exception:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        finally:
+            source.close()
+
+        if self.compress:
+            target += '.gz'
+            with open(partial, 'rb') as src, gzip.open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.remove(partial)
+        else:
+            os.replace(partial, target)
+
+        record.update({
+            'file_path': target,
+            'size_bytes': os.path.getsize(target),
+            'pages': progress_state['total'],
+            'duration_seconds': time.monotonic() - started,
+        })
+        return record
+
+    def run_backup(self, trigger='manual'):
+        """
+        Back up every database and record the results in backup_catalog
+
+        Returns:
+            list: One catalog dict per database (status success/failed)
+        """
+        with self._run_lock:
+            run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+            os.makedirs(self.backup_dir, exist_ok=True)
+            results = []
+            for name, path in self.databases.items():
+                if not os.path.exists(path):
+                    continue
+                try:
+                    record = self.backup_database(name, path, run_id)
+                    record['status'] = 'success'
+                    logging.info(
+                        f"💾 Backup {name}: {record['file_path']} "
+                        f"({record['size_bytes'] / 1024 / 1024:.1f} MB, {record['duration_seconds']:.1f}s)"
+                    )
+                except Exception as e:
+                    record = {'db_name': name, 'source_path': path, 'status': 'failed', 'error': str(e)}
+                    logging.error(f"❌ Backup {name} failed: {str(e)}")
+                record['id'] = self.db.add_backup_record(run_id=run_id, trigger=trigger, **record)
+                record['run_id'] = run_id
+                results.append(record)
+            return results
+
+    # ==================== RETENTION ====================
+
+    def prune(self, retention_days=None):
+        """
+        Delete backups older than retention_days (backup_retention_days setting; 0 = keep all)
+
+        Returns:
+            int: Number of backup files deleted
+        """
+        days = self.retention_days if retention_days is None else retention_days
+        if days <= 0:
+            return 0
+        cutoff = datetime.now() - timedelta(days=days)
+        deleted = 0
+
+        for entry in self.db.get_backups_before(cutoff):
+            path = entry.get('file_path')
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                    deleted += 1
+                except OSError as e:
+                    logging.warning(f"⚠️ Could not delete backup {path}: {str(e)}")
+                    continue
+            self.db.mark_backup_pruned(entry['id'])
+
+        if os.path.isdir(self.backup_dir):
+            for filename in os.listdir(self.backup_dir):
+                path = os.path.join(self.backup_dir, filename)
+                if LEGACY_BACKUP_NAME.match(filename) and os.path.getmtime(path) < cutoff.timestamp():
+                    os.remove(path)
+                    deleted += 1
+
+        if deleted:
+            logging.info(f"🧹 Pruned {deleted} backups older than {days} days")
+        return deleted
+
+    # ==================== AUTOMATIC BACKUPS ====================
+
+    def backup_due(self):
+        """True when auto_backup is on and the last successful backup is older than the interval"""
+        if not self.auto_backup_enabled:
+            return False
+        latest = self.db.list_backups(limit=1, status='success')
+        if not latest:
+            return True
+        last = datetime.strptime(latest[0]['created_at'], '%Y-%m-%d %H:%M:%S')
+        return datetime.now() - last >= timedelta(hours=self.interval_hours)
+
+    def start(self, check_interval=600):
+        """
+        Start the background thread for automatic backups and retention (idempotent)
+        
+        The first check runs one check_interval after start, so restarting the app
+        (or creating an app in tests) never writes a backup right away
+        """
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, args=(check_interval,), name='db-backup', daemon=True
+            )
+            self._thread.start()
+        logging.info("💾 Backup scheduler started")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self, check_interval):
+        while not self._stop.wait(check_interval):
+            try:
+                if self.backup_due():
+                    self.run_backup(trigger='auto')
+                self.prune()
+            except Exception as e:
+                logging.error(f"Backup scheduler error: {str(e)}")
+
+    def get_stats(self):
+        latest = self.db.list_backups(limit=1, status='success')
+        return {
+            'auto_backup': self.auto_backup_enabled,
+            'retention_days': self.retention_days,
+            'backup_dir': self.backup_dir,
+            'compress': self.compress,
+            'last_backup_at': latest[0]['created_at'] if latest else None,
+        }
+
+
+# Global backup manager instance
+backup_manager = BackupManager()
@@ -0,0 +1,556 @@
+"""
+Batch Merge - gabungkan file hasil download per log secara streaming (satu file/chunk di memori)
+
+Setiap file dibaca satu per satu (CSV per BATCH_CSV_CHUNK_ROWS baris), disejajarkan
+dengan header file pertama, lalu langsung ditulis ke output (CSV, Parquet row group,
+atau XLSX write-only) sehingga memori dibatasi oleh file/chunk terbesar, bukan total data.
+Parsing bisa dijalankan paralel di process pool (BATCH_PARSE_WORKERS); urutan log tetap.
+Pool dibuat sekali saat startup (start_parse_pool di create_app), sebelum thread lain berjalan.
+"""
+import itertools
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.config import Config
+from app.parse_cache import parse_cache
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xltx', '.xltm', '.xls')
+EXCEL_MAX_ROWS = 1048576  # rows per sheet including the header
+
+# BATCH_PARSE_WORKERS=0: one worker per CPU, at most this many
+DEFAULT_MAX_PARSE_WORKERS = 4
+
+# Formats a new batch version can be built from the previous one by appending
+INCREMENTAL_FORMATS = ('csv', 'parquet')
+
+MIMETYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class MergeError(Exception):
+    """Output cannot be created (missing dependency, unsupported format)"""
+
+
+def resolve_log_path(filename):
+    """nama_file of a download log -> absolute path (relative names live in DOWNLOAD_PATH)"""
+    return filename if os.path.isabs(filename) else os.path.join(Config.DOWNLOAD_PATH, filename)
+
+
+def read_excel(filepath):
+    import pandas as pd
+
+    # Prefer openpyxl for xlsx
+    engine = 'openpyxl' if not filepath.lower().endswith('.xls') else None
+    return pd.read_excel(filepath, engine=engine)
+
+
+def is_excel(filepath):
+    return os.path.splitext(filepath)[1].lower() in EXCEL_EXTENSIONS
+
+
+def iter_table_chunks(filepath, chunk_rows=None, digest=None):
+    """
+    Yield DataFrames of a CSV (chunk_rows rows each) or Excel file (whole sheet).
+
+    Excel files go through the parse cache, so an unchanged file is parsed once
+    (digest: its fingerprint, when the caller already computed it).
+    """
+    import pandas as pd
+
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == '.csv':
+        yield from pd.read_csv(filepath, chunksize=chunk_rows or Config.BATCH_CSV_CHUNK_ROWS)
+    elif ext in EXCEL_EXTENSIONS:
+        yield parse_cache.load(filepath, read_excel, digest=digest)
+    else:
+        raise ValueError(f"Format file tidak didukung: {ext} ({os.path.basename(filepath)})")
+
+
+def parse_file(filepath, chunk_rows=None, digest=None):
+    """
+    Parse one file in a worker process -> (frames, seconds, parse cache counters of this call)
+
+    The counters are added to the parent's parse_cache stats, which the worker's
+    own copy would otherwise keep to itself.
+    """
+    start = time.perf_counter()
+    before = parse_cache.counters()
+    frames = list(iter_table_chunks(filepath, chunk_rows, digest))
+    after = parse_cache.counters()
+    return frames, time.perf_counter() - start, {key: after[key] - before[key] for key in after}
+
+
+class ParsedFile:
+    """Frames of one input file, iterated once; `seconds` is its parse time"""
+
+    def __init__(self, filepath, chunk_rows=None, future=None, frames=None, digest=None, seconds=0.0):
+        self.filepath = filepath
+        self.chunk_rows = chunk_rows
+        self.future = future
+        self.frames = frames
+        self.digest = digest
+        self.seconds = seconds
+
+    def __iter__(self):
+        future, self.future = self.future, None
+        frames, self.frames = self.frames, None
+        if future is not None:
+            try:
+                frames, self.seconds, counters = future.result()  # worker exceptions are re-raised here
+                parse_cache.add_counters(counters)
+            except BrokenProcessPool:
+                _discard_broken_pool()
+                frames = None  # parse it here instead
+        if frames is not None:
+            while frames:
+                yield frames.pop(0)  # drop each chunk once it is written
+            return
+        # In-process: time only the parsing, not the consumer
+        chunks = iter_table_chunks(self.filepath, self.chunk_rows, self.digest)
+        while True:
+            start = time.perf_counter()
+            df = next(chunks, None)
+            self.seconds += time.perf_counter() - start
+            if df is None:
+                return
+            yield df
+
+
+def parse_workers(workers=None):
+    """BATCH_PARSE_WORKERS; 0 = one per CPU (max DEFAULT_MAX_PARSE_WORKERS) where processes can fork, else in-process"""
+    workers = Config.BATCH_PARSE_WORKERS if workers is None else workers
+    if workers <= 0:
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            return 1
+        workers = min(os.cpu_count() or 1, DEFAULT_MAX_PARSE_WORKERS)
+    return workers
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def start_parse_pool(workers=None):
+    """
+    Create the shared parse pool (once per process) and fork its workers now.
+
+    Call at startup before other threads run: a process forked while another
+    thread holds a lock (logging, parse_cache) would inherit it locked. Workers
+    are forked immediately and reused by every batch/report; iter_parsed never
+    creates processes. Returns the executor, or None for in-process parsing.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+        workers = parse_workers(workers)
+        if workers <= 1:
+            return None
+        # fork: the app's entry script (run.py calls create_app()) is not re-imported in workers
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+            executor.submit(os.getpid).result()  # forks every worker now, not on the first request
+        except (OSError, ValueError, NotImplementedError, BrokenProcessPool) as e:
+            logging.warning(f"⚠️ Batch merge: process pool tidak tersedia ({str(e)}), parsing serial")
+            return None
+        _pool, _pool_workers = executor, workers
+        logging.info(f"📦 Batch merge: process pool {workers} worker")
+        return executor
+
+
+def stop_parse_pool():
+    """Shut the shared parse pool down (tests, shutdown)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        executor, _pool, _pool_workers = _pool, None, 0
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _discard_broken_pool():
+    """A worker died: parse in-process from now on (a new pool would fork from a threaded process)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        executor, _pool, _pool_workers = _pool, None, 0
+    if executor is not None:
+        logging.error("❌ Batch merge: process pool rusak (worker berhenti), parsing serial sampai restart")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _dispatch(executor, filepath, chunk_rows):
+    """
+    ParsedFile for `filepath` from the pool
+
+    The parse cache is consulted here first: a hit is read in this process (no
+    worker round trip) and a miss is sent with the fingerprint, so the
+    fingerprint memo and hit/miss stats live in this process.
+    """
+    digest = None
+    if is_excel(filepath) and parse_cache.enabled:
+        start = time.perf_counter()
+        try:
+            digest = parse_cache.fingerprint(filepath)
+            df = parse_cache.lookup(filepath, digest)
+        except OSError:
+            df = None  # the worker reports the unreadable file
+        if df is not None:
+            return ParsedFile(filepath, chunk_rows, frames=[df], seconds=time.perf_counter() - start)
+    try:
+        future = executor.submit(parse_file, filepath, chunk_rows, digest)
+    except BrokenProcessPool:
+        _discard_broken_pool()
+        future = None  # parsed in-process
+    return ParsedFile(filepath, chunk_rows, future=future, digest=digest)
+
+
+def active_workers(workers=None, files=None):
+    """Workers a merge of `files` files actually uses: requested, capped by the started pool (1 = in-process)"""
+    workers = min(parse_workers(workers), _pool_workers if _pool is not None else 1)
+    if files is not None:
+        workers = min(workers, files)
+    return max(workers, 1)
+
+
+def iter_parsed(filepaths, workers=None, chunk_rows=None):
+    """
+    Yield a ParsedFile per path, in order.
+
+    With more than one worker the files are parsed in the shared pool
+    (start_parse_pool), at most 2 x workers files ahead of the consumer (bounded
+    memory); otherwise, or when no pool was started, they are read lazily in
+    this process (CSV chunk by chunk).
+    """
+    filepaths = list(filepaths)
+    executor = _pool
+    workers = active_workers(workers, len(filepaths))
+    if executor is None or workers <= 1:
+        for filepath in filepaths:
+            yield ParsedFile(filepath, chunk_rows)
+        return
+
+    remaining = iter(filepaths)
+    pending = deque(
+        _dispatch(executor, path, chunk_rows)
+        for path in itertools.islice(remaining, workers * 2)
+    )
+    try:
+        while pending:
+            parsed = pending.popleft()
+            following = next(remaining, None)
+            if following is not None:
+                pending.append(_dispatch(executor, following, chunk_rows))
+            yield parsed
+    finally:
+        for parsed in pending:
+            if parsed.future is not None:
+                parsed.future.cancel()  # the pool is shared: only drop this merge's queued files
+
+
+# ==================== OUTPUT WRITERS ====================
+
+class CsvWriter:
+    """Append chunks to one CSV file (header + BOM written once; append=True extends an existing file)"""
+
+    def __init__(self, path, append=False):
+        self.path = path
+        if append:
+            self._file = open(path, 'a', encoding='utf-8', newline='')
+        else:
+            self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._header = not append
+
+    def write(self, df):
+        df.to_csv(self._file, index=False, header=self._header)
+        self._header = False
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    One Parquet row group per chunk; the schema comes from the first chunk.
+
+    Integer columns are stored as float64 (later files may have gaps) and object
+    columns as string; values that do not fit a column's type become null.
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise MergeError(f"pyarrow diperlukan untuk output Parquet: {e}")
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.schema = None
+        self._writer = None
+
+    def _schema_for(self, df):
+        pa = self.pa
+        fields = []
+        for field in pa.Schema.from_pandas(df, preserve_index=False):
+            if pa.types.is_integer(field.type):
+                field = field.with_type(pa.float64())
+            elif pa.types.is_null(field.type) or pa.types.is_large_string(field.type):
+                field = field.with_type(pa.string())
+            fields.append(field)
+        return pa.schema(fields)
+
+    def _coerce(self, df):
+        import pandas as pd
+
+        pa = self.pa
+        df = df.copy()
+        for field in self.schema:
+            column = df[field.name]
+            if pa.types.is_string(field.type):
+                df[field.name] = column.where(column.isna(), column.astype(str))
+            elif pa.types.is_floating(field.type):
+                converted = pd.to_numeric(column, errors='coerce')
+                lost = int(converted.isna().sum() - column.isna().sum())
+                if lost:
+                    logging.warning(f"⚠️ Parquet batch: {lost} nilai non-numerik di kolom '{field.name}' menjadi null")
+                df[field.name] = converted
+            elif pa.types.is_timestamp(field.type):
+                df[field.name] = pd.to_datetime(column, errors='coerce')
+        return df
+
+    def copy_from(self, path):
+        """Start with every row group of an existing batch file (its schema is kept)"""
+        source = self.pq.ParquetFile(path)
+        self.schema = source.schema_arrow
+        self._writer = self.pq.ParquetWriter(self.path, self.schema)
+        for i in range(source.num_row_groups):
+            self._writer.write_table(source.read_row_group(i))  # one row group in memory at a time
+
+    def write(self, df):
+        pa = self.pa
+        if self._writer is None:
+            self.schema = self._schema_for(df)
+            self._writer = self.pq.ParquetWriter(self.path, self.schema)
+        table = pa.Table.from_pandas(self._coerce(df), schema=self.schema, preserve_index=False, safe=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class XlsxWriter:
+    """openpyxl write-only workbook: rows are streamed, a new sheet every EXCEL_MAX_ROWS"""
+
+    def __init__(self, path, sheet_name='BatchLog'):
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:
+            raise MergeError(f"openpyxl diperlukan untuk output XLSX: {e}")
+        self.path = path
+        self.sheet_name = sheet_name
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheets = 0
+        self._rows = 0
+        self._columns = None
+
+    def _new_sheet(self):
+        self._sheets += 1
+        title = self.sheet_name if self._sheets == 1 else f'{self.sheet_name}_{self._sheets}'
+        self._sheet = self._workbook.create_sheet(title)
+        self._sheet.append(self._columns)
+        self._rows = 1
+
+    def write(self, df):
+        if self._columns is None:
+            self._columns = [str(c) for c in df.columns]
+        df = df.astype(object).where(df.notna(), None)
+        for row in df.itertuples(index=False, name=None):
+            if self._sheet is None or self._rows >= EXCEL_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._rows += 1
+
+    def close(self):
+        if self._sheet is None:
+            self._workbook.create_sheet(self.sheet_name)  # a workbook needs one sheet
+        self._workbook.save(self.path)
+
+
+class PreviewWriter:
+    """Keep only the first `limit` rows (for the batch preview)"""
+
+    def __init__(self, limit=50):
+        self.limit = limit
+        self.frames = []
+        self._kept = 0
+
+    def write(self, df):
+        if self._kept < self.limit:
+            head = df.head(self.limit - self._kept)
+            self.frames.append(head)
+            self._kept += len(head)
+
+    def rows(self):
+        import pandas as pd
+
+        if not self.frames:
+            return []
+        return pd.concat(self.frames, ignore_index=True).astype(str).values.tolist()
+
+    def close(self):
+        pass
+
+
+WRITERS = {
+    'csv': CsvWriter,
+    'xlsx': XlsxWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def open_writer(output_format, path):
+    writer_class = WRITERS.get(output_format)
+    if writer_class is None:
+        raise MergeError(f"Format output tidak didukung: {output_format}")
+    return writer_class(path)
+
+
+# ==================== MERGE ====================
+
+def merge_logs(logs, writer, chunk_rows=None, workers=None, headers=None):
+    """
+    Stream every log's file into `writer`.
+
+    Columns follow the first readable file, or `headers` (missing columns added
+    empty, extras dropped), plus data_tanggal and source_file from the log. Missing
+    or unreadable files are skipped; a CSV that fails after some chunks were written
+    keeps those rows and is reported in `partial` with its row count. Returns
+    {'columns', 'total_rows', 'files', 'merged_logs', 'skipped', 'partial',
+    'parse_times', 'parse_seconds', 'workers'}; the caller closes the writer.
+    """
+    headers = list(headers) if headers else None
+    columns = None
+    total_rows = 0
+    files = 0
+    merged_logs = []
+    skipped = []
+    partial = []
+    parse_times = []
+
+    readable = []
+    for log in logs:
+        filepath = resolve_log_path(log['nama_file'])
+        if os.path.exists(filepath):
+            readable.append((log, filepath))
+        else:
+            skipped.append({'file': log['nama_file'], 'reason': 'File tidak ditemukan'})
+    workers = active_workers(workers, len(readable))
+
+    parsed_files = iter_parsed([filepath for _, filepath in readable], workers, chunk_rows)
+    try:
+        for (log, filepath), parsed in zip(readable, parsed_files):
+            filename = log['nama_file']
+            data_tanggal = log.get('data_tanggal') or log.get('tanggal_download')
+            rows_before = total_rows
+            try:
+                for df in parsed:
+                    if headers is None:
+                        headers = list(df.columns)
+                    else:
+                        # Align columns; add missing, drop extras
+                        df = df.reindex(columns=headers)
+                    df['data_tanggal'] = data_tanggal
+                    df['source_file'] = filename
+                    if columns is None:
+                        columns = list(df.columns)
+                    writer.write(df)
+                    total_rows += len(df)
+            except Exception as e:
+                written = total_rows - rows_before
+                if not written:
+                    logging.warning(f"⚠️ Batch merge: gagal membaca {filename}: {str(e)}")
+                    skipped.append({'file': filename, 'reason': f"Gagal membaca file: {e}"})
+                    continue
+                # Chunks already written stay in the output: report the file as partial
+                logging.warning(f"⚠️ Batch merge: {filename} hanya terbaca sebagian ({written} baris): {str(e)}")
+                partial.append({'file': filename, 'rows': written, 'reason': f"Gagal membaca sisa file: {e}"})
+            finally:
+                parse_times.append({
+                    'file': filename,
+                    'seconds': round(parsed.seconds, 3),
+                    'rows': total_rows - rows_before,
+                })
+            files += 1
+            merged_logs.append(log)
+    finally:
+        parsed_files.close()  # stop the pool even when the writer fails
+
+    parse_seconds = round(sum(p['seconds'] for p in parse_times), 3)
+    if parse_times:
+        slowest = max(parse_times, key=lambda p: p['seconds'])
+        logging.info(
+            f"📦 Batch merge: {files} file, {total_rows} baris, parse {parse_seconds}s "
+            f"({workers} worker), terlama {slowest['file']} {slowest['seconds']}s"
+        )
+    return {
+        'columns': columns or [],
+        'total_rows': total_rows,
+        'files': files,
+        'merged_logs': merged_logs,
+        'skipped': skipped,
+        'partial': partial,
+        'parse_times': parse_times,
+        'parse_seconds': parse_seconds,
+        'workers': workers,
+    }
+
+
+def merge_logs_to_file(logs, out_path, output_format='csv', chunk_rows=None, workers=None):
+    """merge_logs into a new file; the file is removed when no input file could be read"""
+    writer = open_writer(output_format, out_path)
+    try:
+        result = merge_logs(logs, writer, chunk_rows, workers)
+    finally:
+        writer.close()
+    if not result['files'] and os.path.exists(out_path):
+        os.remove(out_path)
+    return result
+
+
+def extend_batch(parent_path, logs, out_path, output_format, columns, chunk_rows=None, workers=None):
+    """
+    New batch version = previous batch file + rows of `logs` (aligned to its `columns`).
+
+    Only the new logs' files are parsed; the previous file is copied as is (bytes
+    for CSV, row groups for Parquet). The new file is removed when none of the
+    new files could be read.
+    """
+    if output_format not in INCREMENTAL_FORMATS:
+        raise MergeError(f"Batch incremental tidak didukung untuk format {output_format}")
+    if output_format == 'csv':
+        shutil.copyfile(parent_path, out_path)
+        writer = CsvWriter(out_path, append=True)
+    else:
+        writer = ParquetWriter(out_path)
+    try:
+        if output_format == 'parquet':
+            writer.copy_from(parent_path)
+        result = merge_logs(logs, writer, chunk_rows, workers, headers=columns)
+    except Exception:
+        writer.close()
+        os.remove(out_path)
+        raise
+    writer.close()
+    if not result['files'] and os.path.exists(out_path):
+        os.remove(out_path)
+    return result
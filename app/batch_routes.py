@@ -3,38 +3,19 @@ Batching routes for combining logs' downloaded files into a single dataset
 """
 from flask import Blueprint, render_template, request, jsonify, send_file, redirect, url_for
 from io import BytesIO
+import json
 import os
 from datetime import datetime
 
 from app.database import db
 from app.config import Config
 from app.auth import login_required
+from app.batch_merge import (INCREMENTAL_FORMATS, MIMETYPES, MergeError, PreviewWriter, extend_batch,
+                              merge_logs, merge_logs_to_file)
 
 batch_bp = Blueprint('batch', __name__, url_prefix='/batch')
 
 
-def _read_table_file(filepath):
-    """Read CSV/XLSX/XLS into a pandas DataFrame; returns (df, error)"""
-    try:
-        import pandas as pd
-    except Exception as e:
-        return None, f"Pandas tidak terinstall: {e}. Tambahkan ke requirements dan install."
-
-    ext = os.path.splitext(filepath)[1].lower()
-    try:
-        if ext == '.csv':
-            df = pd.read_csv(filepath)
-        elif ext in ('.xlsx', '.xlsm', '.xltx', '.xltm', '.xls'):
-            # Prefer openpyxl for xlsx
-            engine = 'openpyxl' if ext != '.xls' else None
-            df = pd.read_excel(filepath, engine=engine)
-        else:
-            return None, f"Format file tidak didukung: {ext} ({os.path.basename(filepath)})"
-        return df, None
-    except Exception as e:
-        return None, f"Gagal membaca file {os.path.basename(filepath)}: {e}"
-
-
 @batch_bp.route('/')
 @login_required
 def index():
@@ -49,6 +30,13 @@ def list_tasks():
     return jsonify({'success': True, 'tasks': tasks})
 
 
+def _send_parent(parent, output_format):
+    """Send the current version of an incremental batch"""
+    return send_file(parent['file_path'], as_attachment=True,
+                     download_name=os.path.basename(parent['file_path']),
+                     mimetype=MIMETYPES[output_format])
+
+
 @batch_bp.route('/run', methods=['POST'])
 @login_required
 def run_batch():
@@ -57,66 +45,50 @@ def run_batch():
     start_date = payload.get('start_date')
     end_date = payload.get('end_date')
     output_format = (payload.get('format') or 'csv').lower()
+    if output_format not in MIMETYPES:
+        output_format = 'csv'  # default CSV
     preview = bool(payload.get('preview', False))
+    incremental = bool(payload.get('incremental', False)) and not preview
 
     if not task_name:
         return jsonify({'success': False, 'message': 'task_name wajib diisi'}), 400
 
-    logs = db.get_logs_for_task(task_name, start_date, end_date)
+    # Incremental: continue from the latest batch of the same task/range/format
+    parent = None
+    if incremental and output_format in INCREMENTAL_FORMATS:
+        parent = db.get_latest_batch(task_name, start_date, end_date, output_format)
+        if parent and not os.path.exists(parent['file_path']):
+            parent = None
+
+    # Logs already merged into the parent's lineage are left out (batch_logs)
+    covered = [b['id'] for b in db.get_batch_lineage(parent['id'])] if parent else None
+    logs = db.get_logs_for_task(task_name, start_date, end_date, exclude_batches=covered)
+    if parent and not logs:
+        # No new logs: the latest version is current
+        return _send_parent(parent, output_format)
     if not logs:
         return jsonify({'success': False, 'message': 'Tidak ada log untuk kriteria ini'}), 404
 
-    # Load and merge
+    # Files are streamed one at a time into the output (never all in memory)
     try:
         import pandas as pd
     except Exception as e:
         return jsonify({'success': False, 'message': f"Pandas diperlukan: {e}"}), 500
 
-    frames = []
-    headers = None
-    for log in logs:
-        filename = log['nama_file']
-        filepath = filename
-        if not os.path.isabs(filepath):
-            filepath = os.path.join(Config.DOWNLOAD_PATH, filename)
-        if not os.path.exists(filepath):
-            # Skip missing files but record note
-            continue
-
-        df, err = _read_table_file(filepath)
-        if err:
-            # Skip problematic files but keep note
-            continue
-
-        # Normalize headers to first file's headers
-        if headers is None:
-            headers = list(df.columns)
-        else:
-            # Align columns; add missing, drop extras
-            for col in headers:
-                if col not in df.columns:
-                    df[col] = None
-            df = df[headers]
-
-        # Add data_tanggal column from log
-        df['data_tanggal'] = log.get('data_tanggal') or log.get('tanggal_download')
-        # Also add source file if helpful
-        df['source_file'] = filename
-
-        frames.append(df)
-
-    if not frames:
-        return jsonify({'success': False, 'message': 'Semua file hilang/invalid untuk log yang dipilih'}), 404
-
-    combined = pd.concat(frames, ignore_index=True)
-
     if preview:
-        sample = combined.head(50)
+        writer = PreviewWriter(limit=50)
+        result = merge_logs(logs, writer)
+        if not result['files']:
+            return jsonify({'success': False, 'message': 'Semua file hilang/invalid untuk log yang dipilih'}), 404
         return jsonify({
             'success': True,
-            'columns': list(sample.columns),
-            'rows': sample.astype(str).values.tolist(),
-            'total_rows': int(len(combined))
+            'columns': result['columns'],
+            'rows': writer.rows(),
+            'total_rows': result['total_rows'],
+            'skipped': result['skipped'],
+            'partial': result['partial'],
+            'parse_times': result['parse_times'],
+            'parse_seconds': result['parse_seconds']
         })
 
     # Ensure batches directory exists under downloads
@@ -124,30 +96,55 @@ def run_batch():
     os.makedirs(batches_dir, exist_ok=True)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     safe_task = ''.join(c for c in task_name if c.isalnum() or c in ('-','_')).strip('_') or 'task'
-    
-    if output_format == 'xlsx':
-        filename = f"batch_{safe_task}_{timestamp}.xlsx"
-        out_path = os.path.join(batches_dir, filename)
-        with pd.ExcelWriter(out_path, engine='openpyxl') as writer:
-            combined.to_excel(writer, index=False, sheet_name='BatchLog')
-        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    else:
-        # default CSV
-        filename = f"batch_{safe_task}_{timestamp}.csv"
-        out_path = os.path.join(batches_dir, filename)
-        combined.to_csv(out_path, index=False, encoding='utf-8-sig')
-        mimetype = 'text/csv; charset=utf-8'
-
-    # Record batch history
+    version = (parent['version'] or 1) + 1 if parent else 1
+    suffix = f"_v{version}" if parent else ''
+    filename = f"batch_{safe_task}_{timestamp}{suffix}.{output_format}"
+    out_path = os.path.join(batches_dir, filename)
+    mimetype = MIMETYPES[output_format]
+
+    try:
+        if parent:
+            # Only the new logs' files are parsed and appended to a copy of the previous version
+            result = extend_batch(parent['file_path'], logs, out_path, output_format,
+                                  json.loads(parent['columns_json']))
+        else:
+            result = merge_logs_to_file(logs, out_path, output_format)
+    except MergeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+    if not result['files']:
+        if parent:
+            # None of the new files could be read: the latest version is still current
+            return _send_parent(parent, output_format)
+        return jsonify({'success': False, 'message': 'Semua file hilang/invalid untuk log yang dipilih'}), 404
+
+    # Record batch history with lineage; batch_logs lists the logs this version merged
+    # (skipped logs are not covered, so the next increment tries them again)
+    notes = []
+    if result['skipped']:
+        notes.append(f"{len(result['skipped'])} file dilewati: " + ', '.join(s['file'] for s in result['skipped'][:20]))
+    if result['partial']:
+        notes.append(f"{len(result['partial'])} file terbaca sebagian: " +
+                     ', '.join(f"{p['file']} ({p['rows']} baris)" for p in result['partial'][:20]))
+    note = '; '.join(notes) or None
+    log_ids = [log['id'] for log in result['merged_logs']]
+    max_log_id = max(log_ids)
     hist_id = db.add_batch_history(
         task_name=task_name,
         start_date=start_date,
         end_date=end_date,
         output_format=output_format,
-        total_rows=len(combined),
-        columns=list(combined.columns),
+        total_rows=result['total_rows'] + (parent['total_rows'] if parent else 0),
+        columns=result['columns'],
         file_path=out_path,
-        status='success'
+        status='success',
+        note=note,
+        mode='incremental' if parent else 'full',
+        version=version,
+        parent_id=parent['id'] if parent else None,
+        max_log_id=max(max_log_id, parent['max_log_id']) if parent else max_log_id,
+        log_count=len(log_ids) + ((parent['log_count'] or 0) if parent else 0),
+        log_ids=log_ids
     )
 
     # Return file for download
@@ -161,6 +158,16 @@ def history():
     return render_template('batch/history.html', records=records)
 
 
+@batch_bp.route('/history/<int:history_id>/lineage')
+@login_required
+def history_lineage(history_id):
+    """Versions of a batch, from the full batch to this one"""
+    lineage = db.get_batch_lineage(history_id)
+    if not lineage:
+        return jsonify({'success': False, 'message': 'Riwayat tidak ditemukan'}), 404
+    return jsonify({'success': True, 'lineage': lineage})
+
+
 @batch_bp.route('/history/<int:history_id>/download')
 @login_required
 def download_history(history_id):
@@ -171,9 +178,5 @@ def download_history(history_id):
     if not path or not os.path.exists(path):
         return jsonify({'success': False, 'message': 'File tidak ditemukan'}), 404
     filename = os.path.basename(path)
-    # Simple mimetype heuristic
-    if filename.lower().endswith('.xlsx'):
-        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    else:
-        mimetype = 'text/csv; charset=utf-8'
+    mimetype = MIMETYPES.get(os.path.splitext(filename)[1].lower().lstrip('.'), MIMETYPES['csv'])
     return send_file(path, as_attachment=True, download_name=filename, mimetype=mimetype)
@@ -0,0 +1,136 @@
+"""
+Admission Control - tunda peluncuran browser saat host kekurangan resource
+"""
+import logging
+import os
+import time
+from app.config import Config
+from app.crawlers.watchdog import SESSION_SWITCH
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - optional dependency
+    psutil = None
+
+
+class AdmissionDenied(Exception):
+    """Raised when a browser launch stays deferred longer than ADMISSION_MAX_WAIT"""
+    pass
+
+
+class AdmissionController:
+    """
+    Cek free memory, load average dan jumlah Chrome sebelum setup_driver.
+
+    Selama salah satu threshold terlampaui, peluncuran ditunda dengan
+    exponential backoff. Threshold bernilai 0 dinonaktifkan.
+    """
+
+    def __init__(self):
+        self.min_free_mb = Config.ADMISSION_MIN_FREE_MB
+        self.max_load_per_cpu = Config.ADMISSION_MAX_LOAD_PER_CPU
+        self.max_chrome = Config.ADMISSION_MAX_CHROME
+        self.backoff_initial = Config.ADMISSION_BACKOFF_INITIAL
+        self.backoff_max = Config.ADMISSION_BACKOFF_MAX
+        self.max_wait = Config.ADMISSION_MAX_WAIT
+
+    def sample(self):
+        """
+        Sample host resources
+
+        Returns:
+            dict: free_mb, load_per_cpu, chrome_processes (None if unavailable)
+        """
+        free_mb = None
+        chrome = None
+        if psutil is not None:
+            free_mb = psutil.virtual_memory().available / 1024 / 1024
+            chrome = self._count_chrome()
+
+        load = None
+        try:
+            load = psutil.getloadavg()[0] if psutil is not None else os.getloadavg()[0]
+        except (AttributeError, OSError):
+            pass
+        load_per_cpu = load / (os.cpu_count() or 1) if load is not None else None
+
+        return {'free_mb': free_mb, 'load_per_cpu': load_per_cpu, 'chrome_processes': chrome}
+
+    @staticmethod
+    def _count_chrome():
+        """
+        Count browser (main) processes launched by crawlers (SESSION_SWITCH in the cmdline)
+
+        A user's own Chrome on the same host does not count; renderer/gpu
+        helpers carry --type=.
+        """
+        count = 0
+        for proc in psutil.process_iter(['cmdline']):
+            cmdline = proc.info.get('cmdline') or []
+            if (any(arg.startswith(SESSION_SWITCH) for arg in cmdline)
+                    and not any(arg.startswith('--type=') for arg in cmdline)):
+                count += 1
+        return count
+
+    def check(self, sample=None):
+        """
+        Returns:
+            dict: Threshold name -> reason the launch must wait (empty = admitted)
+        """
+        sample = sample or self.sample()
+        reasons = {}
+        if self.min_free_mb and sample['free_mb'] is not None and sample['free_mb'] < self.min_free_mb:
+            reasons['memory'] = f"free memory {sample['free_mb']:.0f} MB < {self.min_free_mb} MB"
+        if self.max_load_per_cpu and sample['load_per_cpu'] is not None and sample['load_per_cpu'] > self.max_load_per_cpu:
+            reasons['load'] = f"load/cpu {sample['load_per_cpu']:.2f} > {self.max_load_per_cpu}"
+        if self.max_chrome and sample['chrome_processes'] is not None and sample['chrome_processes'] >= self.max_chrome:
+            reasons['chrome'] = f"{sample['chrome_processes']} chrome running >= {self.max_chrome}"
+        return reasons
+
+    def wait_for_admission(self, sleep=time.sleep, record=None):
+        """
+        Block until resources allow a browser launch
+
+        Args:
+            sleep: Sleep function (crawler._sleep so cancel/deadline still apply)
+            record: Optional dict updated in place, so deferral is known even if
+                the wait is aborted by an exception
+
+        Returns:
+            dict: {'wait_seconds': float, 'reasons': [first reason seen per threshold]}
+
+        Raises:
+            AdmissionDenied: If still deferred after ADMISSION_MAX_WAIT seconds
+        """
+        record = record if record is not None else {}
+        record.update({'wait_seconds': 0.0, 'reasons': []})
+        start = time.monotonic()
+        delay = self.backoff_initial
+        seen = {}
+        while True:
+            reasons = self.check()
+            if not reasons:
+                break
+            for kind, reason in reasons.items():
+                seen.setdefault(kind, reason)
+            record['reasons'] = list(seen.values())
+
+            message = '; '.join(reasons.values())
+            waited = time.monotonic() - start
+            if self.max_wait and waited >= self.max_wait:
+                raise AdmissionDenied(f"Browser launch deferred {waited:.0f}s: {message}")
+            logging.warning(f"⏸️  Deferring browser launch {delay:.0f}s: {message}")
+            try:
+                sleep(delay)
+            finally:
+                record['wait_seconds'] = round(time.monotonic() - start, 2)
+            delay = min(delay * 2, self.backoff_max)
+
+        record['wait_seconds'] = round(time.monotonic() - start, 2)
+        if seen:
+            logging.info(f"▶️  Browser launch admitted after {record['wait_seconds']:.1f}s")
+        return record
+
+
+# Global instance
+admission_controller = AdmissionController()
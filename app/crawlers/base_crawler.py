@@ -8,18 +8,50 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 import time
 import os
+import shutil
 import logging
+import threading
+import uuid
 from datetime import datetime
 from abc import ABC, abstractmethod
 from app.config import Config
 from app.download_log import download_logger
+from app.crawlers.timeouts import latency_tracker
+from app.crawlers.watchdog import browser_watchdog, SESSION_SWITCH
+from app.crawlers.admission import admission_controller
+from app.crawlers.browser_contexts import shared_chrome
+from app.crawlers.remote_driver import RemoteDownloads
+
+class CrawlAborted(Exception):
+    """Base for aborts that must propagate through crawler fallbacks"""
+    pass
+
+
+class CrawlDeadlineExceeded(CrawlAborted):
+    """Raised when a crawl run exceeds its total time budget"""
+    pass
+
+
+class CrawlCancelled(CrawlAborted):
+    """Raised when a running crawl is cancelled by the user"""
+    pass
+
 
 class BaseCrawler(ABC):
     """Base class untuk semua crawler"""
     
+    deadline = None  # time.monotonic() deadline for current run (None = no budget)
+    cancel_event = None  # threading.Event set by cancel()
+    session_id = None  # Browser session marker (see app.crawlers.watchdog)
+    browser_context = None  # CDP browser context id when BROWSER_BACKEND=context
+    remote_downloads = None  # RemoteDownloads when BROWSER_BACKEND=remote
+    _claimed_tanggal = None  # data_tanggal claimed by this run and not logged yet
+    downloaded_files = None  # All files of a multi-file download (set by download_data)
+    
     def __init__(self, username=None, password=None, headless=None, task_name=None):
         self.username = username or Config.USERNAME
         self.password = password or Config.PASSWORD
@@ -28,68 +60,33 @@ class BaseCrawler(ABC):
         self.download_path = Config.DOWNLOAD_PATH
         self.source_name = self.__class__.__name__  # Nama crawler
         self.task_name = task_name  # Nama task dari scheduler
+        self.cancel_event = threading.Event()
+        self.session_id = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        self.admission = {'wait_seconds': 0.0, 'reasons': []}  # Deferral before browser launch
+        self._close_lock = threading.Lock()
+        self._closed = False
         
     def setup_driver(self):
         """Setup Chrome WebDriver dengan konfigurasi download"""
         try:
-            logging.info("Setting up Chrome WebDriver...")
-            chrome_options = Options()
+            if Config.BROWSER_BACKEND == 'context':
+                return self._setup_context_driver()
+            if Config.BROWSER_BACKEND == 'remote':
+                return self._setup_remote_driver()
             
-            # Set headless mode
-            if self.headless:
-                chrome_options.add_argument('--headless=new')
-                chrome_options.add_argument('--disable-gpu')
-            
-            # Additional options for stability
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            # Performance optimizations
-            chrome_options.page_load_strategy = 'eager'
-            chrome_options.add_argument('--disable-extensions')
-            chrome_options.add_argument('--disable-logging')
-            chrome_options.add_argument('--disable-infobars')
-            chrome_options.add_argument('--disable-notifications')
-            chrome_options.add_argument('--disable-default-apps')
-            chrome_options.add_argument('--log-level=3')
-            
-            # Set download preferences
-            prefs = {
-                "download.default_directory": self.download_path,
-                "download.prompt_for_download": False,
-                "download.directory_upgrade": True,
-                "safebrowsing.enabled": True,
-                "profile.default_content_settings.popups": 0,
-                "profile.default_content_setting_values.notifications": 2
-            }
-            chrome_options.add_experimental_option("prefs", prefs)
+            logging.info("Setting up Chrome WebDriver...")
+            chrome_options = self._chrome_options()
             
             # Initialize driver with better error handling
             try:
-                logging.info("Installing/updating ChromeDriver...")
-                driver_path = ChromeDriverManager().install()
-                logging.info(f"ChromeDriver reported path: {driver_path}")
-                
-                # Fix webdriver-manager path issue
-                if not driver_path.endswith('.exe'):
-                    # Find the actual chromedriver.exe in the directory
-                    driver_dir = os.path.dirname(driver_path)
-                    for file in os.listdir(driver_dir):
-                        if file == 'chromedriver.exe':
-                            driver_path = os.path.join(driver_dir, file)
-                            logging.info(f"Found actual chromedriver: {driver_path}")
-                            break
+                driver_path = self._driver_path()
                 
                 if not os.path.exists(driver_path):
                     raise Exception(f"ChromeDriver not found at: {driver_path}")
                 
                 service = Service(driver_path)
                 self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                self.driver.implicitly_wait(Config.BROWSER_TIMEOUT)
+                self._driver_ready()
                 
                 logging.info("✅ WebDriver initialized successfully")
                 return True
@@ -109,19 +106,9 @@ class BaseCrawler(ABC):
                         pass
                 
                 # Retry installation
-                driver_path = ChromeDriverManager().install()
-                
-                # Fix path again
-                if not driver_path.endswith('.exe'):
-                    driver_dir = os.path.dirname(driver_path)
-                    for file in os.listdir(driver_dir):
-                        if file == 'chromedriver.exe':
-                            driver_path = os.path.join(driver_dir, file)
-                            break
-                
-                service = Service(driver_path)
+                service = Service(self._driver_path())
                 self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                self.driver.implicitly_wait(Config.BROWSER_TIMEOUT)
+                self._driver_ready()
                 
                 logging.info("✅ WebDriver initialized successfully (after retry)")
                 return True
@@ -130,6 +117,281 @@ class BaseCrawler(ABC):
             logging.error(f"Setup driver error: {str(e)}")
             raise
     
+    def _chrome_options(self, session=None):
+        """
+        Chrome options untuk browser yang diluncurkan crawler
+        
+        Args:
+            session: Value of the watchdog session switch (default: this crawler's session_id)
+        """
+        chrome_options = Options()
+        
+        # Set headless mode
+        if self.headless:
+            chrome_options.add_argument('--headless=new')
+            chrome_options.add_argument('--disable-gpu')
+        
+        # Additional options for stability
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--window-size=1920,1080')
+        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        
+        # Performance optimizations
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-logging')
+        chrome_options.add_argument('--disable-infobars')
+        chrome_options.add_argument('--disable-notifications')
+        chrome_options.add_argument('--disable-default-apps')
+        chrome_options.add_argument('--log-level=3')
+        
+        # Marker so the watchdog can recognise (and reap) browsers we launched
+        chrome_options.add_argument(f'{SESSION_SWITCH}{session or self.session_id}')
+        
+        # Set download preferences
+        prefs = {
+            "download.default_directory": self.download_path,
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+            "safebrowsing.enabled": True,
+            "profile.default_content_settings.popups": 0,
+            "profile.default_content_setting_values.notifications": 2
+        }
+        chrome_options.add_experimental_option("prefs", prefs)
+        return chrome_options
+    
+    def _driver_path(self):
+        """Install/locate chromedriver via webdriver-manager"""
+        logging.info("Installing/updating ChromeDriver...")
+        driver_path = ChromeDriverManager().install()
+        logging.info(f"ChromeDriver reported path: {driver_path}")
+        
+        # Fix webdriver-manager path issue
+        if not driver_path.endswith('.exe'):
+            # Find the actual chromedriver.exe in the directory
+            driver_dir = os.path.dirname(driver_path)
+            for file in os.listdir(driver_dir):
+                if file == 'chromedriver.exe':
+                    driver_path = os.path.join(driver_dir, file)
+                    logging.info(f"Found actual chromedriver: {driver_path}")
+                    break
+        return driver_path
+    
+    def _driver_ready(self):
+        """Common setup once self.driver exists"""
+        self._closed = False
+        browser_watchdog.register(self)
+        self._clamp_implicit_wait()
+    
+    def _setup_context_driver(self):
+        """
+        Attach to the shared Chrome inside an isolated browser context
+        
+        The context has its own cookies and download directory
+        (DOWNLOAD_PATH/.contexts/<session_id>); finished downloads are moved to
+        DOWNLOAD_PATH by _collect_downloads().
+        """
+        logging.info("Setting up browser context on shared Chrome...")
+        self.download_path = os.path.join(Config.DOWNLOAD_PATH, '.contexts', self.session_id)
+        os.makedirs(self.download_path, exist_ok=True)
+        
+        self.browser_context, target_id = shared_chrome.open_context(
+            self.download_path, self._chrome_options, self._driver_path
+        )
+        try:
+            options = Options()
+            options.page_load_strategy = 'eager'
+            options.debugger_address = shared_chrome.debugger_address
+            self.driver = webdriver.Chrome(service=Service(shared_chrome.driver_path), options=options)
+            self.driver.switch_to.window(target_id)
+        except Exception:
+            self._release_context()
+            raise
+        self._driver_ready()
+        
+        logging.info("✅ WebDriver attached to browser context")
+        return True
+    
+    def _setup_remote_driver(self):
+        """
+        Start Chrome on a remote WebDriver endpoint (Selenium Grid / standalone-chrome)
+        
+        Downloads land on the browser node; they are pulled into DOWNLOAD_PATH by
+        _sync_remote_downloads() through the Grid managed-downloads file API.
+        """
+        logging.info(f"Setting up Remote WebDriver at {Config.REMOTE_WEBDRIVER_URL}...")
+        if not Config.REMOTE_WEBDRIVER_URL:
+            raise Exception("REMOTE_WEBDRIVER_URL is not configured")
+        
+        chrome_options = self._chrome_options()
+        # The node decides where files go; a local path would not exist there
+        chrome_options.experimental_options['prefs'].pop('download.default_directory', None)
+        chrome_options.set_capability('se:downloadsEnabled', True)
+        
+        self.driver = webdriver.Remote(command_executor=Config.REMOTE_WEBDRIVER_URL, options=chrome_options)
+        self.remote_downloads = RemoteDownloads(self.driver, self.download_path)
+        self._driver_ready()
+        
+        logging.info(f"✅ Remote WebDriver session {self.driver.session_id} started")
+        return True
+    
+    def _sync_remote_downloads(self):
+        """Fetch completed downloads from the remote node (no-op for local browsers)"""
+        if self.remote_downloads is not None:
+            self.remote_downloads.sync()
+    
+    def _collect_downloads(self, filename=None):
+        """
+        Move finished downloads from the browser context directory to DOWNLOAD_PATH
+        
+        Args:
+            filename: Name (or list of names) from download_data(), mapped if renamed
+        
+        Returns:
+            str | list: Final filename(s) in DOWNLOAD_PATH
+        """
+        if self.download_path == Config.DOWNLOAD_PATH or not os.path.isdir(self.download_path):
+            return filename
+        
+        renamed = {}
+        for name in os.listdir(self.download_path):
+            src = os.path.join(self.download_path, name)
+            if not os.path.isfile(src) or name.endswith(('.crdownload', '.tmp', '.part')):
+                continue
+            base, ext = os.path.splitext(name)
+            target = name
+            counter = 1
+            while os.path.exists(os.path.join(Config.DOWNLOAD_PATH, target)):
+                target = f"{base} ({counter}){ext}"
+                counter += 1
+            shutil.move(src, os.path.join(Config.DOWNLOAD_PATH, target))
+            renamed[name] = target
+        
+        if renamed:
+            logging.info(f"📁 Moved {len(renamed)} file(s) from browser context to {Config.DOWNLOAD_PATH}")
+        if isinstance(filename, list):
+            return [renamed.get(name, name) for name in filename]
+        return renamed.get(filename, filename)
+    
+    def _release_context(self):
+        """Dispose this crawler's browser context and its download directory"""
+        if not self.browser_context:
+            return
+        shared_chrome.close_context(self.browser_context)
+        self.browser_context = None
+        try:
+            self._collect_downloads()
+            shutil.rmtree(self.download_path, ignore_errors=True)
+        except Exception as e:
+            logging.error(f"Error cleaning browser context downloads: {str(e)}")
+        self.download_path = Config.DOWNLOAD_PATH
+    
+    def _remaining(self):
+        """Seconds left in the run's time budget (None = no budget)"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+    
+    def _budget(self, timeout):
+        """
+        Clamp a step timeout to the remaining time budget (also a cancellation checkpoint)
+        
+        Raises:
+            CrawlCancelled: If cancel() was called
+            CrawlDeadlineExceeded: If the budget is already spent
+        """
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise CrawlCancelled("Crawl cancelled by user")
+        remaining = self._remaining()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise CrawlDeadlineExceeded("Crawl time budget exhausted")
+        return min(timeout, remaining)
+    
+    def _sleep(self, seconds):
+        """time.sleep() that wakes up on cancel() and never sleeps past the deadline"""
+        seconds = self._budget(seconds)
+        if self.cancel_event is not None:
+            self.cancel_event.wait(seconds)
+        else:
+            time.sleep(seconds)
+        self._budget(0)
+    
+    def cancel(self):
+        """
+        Cancel a running crawl (thread-safe, dipanggil dari thread lain)
+        
+        Sets the cancellation token checked between steps and inside wait loops,
+        then kills the browser so any blocking WebDriver call returns immediately.
+        """
+        logging.warning(f"🛑 Cancelling {self.source_name} crawl (task: {self.task_name})")
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.close(force=True, grace=1)
+    
+    @property
+    def cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+    
+    def _implicit_timeout(self):
+        """Implicit wait derived from all observed element waits of this site"""
+        return latency_tracker.timeout_for(self.source_name, latency_tracker.ELEMENT_STEP, Config.BROWSER_TIMEOUT)
+    
+    def _clamp_implicit_wait(self, limit=None):
+        """
+        Re-apply the implicit wait for the next lookups, never longer than the time
+        left in the budget (or `limit`), so a late lookup cannot overrun the deadline
+        """
+        timeout = self._budget(self._implicit_timeout())
+        if limit is not None:
+            timeout = min(timeout, limit)
+        self.driver.implicitly_wait(timeout)
+    
+    def _find_elements(self, by, value):
+        """driver.find_elements() with the implicit wait clamped to the remaining budget"""
+        self._clamp_implicit_wait()
+        return self.driver.find_elements(by, value)
+    
+    def _wait_for(self, step, condition, timeout=10):
+        """
+        WebDriverWait dengan timeout adaptif per step
+        
+        Args:
+            step: Nama wait point (untuk histogram latency)
+            condition: Expected condition (EC.*)
+            timeout: Default timeout jika histori belum cukup
+        """
+        timeout = self._budget(latency_tracker.timeout_for(self.source_name, step, timeout))
+        self._clamp_implicit_wait(timeout)  # element lookups inside the condition wait implicitly too
+        start = time.time()
+        try:
+            result = WebDriverWait(self.driver, timeout).until(condition)
+        except TimeoutException:
+            self._budget(0)
+            for key in (step, latency_tracker.ELEMENT_STEP):
+                latency_tracker.record(self.source_name, key, time.time() - start, timed_out=True)
+            raise
+        for key in (step, latency_tracker.ELEMENT_STEP):
+            latency_tracker.record(self.source_name, key, time.time() - start)
+        return result
+    
+    def _open(self, step, url):
+        """driver.get() dengan page load timeout adaptif per step"""
+        timeout = self._budget(latency_tracker.timeout_for(self.source_name, step, Config.BROWSER_TIMEOUT))
+        self.driver.set_page_load_timeout(timeout)
+        start = time.time()
+        try:
+            self.driver.get(url)
+        except TimeoutException:
+            self._budget(0)
+            latency_tracker.record(self.source_name, step, time.time() - start, timed_out=True)
+            raise
+        latency_tracker.record(self.source_name, step, time.time() - start)
+    
     @abstractmethod
     def login(self):
         """Login method - must be implemented by subclass"""
@@ -152,23 +414,29 @@ class BaseCrawler(ABC):
     
     def check_if_should_download(self, data_tanggal):
         """
-        Check if should download based on log
+        Claim the download for data_tanggal (atomic, so overlapping runs cannot
+        both download it); the claim is released again if no file gets logged
         
         Returns:
             (should_download: bool, reason: str)
         """
-        # Check if already downloaded
-        exists = download_logger.check_if_exists(self.source_name, data_tanggal)
+        if data_tanggal is None:
+            return True, "Data tanpa tanggal"
         
-        if exists:
-            logging.info(f"⏭️  Data tanggal {data_tanggal} sudah pernah didownload")
-            return False, f"Data {data_tanggal} sudah ada"
-        else:
+        claimed, status = download_logger.claim(self.source_name, data_tanggal, owner=self.session_id)
+        
+        if claimed:
+            self._claimed_tanggal = data_tanggal
             logging.info(f"✅ Data tanggal {data_tanggal} belum ada, akan didownload")
             return True, f"Data {data_tanggal} baru"
+        if status == 'claimed':
+            logging.info(f"⏭️  Data tanggal {data_tanggal} sedang didownload oleh run lain")
+            return False, f"Data {data_tanggal} sedang didownload oleh run lain"
+        logging.info(f"⏭️  Data tanggal {data_tanggal} sudah pernah didownload")
+        return False, f"Data {data_tanggal} sudah ada"
     
     def log_download(self, filename, data_tanggal=None):
-        """Log download ke database"""
+        """Log download ke database (completes the download claim)"""
         download_logger.add_download(
             nama_file=filename,
             tanggal_download=datetime.now(),
@@ -176,18 +444,49 @@ class BaseCrawler(ABC):
             data_tanggal=data_tanggal,
             task_name=self.task_name
         )
+        if data_tanggal == self._claimed_tanggal:
+            self._claimed_tanggal = None
+    
+    def log_downloads(self, filenames, data_tanggal=None):
+        """Log several files of one download in a single transaction"""
+        download_logger.add_downloads([
+            {
+                'nama_file': filename,
+                'tanggal_download': datetime.now(),
+                'laman_web': self.source_name,
+                'data_tanggal': data_tanggal,
+                'task_name': self.task_name
+            }
+            for filename in filenames
+        ])
+        if data_tanggal == self._claimed_tanggal:
+            self._claimed_tanggal = None
+    
+    def _release_claim(self):
+        """Give back a claim whose download never got logged"""
+        if self._claimed_tanggal is None:
+            return
+        try:
+            download_logger.release_claim(self.source_name, self._claimed_tanggal, owner=self.session_id)
+        except Exception as e:
+            logging.error(f"Error releasing download claim: {str(e)}")
+        self._claimed_tanggal = None
     
-    def _wait_for_download(self, timeout=30, check_recent=True):
+    def _wait_for_download(self, timeout=None, check_recent=True):
         """
         Wait for download to complete
         
         Args:
-            timeout: Maximum wait time in seconds
+            timeout: Maximum wait time in seconds (None = adaptive, default MAX_DOWNLOAD_WAIT)
             check_recent: If True, also check for files modified during wait period
         """
         logging.info("⏳ Waiting for download to complete...")
         
-        download_path = Config.DOWNLOAD_PATH
+        if timeout is None:
+            timeout = latency_tracker.timeout_for(self.source_name, 'download', Config.MAX_DOWNLOAD_WAIT)
+        timeout = self._budget(timeout)
+        
+        download_path = self.download_path
         if not os.path.isabs(download_path):
             download_path = os.path.join(os.getcwd(), download_path)
         
@@ -204,7 +503,8 @@ class BaseCrawler(ABC):
         found_new_file = None
         
         while time.time() - start_time < timeout:
-            time.sleep(check_interval)
+            self._sleep(check_interval)
+            self._sync_remote_downloads()
             
             if not os.path.exists(download_path):
                 continue
@@ -227,12 +527,13 @@ class BaseCrawler(ABC):
                 if actual_new:
                     found_new_file = actual_new[0]
                     # Wait a bit more to ensure download is complete
-                    time.sleep(1)
+                    self._sleep(1)
                     # Check if still no .crdownload files
                     current_files = set(os.listdir(download_path))
                     in_progress = any(f.endswith(('.crdownload', '.tmp', '.part')) for f in current_files)
                     if not in_progress:
                         logging.info(f"✅ New file downloaded: {found_new_file}")
+                        latency_tracker.record(self.source_name, 'download', time.time() - start_time)
                         return found_new_file
             
             # Check for MODIFIED files (recently downloaded) - only if check_recent is True
@@ -248,14 +549,17 @@ class BaseCrawler(ABC):
                             # And it's either new or modified since initial check
                             if f not in initial_files or mtime > initial_files[f]:
                                 # Wait a bit to ensure it's complete
-                                time.sleep(1)
+                                self._sleep(1)
                                 current_files_check = set(os.listdir(download_path))
                                 in_progress = any(x.endswith(('.crdownload', '.tmp', '.part')) for x in current_files_check)
                                 if not in_progress:
                                     logging.info(f"✅ File downloaded: {f}")
+                                    latency_tracker.record(self.source_name, 'download', time.time() - start_time)
                                     return f
         
+        self._budget(0)
         logging.warning("⚠️ Download timeout or no new files detected")
+        latency_tracker.record(self.source_name, 'download', time.time() - start_time, timed_out=True)
         return None
     
     def _get_latest_downloads(self):
@@ -283,6 +587,7 @@ class BaseCrawler(ABC):
             List of filenames downloaded within the time window
         """
         try:
+            self._sync_remote_downloads()
             recent_files = []
             cutoff_time = since_timestamp - 5  # 5 second buffer before start
             
@@ -315,38 +620,100 @@ class BaseCrawler(ABC):
             logging.error(f"Error getting recent downloads: {str(e)}")
             return []
     
-    def close(self):
-        """Close browser"""
+    def close(self, force=False, grace=5):
+        """
+        Close browser (idempotent, safe to call from another thread)
+        
+        Args:
+            force: Kill chromedriver if quit() hangs or fails (used on deadline expiry/cancel)
+            grace: Seconds to wait for quit() before killing when force=True
+        """
+        with self._close_lock:
+            if not self.driver or self._closed:
+                return
+            self._closed = True
         try:
-            if self.driver:
+            self._quit(force, grace)
+        finally:
+            self._release_context()
+    
+    def _quit(self, force, grace):
+        if not force:
+            try:
                 self.driver.quit()
                 logging.info("Browser closed")
+                browser_watchdog.unregister(self)
+            except Exception as e:
+                logging.error(f"Error closing browser: {str(e)}")
+                browser_watchdog.kill_session(self, 'quit failed')
+            return
+        
+        # A hung Chrome can block quit() indefinitely; give it a few seconds then kill
+        quitter = threading.Thread(target=self._quit_quietly, daemon=True)
+        quitter.start()
+        quitter.join(timeout=grace)
+        if browser_watchdog.kill_session(self, 'forced close'):
+            return
+        try:
+            process = self.driver.service.process
+            if process and process.poll() is None:
+                process.kill()
+                logging.warning("🔪 ChromeDriver killed")
+        except Exception as e:
+            logging.error(f"Error killing browser: {str(e)}")
+    
+    def _quit_quietly(self):
+        try:
+            self.driver.quit()
+            logging.info("Browser closed")
         except Exception as e:
             logging.error(f"Error closing browser: {str(e)}")
     
-    def run(self):
+    def run(self, time_budget=None):
         """
         Main run method - template pattern
         
+        Args:
+            time_budget: Total seconds allowed for the whole run (None = unlimited).
+                The remaining budget bounds every wait, navigation and download step.
+        
         Returns:
             dict: Result of crawl
         """
+        run_start = time.monotonic()
+        self.deadline = run_start + time_budget if time_budget else None
+        steps_completed = []
+        data_tanggal = None
+        timed_out = False
         try:
             logging.info("=" * 70)
             logging.info(f"🚀 STARTING {self.source_name}")
+            if time_budget:
+                logging.info(f"⏱️  Time budget: {time_budget}s")
             logging.info("=" * 70)
             
+            # Step 0: Admission control (defer launch while host is starved)
+            if Config.BROWSER_BACKEND != 'remote':
+                admission_controller.wait_for_admission(sleep=self._sleep, record=self.admission)
+            
             # Step 1: Setup
             self.setup_driver()
+            steps_completed.append('setup')
             
             # Step 2: Login
+            self._budget(0)
             self.login()
+            steps_completed.append('login')
             
             # Step 3: Navigate to data page
+            self._budget(0)
             self.navigate_to_data_page()
+            steps_completed.append('navigate')
             
             # Step 4: Get data date
+            self._budget(0)
             data_tanggal = self.get_data_date()
+            steps_completed.append('data_date')
             logging.info(f"📅 Data tanggal: {data_tanggal}")
             
             # Step 5: Check if should download
@@ -362,10 +729,16 @@ class BaseCrawler(ABC):
                 }
             
             # Step 6: Download
+            self._budget(0)
             filename = self.download_data()
+            steps_completed.append('download')
             
-            # Step 7: Log download
-            if filename:
+            # Step 7: Log download(s)
+            files = self._collect_downloads(self.downloaded_files or ([filename] if filename else []))
+            filename = files[0] if files else None
+            if len(files) > 1:
+                self.log_downloads(files, data_tanggal)
+            elif filename:
                 self.log_download(filename, data_tanggal)
             
             logging.info("=" * 70)
@@ -375,16 +748,51 @@ class BaseCrawler(ABC):
             return {
                 'success': True,
                 'skipped': False,
-                'message': f'Downloaded: {filename}',
+                'message': f'Downloaded: {filename}' + (f' (+{len(files) - 1} files)' if len(files) > 1 else ''),
                 'file': filename,
+                'files': files,
                 'data_tanggal': data_tanggal
             }
             
+        except CrawlCancelled:
+            return self._cancelled_result(run_start, steps_completed, data_tanggal)
+        except CrawlDeadlineExceeded as e:
+            timed_out = True
+            elapsed = time.monotonic() - run_start
+            logging.error(f"⏱️ Crawl aborted after {elapsed:.1f}s: {str(e)}")
+            return {
+                'success': False,
+                'timed_out': True,
+                'partial': True,
+                'message': f'Time budget {time_budget}s exceeded after steps: {", ".join(steps_completed) or "-"}',
+                'steps_completed': steps_completed,
+                'data_tanggal': data_tanggal,
+                'elapsed_seconds': round(elapsed, 2)
+            }
         except Exception as e:
+            if self.cancelled:
+                # Browser was killed under a pending WebDriver call
+                return self._cancelled_result(run_start, steps_completed, data_tanggal)
             logging.error(f"❌ Crawl error: {str(e)}")
             return {
                 'success': False,
                 'message': str(e)
             }
         finally:
-            self.close()
+            self._release_claim()
+            self.close(force=timed_out or self.cancelled, grace=1 if self.cancelled else 5)
+            self.deadline = None
+    
+    def _cancelled_result(self, run_start, steps_completed, data_tanggal):
+        """Partial-result record for a cancelled run"""
+        elapsed = time.monotonic() - run_start
+        logging.warning(f"🛑 Crawl cancelled after {elapsed:.1f}s")
+        return {
+            'success': False,
+            'cancelled': True,
+            'partial': True,
+            'message': f'Cancelled by user after steps: {", ".join(steps_completed) or "-"}',
+            'steps_completed': steps_completed,
+            'data_tanggal': data_tanggal,
+            'elapsed_seconds': round(elapsed, 2)
+        }
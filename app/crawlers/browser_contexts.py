@@ -0,0 +1,171 @@
+"""
+Shared Browser - satu proses Chrome, satu browser context (CDP) per crawl
+"""
+import atexit
+import logging
+import os
+import threading
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from app.config import Config
+from app.crawlers.watchdog import browser_watchdog
+
+
+class SharedChrome:
+    """
+    Chrome bersama untuk crawl paralel (BROWSER_BACKEND=context).
+
+    Chrome diluncurkan sekali lewat chromedriver "host". Setiap crawl mendapat
+    browser context sendiri (Target.createBrowserContext): cookie/storage
+    terisolasi dan download directory sendiri. Crawler meng-attach chromedriver
+    ringan ke Chrome yang sama (debuggerAddress) lalu pindah ke tab di context-nya.
+    """
+
+    def __init__(self, recycle_after=None):
+        self.recycle_after = recycle_after if recycle_after is not None else Config.SHARED_BROWSER_RECYCLE_AFTER
+        self._host = None
+        self._lock = threading.RLock()
+        self._contexts = set()
+        self._opened_since_launch = 0  # contexts opened on the current Chrome (recycle counter)
+        self.driver_path = None
+        self.debugger_address = None
+        self.stats = {
+            'launches': 0,
+            'contexts_opened': 0,
+            'contexts_closed': 0,
+        }
+
+    @property
+    def running(self):
+        with self._lock:
+            return self._host is not None
+
+    def ensure_started(self, options_factory, driver_path_factory):
+        """
+        Launch the shared Chrome if it is not running (or has died)
+
+        Args:
+            options_factory: Callable(session=...) returning Chrome Options
+            driver_path_factory: Callable returning the chromedriver path
+        """
+        with self._lock:
+            if self._host is not None and self._alive():
+                return
+            if self._host is not None:
+                logging.warning("⚠️ Shared Chrome is gone, relaunching")
+                self._discard_host()
+
+            logging.info("Launching shared Chrome for browser contexts...")
+            options = options_factory(session=f"{os.getpid()}-shared")
+            self.driver_path = driver_path_factory()
+            self._host = webdriver.Chrome(service=Service(self.driver_path), options=options)
+            self.debugger_address = self._host.capabilities['goog:chromeOptions']['debuggerAddress']
+            try:
+                browser_watchdog.protect(self._host.service.process.pid)
+            except Exception:
+                pass
+            self.stats['launches'] += 1
+            logging.info(f"✅ Shared Chrome running at {self.debugger_address}")
+
+    def _alive(self):
+        try:
+            if self._host.service.process.poll() is not None:
+                return False
+            self._host.execute_cdp_cmd('Browser.getVersion', {})
+            return True
+        except Exception:
+            return False
+
+    def open_context(self, download_path, options_factory, driver_path_factory):
+        """
+        Create an isolated browser context with its own download directory
+
+        Args:
+            download_path: Download directory for this context
+            options_factory, driver_path_factory: See ensure_started()
+
+        Returns:
+            tuple: (browser_context_id, target_id) - target_id is the window handle
+        """
+        with self._lock:
+            # Started under the same lock so an idle recycle cannot slip in between
+            self.ensure_started(options_factory, driver_path_factory)
+            context_id = self._host.execute_cdp_cmd(
+                'Target.createBrowserContext', {'disposeOnDetach': False}
+            )['browserContextId']
+            try:
+                self._host.execute_cdp_cmd('Browser.setDownloadBehavior', {
+                    'behavior': 'allow',
+                    'browserContextId': context_id,
+                    'downloadPath': download_path,
+                })
+                target_id = self._host.execute_cdp_cmd('Target.createTarget', {
+                    'url': 'about:blank',
+                    'browserContextId': context_id,
+                })['targetId']
+            except Exception:
+                self._dispose(context_id)
+                raise
+            self._contexts.add(context_id)
+            self._opened_since_launch += 1
+            self.stats['contexts_opened'] += 1
+        logging.info(f"🧩 Browser context {context_id} opened ({len(self._contexts)} active)")
+        return context_id, target_id
+
+    def close_context(self, context_id):
+        """Dispose a browser context (closes its tabs and drops its cookies)"""
+        with self._lock:
+            if context_id not in self._contexts:
+                return
+            self._contexts.discard(context_id)
+            self._dispose(context_id)
+            self.stats['contexts_closed'] += 1
+            logging.info(f"🧩 Browser context {context_id} closed ({len(self._contexts)} active)")
+
+            # Recycle a long-lived Chrome once idle so leaked memory is returned
+            if not self._contexts and self.recycle_after and \
+                    self._opened_since_launch >= self.recycle_after:
+                logging.info("♻️  Recycling shared Chrome")
+                self.shutdown()
+
+    def _dispose(self, context_id):
+        try:
+            self._host.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': context_id})
+        except Exception as e:
+            logging.warning(f"⚠️ Could not dispose browser context {context_id}: {str(e)}")
+
+    def shutdown(self):
+        """Quit the shared Chrome (all contexts are closed with it)"""
+        with self._lock:
+            if self._host is None:
+                return
+            try:
+                self._host.quit()
+                logging.info("Shared Chrome closed")
+            except Exception as e:
+                logging.error(f"Error closing shared Chrome: {str(e)}")
+            self._discard_host()
+
+    def _discard_host(self):
+        try:
+            browser_watchdog.unprotect(self._host.service.process.pid)
+        except Exception:
+            pass
+        self._host = None
+        self.debugger_address = None
+        self._contexts.clear()
+        self._opened_since_launch = 0
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['backend'] = Config.BROWSER_BACKEND
+            stats['running'] = self._host is not None
+            stats['active_contexts'] = len(self._contexts)
+            stats['contexts_since_launch'] = self._opened_since_launch
+        return stats
+
+
+# Global instance
+shared_chrome = SharedChrome()
+atexit.register(shared_chrome.shutdown)
@@ -0,0 +1,84 @@
+"""
+Remote WebDriver - Chrome di Selenium Grid / standalone-chrome, download diambil lewat file API
+"""
+import base64
+import io
+import logging
+import os
+import zipfile
+import requests
+from app.config import Config
+
+# Chrome writes to a temp name and renames when the download completes
+TEMP_SUFFIXES = ('.crdownload', '.tmp', '.part')
+
+
+class RemoteDownloads:
+    """
+    Pull files downloaded on a remote browser node into a local directory.
+
+    Memakai managed downloads Selenium Grid 4 (capability `se:downloadsEnabled`,
+    node dijalankan dengan `--enable-managed-downloads true`):
+    GET /session/<id>/se/files (list) dan POST /session/<id>/se/files (zip base64).
+    """
+
+    def __init__(self, driver, target_dir, base_url=None, timeout=30):
+        self.driver = driver
+        self.target_dir = target_dir
+        self.base_url = (base_url or Config.REMOTE_WEBDRIVER_URL).rstrip('/')
+        self.timeout = timeout
+        self.fetched = {}  # remote name -> local name
+
+    @property
+    def _files_url(self):
+        return f"{self.base_url}/session/{self.driver.session_id}/se/files"
+
+    def list_files(self):
+        """Names of completed downloads on the node"""
+        response = requests.get(self._files_url, timeout=self.timeout)
+        response.raise_for_status()
+        names = response.json()['value'].get('names', [])
+        return [n for n in names if not n.endswith(TEMP_SUFFIXES)]
+
+    def fetch(self, name):
+        """
+        Download one file from the node into target_dir
+
+        Returns:
+            str: Local filename (suffixed ' (n)' if the name is taken)
+        """
+        response = requests.post(self._files_url, json={'name': name}, timeout=self.timeout)
+        response.raise_for_status()
+        contents = base64.b64decode(response.json()['value']['contents'])
+
+        base, ext = os.path.splitext(name)
+        local_name = name
+        counter = 1
+        while os.path.exists(os.path.join(self.target_dir, local_name)):
+            local_name = f"{base} ({counter}){ext}"
+            counter += 1
+
+        with zipfile.ZipFile(io.BytesIO(contents)) as archive:
+            member = archive.namelist()[0]
+            with archive.open(member) as src, open(os.path.join(self.target_dir, local_name), 'wb') as dst:
+                dst.write(src.read())
+
+        self.fetched[name] = local_name
+        logging.info(f"📥 Fetched {name} from remote browser node as {local_name}")
+        return local_name
+
+    def sync(self):
+        """
+        Fetch every completed remote download not fetched yet
+
+        Returns:
+            list: Local filenames fetched in this call
+        """
+        new_files = []
+        try:
+            for name in self.list_files():
+                if name not in self.fetched:
+                    new_files.append(self.fetch(name))
+        except Exception as e:
+            logging.warning(f"⚠️ Could not sync remote downloads: {str(e)}")
+        return new_files
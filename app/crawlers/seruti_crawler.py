@@ -3,20 +3,20 @@ Seruti Crawler - BPS Seruti System
 """
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support import expected_conditions as EC
 import time
 import logging
 import re
 from datetime import datetime
-from app.crawlers.base_crawler import BaseCrawler
+from app.crawlers.base_crawler import BaseCrawler, CrawlAborted
 from app.config import Config
 
 class SerutiCrawler(BaseCrawler):
     """Crawler untuk Seruti BPS"""
     
-    def __init__(self, username=None, password=None, headless=None):
-        super().__init__(username, password, headless)
+    def __init__(self, username=None, password=None, headless=None, task_name=None):
+        super().__init__(username, password, headless, task_name)
         self.source_name = "Seruti"
         self.target_url = "https://olah.web.bps.go.id/seruti/login/sso"
     
@@ -26,28 +26,30 @@ class SerutiCrawler(BaseCrawler):
             logging.info("🔐 Logging in to Seruti SSO...")
             
             # Navigate to SSO login
-            self.driver.get(self.target_url)
-            time.sleep(2)
+            self._open('login_page', self.target_url)
+            self._sleep(2)
             
             # Find and fill username
-            username_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, 'username'))
+            username_input = self._wait_for(
+                'login_form', EC.presence_of_element_located((By.ID, 'username'))
             )
             username_input.clear()
             username_input.send_keys(self.username)
-            time.sleep(1)
+            self._sleep(1)
             
             # Find and fill password
-            password_input = self.driver.find_element(By.XPATH, "//input[@type='password']")
+            password_input = self._wait_for(
+                'login_password', EC.presence_of_element_located((By.XPATH, "//input[@type='password']"))
+            )
             password_input.clear()
             password_input.send_keys(self.password)
-            time.sleep(1)
+            self._sleep(1)
             
             # Press Enter to login
             password_input.send_keys(Keys.RETURN)
             
             # Wait for redirect
-            time.sleep(3)
+            self._sleep(3)
             
             logging.info("✅ Login successful")
             return True
@@ -62,8 +64,8 @@ class SerutiCrawler(BaseCrawler):
             logging.info("🧭 Navigating to Progres page...")
             
             progres_url = "https://olah.web.bps.go.id/seruti/progres#/"
-            self.driver.get(progres_url)
-            time.sleep(3)
+            self._open('progres_page', progres_url)
+            self._sleep(3)
             
             logging.info("✅ Navigation successful")
             return True
@@ -84,8 +86,8 @@ class SerutiCrawler(BaseCrawler):
             
             # Try to find kondisi data element
             try:
-                kondisi_elem = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "ml-2"))
+                kondisi_elem = self._wait_for(
+                    'kondisi_data', EC.presence_of_element_located((By.CLASS_NAME, "ml-2"))
                 )
                 kondisi_text = kondisi_elem.text
                 logging.info(f"   Kondisi data: {kondisi_text}")
@@ -112,11 +114,15 @@ class SerutiCrawler(BaseCrawler):
                     # If can't parse, return the text itself
                     return kondisi_text
                     
+            except CrawlAborted:
+                raise
             except Exception as e:
                 logging.warning(f"⚠️ Could not get kondisi data: {str(e)}")
                 # Fallback: use current date
                 return datetime.now().strftime('%Y-%m-%d')
                 
+        except CrawlAborted:
+            raise
         except Exception as e:
             logging.error(f"❌ Error getting data date: {str(e)}")
             return None
@@ -146,8 +152,8 @@ class SerutiCrawler(BaseCrawler):
             
             # Step 1: Select tabel
             logging.info("   Selecting tabel...")
-            tabel_select = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "select.form-control.form-control-sm"))
+            tabel_select = self._wait_for(
+                'tabel_select', EC.presence_of_element_located((By.CSS_SELECTOR, "select.form-control.form-control-sm"))
             )
             
             select_tabel = Select(tabel_select)
@@ -161,7 +167,7 @@ class SerutiCrawler(BaseCrawler):
                         logging.info(f"   ✅ Selected: {option.text}")
                         break
             
-            time.sleep(1)
+            self._sleep(1)
             
             # Step 2: Select triwulan
             if override_triwulan:
@@ -171,7 +177,7 @@ class SerutiCrawler(BaseCrawler):
                 current_triwulan = self.get_current_triwulan()
                 logging.info(f"   Auto-detected: {current_triwulan}")
             
-            all_selects = self.driver.find_elements(By.CSS_SELECTOR, "select.form-control.form-control-sm")
+            all_selects = self._find_elements(By.CSS_SELECTOR, "select.form-control.form-control-sm")
             
             for select_elem in all_selects:
                 try:
@@ -185,26 +191,26 @@ class SerutiCrawler(BaseCrawler):
                 except:
                     continue
             
-            time.sleep(1)
+            self._sleep(1)
             
             # Step 3: Click Tampilkan
             logging.info("   Clicking Tampilkan...")
-            tampilkan_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button.btn.btn-sm.btn-primary"))
+            tampilkan_button = self._wait_for(
+                'tampilkan_button', EC.element_to_be_clickable((By.CSS_SELECTOR, "button.btn.btn-sm.btn-primary"))
             )
             tampilkan_button.click()
-            time.sleep(1.5)
+            self._sleep(1.5)
             
             # Step 4: Click Export
             logging.info("   Clicking Export...")
-            export_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((
+            export_button = self._wait_for(
+                'export_button', EC.element_to_be_clickable((
                     By.XPATH,
                     "//button[contains(text(), 'Export') or contains(@class, 'export')]"
                 ))
             )
             export_button.click()
-            time.sleep(2)
+            self._sleep(2)
             
             # Wait for download
             filename = self._wait_for_download()
@@ -4,13 +4,13 @@ Downloads 7 Excel files from different progress reports
 """
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support import expected_conditions as EC
 import time
 import logging
 import re
 from datetime import datetime
-from app.crawlers.base_crawler import BaseCrawler
+from app.crawlers.base_crawler import BaseCrawler, CrawlAborted
 from app.config import Config
 
 class SusenasCrawler(BaseCrawler):
@@ -26,8 +26,8 @@ class SusenasCrawler(BaseCrawler):
     7. Laporan Pengolahan Dokumen KP
     """
     
-    def __init__(self, username=None, password=None, headless=None):
-        super().__init__(username, password, headless)
+    def __init__(self, username=None, password=None, headless=None, task_name=None):
+        super().__init__(username, password, headless, task_name)
         self.source_name = "Susenas"
         
         # SSO Login URL
@@ -54,30 +54,30 @@ class SusenasCrawler(BaseCrawler):
             logging.info("🔐 Logging in to Susenas via SSO...")
             
             # Navigate to SSO login page
-            self.driver.get(self.sso_url)
-            time.sleep(3)
+            self._open('login_page', self.sso_url)
+            self._sleep(3)
             
             # Wait for username field
-            username_field = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "username"))
+            username_field = self._wait_for(
+                'login_form', EC.presence_of_element_located((By.ID, "username"))
             )
             username_field.clear()
             username_field.send_keys(self.username)
             logging.info(f"✅ Username entered: {self.username}")
             
             # Enter password
-            password_field = self.driver.find_element(By.ID, "password")
+            password_field = self._wait_for('login_password', EC.presence_of_element_located((By.ID, "password")))
             password_field.clear()
             password_field.send_keys(self.password)
             logging.info("✅ Password entered")
             
             # Click login button
-            login_button = self.driver.find_element(By.ID, "kc-login")
+            login_button = self._wait_for('login_button', EC.element_to_be_clickable((By.ID, "kc-login")))
             login_button.click()
             logging.info("🔄 Login button clicked")
             
             # Wait for redirect to dashboard
-            time.sleep(5)
+            self._sleep(5)
             
             # Check if login successful (should redirect to webmonitoring.bps.go.id)
             current_url = self.driver.current_url
@@ -99,8 +99,8 @@ class SusenasCrawler(BaseCrawler):
             
             # Navigate to SEN main page
             sen_url = "https://webmonitoring.bps.go.id/sen/site/index"
-            self.driver.get(sen_url)
-            time.sleep(2)
+            self._open('sen_index', sen_url)
+            self._sleep(2)
             
             logging.info("✅ Navigation to SEN page successful")
             return True
@@ -153,20 +153,22 @@ class SusenasCrawler(BaseCrawler):
                     logging.info(f"   URL: {report_url}")
                     
                     # Navigate to report page
-                    self.driver.get(report_url)
-                    time.sleep(2)
+                    self._open('report_page', report_url)
+                    self._sleep(2)
                     
                     # Find and click export-excel button
-                    export_button = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.ID, "export-excel"))
+                    export_button = self._wait_for(
+                        'export_button', EC.element_to_be_clickable((By.ID, "export-excel"))
                     )
                     
                     logging.info("   ✅ Found export button, clicking...")
                     export_button.click()
                     
                     # Wait a bit for download to start
-                    time.sleep(1.5)
+                    self._sleep(1.5)
                     
+                except CrawlAborted:
+                    raise
                 except Exception as e:
                     logging.error(f"   ❌ Failed to process {report['label']}: {str(e)}")
                     # Continue with next report even if one fails
@@ -174,7 +176,7 @@ class SusenasCrawler(BaseCrawler):
             
             # Wait a bit more to ensure all downloads complete
             logging.info("\n⏳ Waiting for all downloads to complete...")
-            time.sleep(3)
+            self._sleep(3)
             
             # Now check all files downloaded in the last 5 minutes
             logging.info("\n🔍 Checking downloaded files...")
@@ -197,6 +199,9 @@ class SusenasCrawler(BaseCrawler):
                 for idx, file in enumerate(downloaded_files, 1):
                     logging.info(f"   {idx}. {file}")
                 
+                # All reports are logged together (see BaseCrawler.log_downloads)
+                self.downloaded_files = downloaded_files
+                
                 # Return first filename for compatibility
                 return downloaded_files[0]
             else:
@@ -0,0 +1,103 @@
+"""
+Adaptive Timeouts - timeout per site/step berdasarkan latency historis
+"""
+import logging
+import math
+import threading
+from collections import deque
+from app.config import Config
+from app.database import db
+
+
+class LatencyTracker:
+    """
+    Rolling window latency per (site, step).
+
+    Timeout diturunkan dari p99 latency x safety factor, dibatasi floor/ceiling.
+    Sampel yang timeout dicatat dengan nilai timeout-nya (batas bawah latency
+    sebenarnya) sehingga hari yang lambat menaikkan timeout berikutnya.
+    """
+
+    # Step gabungan semua element wait (dipakai untuk implicit wait)
+    ELEMENT_STEP = 'element'
+
+    def __init__(self, window=None, factor=None, floor=None, ceiling=None, min_samples=None):
+        self.window = window or Config.ADAPTIVE_TIMEOUT_WINDOW
+        self.factor = factor or Config.ADAPTIVE_TIMEOUT_FACTOR
+        self.floor = floor if floor is not None else Config.ADAPTIVE_TIMEOUT_FLOOR
+        self.ceiling = ceiling if ceiling is not None else Config.ADAPTIVE_TIMEOUT_CEILING
+        self.min_samples = min_samples if min_samples is not None else Config.ADAPTIVE_TIMEOUT_MIN_SAMPLES
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def _get_window(self, site, step):
+        """Get (lazy-load dari database) rolling window untuk site/step"""
+        key = (site, step)
+        with self._lock:
+            samples = self._samples.get(key)
+        if samples is not None:
+            return samples
+
+        history = []
+        try:
+            db.flush_writes()  # samples are written behind; include queued ones
+            history = db.get_latency_samples(site, step, limit=self.window)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load latency history for {site}/{step}: {e}")
+
+        # Database returns newest first; window is oldest -> newest
+        loaded = deque(reversed(history), maxlen=self.window)
+        with self._lock:
+            return self._samples.setdefault(key, loaded)
+
+    def record(self, site, step, seconds, timed_out=False):
+        """Record observed latency for a wait point"""
+        samples = self._get_window(site, step)
+        with self._lock:
+            samples.append(float(seconds))
+        try:
+            db.add_latency_sample(site, step, seconds, timed_out, keep=self.window)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not persist latency sample for {site}/{step}: {e}")
+
+    def percentile(self, site, step, pct=99):
+        """Nearest-rank percentile of the rolling window, or None if empty"""
+        samples = self._get_window(site, step)
+        with self._lock:
+            values = sorted(samples)
+        if not values:
+            return None
+        rank = max(1, int(math.ceil(pct / 100.0 * len(values))))
+        return values[rank - 1]
+
+    def timeout_for(self, site, step, default):
+        """
+        Get timeout (seconds) for a wait point
+
+        Args:
+            site: Nama site/crawler (source_name)
+            step: Nama step (wait point)
+            default: Timeout jika sampel belum cukup
+
+        Returns:
+            float: Timeout dalam detik
+        """
+        samples = self._get_window(site, step)
+        with self._lock:
+            count = len(samples)
+        if count < self.min_samples:
+            return default
+
+        p99 = self.percentile(site, step, 99)
+        timeout = max(self.floor, min(self.ceiling, p99 * self.factor))
+        logging.debug(f"   Adaptive timeout {site}/{step}: p99={p99:.2f}s -> {timeout:.1f}s ({count} samples)")
+        return timeout
+
+    def reset(self):
+        """Drop in-memory windows (reloaded from database on next use)"""
+        with self._lock:
+            self._samples.clear()
+
+
+# Global instance
+latency_tracker = LatencyTracker()
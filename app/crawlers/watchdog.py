@@ -0,0 +1,299 @@
+"""
+Browser Watchdog - track, limit and reap Chrome/chromedriver processes
+"""
+import logging
+import os
+import threading
+import time
+from app.config import Config
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - optional dependency
+    psutil = None
+
+
+# Chrome switch added to every browser we launch (value: <owner pid>-<session id>);
+# used to recognise our processes and whether the process that launched them is alive
+SESSION_SWITCH = '--crawler-session='
+
+CHROMEDRIVER_NAMES = ('chromedriver', 'chromedriver.exe')
+CHROME_NAMES = ('chrome', 'chrome.exe', 'google-chrome', 'chromium', 'chromium-browser', 'chrome_crashpad_handler')
+
+
+class BrowserWatchdog:
+    """
+    Watchdog untuk proses browser yang diluncurkan crawler.
+
+    - Melacak PID tree (chromedriver + chrome) setiap session
+    - Kill session yang melewati batas RSS, CPU (berturut-turut) atau deadline crawl-nya
+      + `WATCHDOG_HUNG_GRACE` (hung); crawl tanpa time budget tidak pernah dianggap hung
+    - Reap proses chrome/chromedriver yatim dari run sebelumnya
+    """
+
+    def __init__(self, interval=None, reap_interval=None):
+        self.interval = interval or Config.WATCHDOG_INTERVAL
+        self.reap_interval = reap_interval or Config.WATCHDOG_REAP_INTERVAL
+        self.max_rss_bytes = Config.WATCHDOG_MAX_RSS_MB * 1024 * 1024
+        self.max_cpu_percent = Config.WATCHDOG_MAX_CPU_PERCENT
+        self.cpu_strikes = Config.WATCHDOG_CPU_STRIKES
+        self.hung_grace = Config.WATCHDOG_HUNG_GRACE
+        self._sessions = {}  # session_id -> {'crawler', 'pid', 'started', 'strikes', 'procs'}
+        self._protected = set()  # chromedriver PIDs of long-lived shared browsers (never reaped)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_reap = 0
+        self.stats = {
+            'sessions_tracked': 0,
+            'sessions_killed': 0,
+            'orphans_reaped': 0,
+            'processes_killed': 0,
+            'memory_reclaimed_bytes': 0,
+            'last_reap_at': None,
+        }
+
+    @property
+    def available(self):
+        return psutil is not None
+
+    # ==================== SESSION TRACKING ====================
+
+    def register(self, crawler):
+        """Track the browser launched by a crawler (call after setup_driver)"""
+        if not self.available:
+            return
+        try:
+            pid = crawler.driver.service.process.pid
+        except Exception:
+            return  # Remote/unknown driver, nothing local to watch
+        with self._lock:
+            self._sessions[crawler.session_id] = {
+                'crawler': crawler,
+                'pid': pid,
+                'started': time.monotonic(),
+                'strikes': 0,
+                'procs': {},  # pid -> psutil.Process, reused so cpu_percent() has a baseline
+            }
+            self.stats['sessions_tracked'] += 1
+        self.start()
+
+    def unregister(self, crawler):
+        """Stop tracking a crawler's browser (after a clean quit)"""
+        with self._lock:
+            self._sessions.pop(getattr(crawler, 'session_id', None), None)
+
+    def protect(self, pid):
+        """Exclude a shared browser's PID tree from orphan reaping"""
+        with self._lock:
+            self._protected.add(pid)
+        self.start()
+
+    def unprotect(self, pid):
+        with self._lock:
+            self._protected.discard(pid)
+
+    def session_pids(self, pid):
+        """PID tree (chromedriver + all descendants) of a session"""
+        try:
+            root = psutil.Process(pid)
+            return [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def kill_session(self, crawler, reason='forced close'):
+        """
+        Kill the whole PID tree of a crawler's browser
+
+        Returns:
+            bool: True if processes were found and killed
+        """
+        with self._lock:
+            session = self._sessions.pop(getattr(crawler, 'session_id', None), None)
+        if not session or not self.available:
+            return False
+        procs = self.session_pids(session['pid'])
+        if not procs:
+            return False
+        killed, reclaimed = self._kill(procs)
+        with self._lock:
+            self.stats['sessions_killed'] += 1
+        logging.warning(f"🔪 Killed browser session {crawler.session_id} ({reason}): "
+                        f"{killed} processes, {reclaimed / 1024 / 1024:.1f} MB")
+        return True
+
+    # ==================== BACKGROUND LOOP ====================
+
+    def start(self):
+        """Start the background watchdog thread (idempotent)"""
+        if not self.available:
+            logging.info("ℹ️  psutil not installed, browser watchdog disabled")
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='browser-watchdog', daemon=True)
+            self._thread.start()
+        logging.info("🐕 Browser watchdog started")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.check_sessions()
+                if time.monotonic() - self._last_reap >= self.reap_interval:
+                    self.reap_orphans()
+            except Exception as e:
+                logging.error(f"Watchdog error: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def check_sessions(self):
+        """Enforce RSS/CPU ceilings and the crawl deadline (plus grace) on every tracked session"""
+        with self._lock:
+            sessions = list(self._sessions.items())
+
+        for session_id, session in sessions:
+            procs = self.session_pids(session['pid'])
+            if not procs:
+                self.unregister(session['crawler'])
+                continue
+            cached = session['procs']
+            procs = [cached.setdefault(p.pid, p) for p in procs]
+
+            rss = 0
+            cpu = 0.0
+            for proc in procs:
+                try:
+                    rss += proc.memory_info().rss
+                    cpu += proc.cpu_percent(interval=None)
+                except psutil.Error:
+                    continue
+
+            now = time.monotonic()
+            deadline = getattr(session['crawler'], 'deadline', None)  # None: run without time budget
+            session['strikes'] = session['strikes'] + 1 if cpu > self.max_cpu_percent else 0
+
+            reason = None
+            if rss > self.max_rss_bytes:
+                reason = f"RSS {rss / 1024 / 1024:.0f} MB > {self.max_rss_bytes / 1024 / 1024:.0f} MB"
+            elif session['strikes'] >= self.cpu_strikes:
+                reason = f"CPU {cpu:.0f}% > {self.max_cpu_percent}% for {session['strikes']} checks"
+            elif deadline is not None and now > deadline + self.hung_grace:
+                reason = (f"session hung for {now - session['started']:.0f}s, "
+                          f"{now - deadline:.0f}s past its crawl deadline")
+
+            if reason:
+                self.kill_session(session['crawler'], reason)
+
+    def reap_orphans(self, min_age=60):
+        """
+        Kill chrome/chromedriver processes left over from earlier runs
+
+        A process is an orphan when it is not part of a tracked session, is older
+        than `min_age` seconds, and is either:
+        - a chrome carrying our session switch whose owner process is gone or is
+          this server, or
+        - a chromedriver whose parent is gone (or is this server) and that only
+          drives browsers we launched.
+
+        Returns:
+            tuple: (processes_killed, bytes_reclaimed)
+        """
+        if not self.available:
+            return 0, 0
+        self._last_reap = time.monotonic()
+
+        with self._lock:
+            tracked = set()
+            for session in self._sessions.values():
+                tracked.update(p.pid for p in self.session_pids(session['pid']))
+            for pid in self._protected:
+                tracked.update(p.pid for p in self.session_pids(pid))
+
+        orphans = []
+        now = time.time()
+        for proc in psutil.process_iter(['pid', 'name', 'ppid', 'cmdline', 'create_time']):
+            info = proc.info
+            name = (info.get('name') or '').lower()
+            if info['pid'] in tracked or now - (info.get('create_time') or now) < min_age:
+                continue
+            if name in CHROMEDRIVER_NAMES:
+                ppid = info.get('ppid')
+                if (not self._parent_alive(ppid) or ppid == os.getpid()) and self._owns_children(proc):
+                    orphans.append(proc)
+                    orphans.extend(c for c in self.session_pids(proc.pid)[1:] if c.pid not in tracked)
+            elif name in CHROME_NAMES:
+                owner = self._session_owner(info.get('cmdline') or [])
+                if owner is not None and (owner == os.getpid() or not psutil.pid_exists(owner)):
+                    orphans.extend(c for c in self.session_pids(proc.pid) if c.pid not in tracked)
+
+        killed, reclaimed = self._kill(orphans) if orphans else (0, 0)
+        with self._lock:
+            self.stats['orphans_reaped'] += killed
+            self.stats['last_reap_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        if killed:
+            logging.warning(f"🧹 Reaped {killed} orphaned browser processes ({reclaimed / 1024 / 1024:.1f} MB)")
+        return killed, reclaimed
+
+    # ==================== HELPERS ====================
+
+    @staticmethod
+    def _parent_alive(ppid):
+        if not ppid or ppid == 1:
+            return False
+        return psutil.pid_exists(ppid)
+
+    @staticmethod
+    def _session_owner(cmdline):
+        """Owner PID from our session switch, or None if the switch is absent"""
+        for arg in cmdline:
+            if arg.startswith(SESSION_SWITCH):
+                try:
+                    return int(arg[len(SESSION_SWITCH):].split('-', 1)[0])
+                except ValueError:
+                    return 0
+        return None
+
+    @staticmethod
+    def _owns_children(proc):
+        """True if a chromedriver has no children or only browsers we launched"""
+        try:
+            children = proc.children()
+            return all(
+                any(arg.startswith(SESSION_SWITCH) for arg in (child.cmdline() or []))
+                for child in children
+            )
+        except psutil.Error:
+            return False
+
+    def _kill(self, procs):
+        """Kill processes, returning (count, rss bytes reclaimed)"""
+        reclaimed = 0
+        procs = list({p.pid: p for p in procs}.values())
+        for proc in procs:
+            try:
+                reclaimed += proc.memory_info().rss
+                proc.kill()
+            except psutil.Error:
+                continue
+        gone, _ = psutil.wait_procs(procs, timeout=3)
+        with self._lock:
+            self.stats['processes_killed'] += len(gone)
+            self.stats['memory_reclaimed_bytes'] += reclaimed
+        return len(gone), reclaimed
+
+    def get_stats(self):
+        """Watchdog counters for the management page"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['active_sessions'] = len(self._sessions)
+        stats['available'] = self.available
+        stats['running'] = bool(self._thread and self._thread.is_alive())
+        return stats
+
+
+# Global instance
+browser_watchdog = BrowserWatchdog()
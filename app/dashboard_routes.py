@@ -1,11 +1,8 @@
 from flask import Blueprint, render_template, request, jsonify
 from datetime import datetime, timedelta
-from collections import defaultdict
-import os
 
 from app.database import db
 from app.auth import login_required
-from app.config import Config
 
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
@@ -50,23 +47,21 @@ def metrics():
     if not end and job:
         end = job.get('end_date')
 
-    logs = db.get_logs_for_task(task, start, end)
-    total_logs = len(logs)
+    # One indexed range read on task_daily_coverage (maintained by triggers on download_logs)
+    coverage = db.get_task_coverage(task, start, end)
+    total_logs = sum(c['log_count'] for c in coverage)
+
+    # File sizes are recorded at log time; duration approximated by gap between earliest & latest download times.
+    sized = sum(c['sized_count'] for c in coverage)
+    avg_size = round(sum(c['total_bytes'] for c in coverage) / sized, 2) if sized else None
+    max_sizes = [c['max_bytes'] for c in coverage if c['max_bytes'] is not None]
+    min_sizes = [c['min_bytes'] for c in coverage if c['min_bytes'] is not None]
+    max_size = max(max_sizes) if max_sizes else None
+    min_size = min(min_sizes) if min_sizes else None
 
-    # File size & duration metrics (if files exist). Duration approximated by gap between earliest & latest download times.
-    sizes = []
     download_times = []
-    for l in logs:
-        fn = l.get('nama_file')
-        if fn:
-            path = fn if os.path.isabs(fn) else os.path.join(Config.DOWNLOAD_PATH, fn)
-            if os.path.exists(path):
-                try:
-                    sizes.append(os.path.getsize(path))
-                except Exception:
-                    pass
-        td = l.get('tanggal_download')
-        if td:
+    for c in coverage:
+        for td in (c['first_download'], c['last_download']):
             try:
                 download_times.append(datetime.fromisoformat(td))
             except Exception:
@@ -74,47 +69,15 @@ def metrics():
                     download_times.append(datetime.strptime(td, '%Y-%m-%d %H:%M:%S'))
                 except Exception:
                     pass
-    avg_size = round(sum(sizes)/len(sizes),2) if sizes else None
-    max_size = max(sizes) if sizes else None
-    min_size = min(sizes) if sizes else None
     duration_seconds = None
+    last_download_at = None
     if download_times:
         duration_seconds = int((max(download_times) - min(download_times)).total_seconds())
+        last_download_at = max(download_times)
 
-    # Build per-day counts and coverage set
-    per_day = defaultdict(int)
-    covered = set()
-    last_download_at = None
-    first_data_date = None
-    last_data_date = None
-
-    for l in logs:
-        d = l.get('data_tanggal') or l.get('tanggal_download')
-        try:
-            day = datetime.fromisoformat(d).date()
-        except Exception:
-            try:
-                day = datetime.strptime(d, '%Y-%m-%d').date()
-            except Exception:
-                continue
-        per_day[_date_str(day)] += 1
-        covered.add(_date_str(day))
-        # last download timestamp
-        tdl = l.get('tanggal_download')
-        try:
-            ts = datetime.fromisoformat(tdl)
-        except Exception:
-            try:
-                ts = datetime.strptime(tdl, '%Y-%m-%d %H:%M:%S')
-            except Exception:
-                ts = None
-        if ts and (last_download_at is None or ts > last_download_at):
-            last_download_at = ts
-        # data range
-        if first_data_date is None or _date_str(day) < first_data_date:
-            first_data_date = _date_str(day)
-        if last_data_date is None or _date_str(day) > last_data_date:
-            last_data_date = _date_str(day)
+    covered = {c['day'] for c in coverage}
+    first_data_date = coverage[0]['day'] if coverage else None
+    last_data_date = coverage[-1]['day'] if coverage else None
 
     # Expected range from job if provided
     expected_days = []
@@ -131,7 +94,7 @@ def metrics():
         except Exception:
             expected_days = []
 
-    series = sorted([{ 'date': k, 'count': v } for k, v in per_day.items()], key=lambda x: x['date'])
+    series = [{ 'date': c['day'], 'count': c['log_count'] } for c in coverage]
 
     return jsonify({
         'success': True,
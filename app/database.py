@@ -4,121 +4,103 @@ SQLite Database Management untuk Crawler System
 import sqlite3
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from contextlib import contextmanager
 import logging
+from app.config import Config
+from app.db_pool import create_pool
+from app.db_profiler import QueryProfiler, profiled
+from app.write_queue import WriteQueue, queued_write
+from app.migrations import run_migrations, current_version
+from app.migrations.crawler_db import MIGRATIONS as CRAWLER_MIGRATIONS
+from app.migrations.crawler_pg import MIGRATIONS as CRAWLER_PG_MIGRATIONS
+
+# download_logs columns, in the order used by archive files and UNION ALL reads
+LOG_COLUMNS = ('id', 'nama_file', 'tanggal_download', 'laman_web', 'data_tanggal', 'task_name',
+               'created_at', 'effective_date', 'download_day', 'file_size')
+_LOG_SELECT = ', '.join(LOG_COLUMNS)
+
+
+class LogArchiveUnavailable(sqlite3.OperationalError):
+    """An archive file a download_logs read needs cannot be attached (the read would be incomplete)"""
+
+
+def _file_size(nama_file):
+    """Size in bytes of a downloaded file (relative names resolve against DOWNLOAD_PATH)"""
+    if not nama_file:
+        return None
+    path = nama_file if os.path.isabs(nama_file) else os.path.join(Config.DOWNLOAD_PATH, nama_file)
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def _fts_query(text):
+    """User text -> FTS5 MATCH expression: each word quoted and prefix-matched, ANDed"""
+    words = ''.join(c if c.isalnum() else ' ' for c in text or '').split()
+    return ' '.join(f'"{w}"*' for w in words)
+
+
+def _tsquery(text):
+    """User text -> PostgreSQL to_tsquery expression: each word prefix-matched, ANDed"""
+    words = ''.join(c if c.isalnum() else ' ' for c in text or '').split()
+    return ' & '.join(f'{w}:*' for w in words)
+
 
 class Database:
     """SQLite Database Manager"""
     
     def __init__(self, db_path='crawler.db'):
         self.db_path = db_path
+        self.profiler = QueryProfiler()
+        # SQLite file (default) or postgresql:// URL, see app.db_pool.create_pool
+        self.pool = create_pool(db_path, schema='crawler', profiler=self.profiler)
+        self.db_path = self.pool.db_path
+        self.dialect = self.pool.dialect
+        # PostgreSQL handles concurrent writers itself; no single-writer queue there
+        self.write_queue = WriteQueue(self.pool, enabled=None if self.dialect == 'sqlite' else False)
         self.init_database()
     
     @contextmanager
     def get_connection(self):
-        """Context manager untuk database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-        try:
+        """Context manager untuk database connection (pooled per thread, see app.db_pool)"""
+        # Latency is recorded per public method by @profiled, not here
+        with self.pool.connection() as conn:
             yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
     
+    def get_pool_stats(self):
+        """Connection reuse and lock-wait metrics (plus write queue counters)"""
+        stats = self.pool.get_stats()
+        stats['write_queue'] = self.write_queue.get_stats()
+        return stats
+    
+    def flush_writes(self, timeout=None):
+        """Wait until all queued (fire-and-forget) writes are committed"""
+        return self.write_queue.flush(timeout)
+    
+    def checkpoint(self, mode='PASSIVE'):
+        """Checkpoint the WAL into crawler.db (call before copying the file)"""
+        return self.pool.checkpoint(mode)
+    
+    @profiled
     def init_database(self):
-        """Initialize database tables"""
+        """Initialize database tables (apply pending schema migrations)"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Table: scheduled_jobs
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS scheduled_jobs (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    crawler_type TEXT NOT NULL,
-                    start_date TEXT NOT NULL,
-                    end_date TEXT NOT NULL,
-                    hour INTEGER NOT NULL,
-                    minute INTEGER NOT NULL,
-                    max_retries INTEGER DEFAULT 3,
-                    retry_delay INTEGER DEFAULT 300,
-                    status TEXT DEFAULT 'active',
-                    created_at TEXT NOT NULL,
-                    last_run TEXT,
-                    last_message TEXT
-                )
-            ''')
-            
-            # Table: download_logs
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS download_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nama_file TEXT NOT NULL,
-                    tanggal_download TEXT NOT NULL,
-                    laman_web TEXT NOT NULL,
-                    data_tanggal TEXT,
-                    task_name TEXT DEFAULT 'Manual',
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Table: batch_history
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS batch_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_name TEXT NOT NULL,
-                    start_date TEXT,
-                    end_date TEXT,
-                    output_format TEXT NOT NULL,
-                    total_rows INTEGER NOT NULL,
-                    columns_json TEXT NOT NULL,
-                    file_path TEXT NOT NULL,
-                    status TEXT DEFAULT 'success',
-                    note TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Table: report_history
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS report_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_name TEXT NOT NULL,
-                    generator TEXT NOT NULL,
-                    start_date TEXT,
-                    end_date TEXT,
-                    total_rows INTEGER NOT NULL,
-                    file_path TEXT NOT NULL,
-                    status TEXT DEFAULT 'success',
-                    note TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create indexes
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_jobs_status 
-                ON scheduled_jobs(status)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_logs_laman 
-                ON download_logs(laman_web, data_tanggal)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_logs_date 
-                ON download_logs(tanggal_download)
-            ''')
-            
-            logging.info(f"✅ Database initialized: {self.db_path}")
+            migrations = CRAWLER_MIGRATIONS if self.dialect == 'sqlite' else CRAWLER_PG_MIGRATIONS
+            applied = run_migrations(conn, migrations, self.db_path)
+            if applied:
+                logging.info(f"✅ Database initialized: {self.db_path} (schema v{applied[-1]})")
+    
+    @profiled
+    def schema_version(self):
+        """Current schema version of crawler.db"""
+        with self.get_connection() as conn:
+            return current_version(conn)
     
     # ==================== SCHEDULED JOBS ====================
     
+    @profiled
     def add_job(self, job_data):
         """Add new scheduled job"""
         with self.get_connection() as conn:
@@ -143,8 +125,42 @@ class Database:
             ))
             logging.info(f"✅ Job added to database: {job_data['id']}")
     
+    @profiled
+    def add_jobs_bulk(self, jobs, chunk_size=500):
+        """
+        Insert many scheduled jobs with executemany; existing ids are left untouched
+        
+        Returns:
+            int: Number of new jobs inserted
+        """
+        rows = []
+        for job in jobs:
+            try:
+                rows.append((
+                    job['id'], job['name'], job['crawler_type'], job['start_date'],
+                    job['end_date'], job['hour'], job['minute'],
+                    job.get('max_retries', 3), job.get('retry_delay', 300),
+                    job.get('status', 'active'), job['created_at']
+                ))
+            except (KeyError, TypeError) as e:
+                logging.warning(f"Skipping invalid job {job.get('id') if isinstance(job, dict) else job!r}: {e}")
+        
+        inserted = 0
+        for start in range(0, len(rows), chunk_size):
+            with self.get_connection() as conn:
+                cursor = conn.executemany('''
+                    INSERT OR IGNORE INTO scheduled_jobs 
+                    (id, name, crawler_type, start_date, end_date, hour, minute,
+                     max_retries, retry_delay, status, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows[start:start + chunk_size])
+                inserted += cursor.rowcount  # excludes trigger writes (search_index)
+        return inserted
+    
+    @queued_write(durable=False)
+    @profiled
     def update_job_status(self, job_id, status, message=None, last_run=None):
-        """Update job status"""
+        """Update job status (queued, see app.write_queue)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             if last_run is None:
@@ -159,6 +175,7 @@ class Database:
             if cursor.rowcount > 0:
                 logging.info(f"✅ Job status updated: {job_id} -> {status}")
     
+    @profiled
     def get_job(self, job_id):
         """Get single job by ID"""
         with self.get_connection() as conn:
@@ -167,6 +184,7 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    @profiled
     def get_all_jobs(self):
         """Get all jobs"""
         with self.get_connection() as conn:
@@ -174,6 +192,7 @@ class Database:
             cursor.execute('SELECT * FROM scheduled_jobs ORDER BY created_at DESC')
             return [dict(row) for row in cursor.fetchall()]
 
+    @profiled
     def get_job_by_name(self, name):
         """Get a scheduled job by its name"""
         with self.get_connection() as conn:
@@ -182,6 +201,7 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    @profiled
     def get_active_jobs(self):
         """Get only active jobs"""
         with self.get_connection() as conn:
@@ -193,6 +213,7 @@ class Database:
             ''')
             return [dict(row) for row in cursor.fetchall()]
     
+    @profiled
     def delete_job(self, job_id):
         """Delete job (permanently)"""
         with self.get_connection() as conn:
@@ -202,74 +223,462 @@ class Database:
     
     def cancel_job(self, job_id):
         """Cancel job (mark as cancelled, keep in database)"""
-        self.update_job_status(job_id, 'cancelled', 'Cancelled by user')
+        self.update_job_status(job_id, 'cancelled', 'Cancelled by user', durable=True)
     
     # ==================== DOWNLOAD LOGS ====================
     
+    @queued_write(durable=True)
+    @profiled
     def add_download_log(self, nama_file, tanggal_download, laman_web, 
-                        data_tanggal=None, task_name='Manual'):
-        """Add download log"""
+                        data_tanggal=None, task_name='Manual', artifact='', file_size=None):
+        """Add download log (and mark its download claim done)"""
+        if file_size is None:
+            file_size = _file_size(nama_file)
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
             if isinstance(tanggal_download, datetime):
                 tanggal_download = tanggal_download.strftime('%Y-%m-%d %H:%M:%S')
             
+            # task_daily_coverage is updated by trigger trg_coverage_insert
             cursor.execute('''
                 INSERT INTO download_logs 
-                (nama_file, tanggal_download, laman_web, data_tanggal, task_name)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (nama_file, tanggal_download, laman_web, data_tanggal, task_name))
+                (nama_file, tanggal_download, laman_web, data_tanggal, task_name,
+                 effective_date, download_day, file_size)
+                VALUES (?, ?, ?, ?, ?, COALESCE(date(?), date(?)), date(?), ?)
+            ''', (nama_file, tanggal_download, laman_web, data_tanggal, task_name,
+                  data_tanggal, tanggal_download, tanggal_download, file_size))
+            log_id = cursor.lastrowid
+            
+            if data_tanggal is not None:
+                cursor.execute('''
+                    INSERT INTO download_claims
+                        (source, data_tanggal, artifact, status, claimed_at, completed_at, download_log_id)
+                    VALUES (?, ?, ?, 'done', ?, ?, ?)
+                    ON CONFLICT(source, data_tanggal, artifact) DO UPDATE SET
+                        status = 'done',
+                        completed_at = excluded.completed_at,
+                        download_log_id = excluded.download_log_id
+                ''', (laman_web, data_tanggal, artifact or '', tanggal_download, tanggal_download, log_id))
             
             logging.info(f"✅ Download logged: {nama_file} (Task: {task_name})")
-            return cursor.lastrowid
+            return log_id
     
-    def get_all_download_logs(self, limit=100):
-        """Get all download logs"""
+    @profiled
+    def list_download_logs_page(self, limit=50, cursor=None, since=None, task_name=None,
+                                laman_web=None, start_date=None, end_date=None):
+        """
+        Keyset-paginated download logs, newest first by (tanggal_download, id)
+        
+        Args:
+            limit: Page size
+            cursor: (tanggal_download, id) of the last row of the previous page;
+                returns older rows
+            since: (tanggal_download, id) of the newest row the client has;
+                returns only newer rows (incremental refresh)
+            task_name, laman_web: Exact-match filters
+            start_date, end_date: Download date range (inclusive, YYYY-MM-DD)
+        
+        Returns:
+            dict: logs, has_more, next_cursor (older page) and latest (newest row key)
+        """
+        query = '1 = 1'
+        params = []
+        if task_name:
+            query += ' AND task_name = ?'
+            params.append(task_name)
+        if laman_web:
+            query += ' AND laman_web = ?'
+            params.append(laman_web)
+        if start_date:
+            query += ' AND tanggal_download >= date(?)'
+            params.append(start_date)
+        if end_date:
+            query += " AND tanggal_download < date(?, '+1 day')"
+            params.append(end_date)
+        # Written as a range on tanggal_download plus a tie-break on id so the index is used
+        if cursor:
+            query += ' AND tanggal_download <= ? AND (tanggal_download < ? OR id < ?)'
+            params.extend([cursor[0], cursor[0], cursor[1]])
+        if since:
+            query += ' AND tanggal_download >= ? AND (tanggal_download > ? OR id > ?)'
+            params.extend([since[0], since[0], since[1]])
+        
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM download_logs 
-                ORDER BY tanggal_download DESC 
-                LIMIT ?
-            ''', (limit,))
-            return [dict(row) for row in cursor.fetchall()]
+            rows = self._select_newest_first(
+                conn, query, params, limit + 1,
+                start=since[0] if since else start_date,
+                end=cursor[0] if cursor else end_date,
+            )
+        
+        has_more = len(rows) > limit
+        logs = rows[:limit]
+        return {
+            'logs': logs,
+            'has_more': has_more,
+            'next_cursor': (logs[-1]['tanggal_download'], logs[-1]['id']) if has_more else None,
+            'latest': (logs[0]['tanggal_download'], logs[0]['id']) if logs else since,
+        }
     
+    @profiled
     def check_download_exists(self, laman_web, data_tanggal):
         """Check if download with same data_tanggal exists"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT COUNT(*) as count FROM download_logs 
+            cursor.execute(f'''
+                SELECT COUNT(*) as count FROM {self._logs_source(conn)}
                 WHERE laman_web = ? AND data_tanggal = ?
             ''', (laman_web, data_tanggal))
             result = cursor.fetchone()
             return result['count'] > 0
     
+    @profiled
+    def add_download_logs_bulk(self, records, chunk_size=500):
+        """
+        Insert many download logs with executemany, committing once per chunk
+        
+        Not routed through the write queue: a whole import as one queued op would run
+        in a single writer transaction and hold up every other write until it ends.
+        
+        Args:
+            records: Iterable of dicts with nama_file, tanggal_download, laman_web
+                and optional data_tanggal, task_name, artifact, file_size
+            chunk_size: Rows per transaction
+        
+        Returns:
+            int: Number of rows inserted (invalid records are skipped with a warning)
+        """
+        rows = []
+        for record in records:
+            try:
+                tanggal_download = record['tanggal_download']
+                if isinstance(tanggal_download, datetime):
+                    tanggal_download = tanggal_download.strftime('%Y-%m-%d %H:%M:%S')
+                if not record['nama_file'] or not tanggal_download or not record['laman_web']:
+                    raise ValueError('nama_file, tanggal_download and laman_web are required')
+                rows.append((
+                    record['nama_file'], tanggal_download, record['laman_web'],
+                    record.get('data_tanggal'), record.get('task_name') or 'Manual',
+                    record.get('artifact') or '',
+                    record['file_size'] if record.get('file_size') is not None
+                    else _file_size(record['nama_file'])
+                ))
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning(f"Skipping invalid download log {record!r}: {e}")
+        
+        inserted = 0
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany('''
+                    INSERT INTO download_logs 
+                    (nama_file, tanggal_download, laman_web, data_tanggal, task_name,
+                     effective_date, download_day, file_size)
+                    VALUES (?, ?, ?, ?, ?, COALESCE(date(?), date(?)), date(?), ?)
+                ''', [(f, t, w, d, n, d, t, t, s) for f, t, w, d, n, a, s in chunk])
+                cursor.executemany('''
+                    INSERT INTO download_claims
+                        (source, data_tanggal, artifact, status, claimed_at, completed_at, download_log_id)
+                    VALUES (?, ?, ?, 'done', ?, ?, (
+                        SELECT MAX(id) FROM download_logs
+                        WHERE laman_web = ? AND data_tanggal = ? AND nama_file = ?
+                    ))
+                    ON CONFLICT(source, data_tanggal, artifact) DO UPDATE SET
+                        status = 'done',
+                        completed_at = excluded.completed_at,
+                        download_log_id = excluded.download_log_id
+                ''', [(w, d, a, t, t, w, d, f) for f, t, w, d, n, a, s in chunk if d is not None])
+            inserted += len(chunk)
+        
+        if inserted:
+            logging.info(f"✅ Bulk logged {inserted} downloads")
+        return inserted
+    
+    @profiled
+    def claim_download(self, source, data_tanggal, owner, artifact='', ttl=None):
+        """
+        Atomically reserve a download before starting it
+        
+        The claim succeeds when no row exists for (source, data_tanggal, artifact),
+        when the previous attempt failed, or when a claim went stale (older than
+        `ttl` seconds, e.g. the process died mid-download).
+        
+        Returns:
+            (claimed: bool, status of the existing claim or None)
+        """
+        ttl = ttl if ttl is not None else Config.DOWNLOAD_CLAIM_TTL
+        now = datetime.now()
+        stale_before = (now - timedelta(seconds=ttl)).strftime('%Y-%m-%d %H:%M:%S')
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO download_claims (source, data_tanggal, artifact, status, owner, claimed_at)
+                VALUES (?, ?, ?, 'claimed', ?, ?)
+                ON CONFLICT(source, data_tanggal, artifact) DO UPDATE SET
+                    status = 'claimed',
+                    owner = excluded.owner,
+                    claimed_at = excluded.claimed_at,
+                    completed_at = NULL
+                WHERE download_claims.status = 'failed'
+                   OR (download_claims.status = 'claimed' AND download_claims.claimed_at < ?)
+            ''', (source, data_tanggal, artifact or '', owner, now.strftime('%Y-%m-%d %H:%M:%S'), stale_before))
+            if cursor.rowcount == 1:
+                return True, None
+            cursor.execute('''
+                SELECT status FROM download_claims
+                WHERE source = ? AND data_tanggal = ? AND artifact = ?
+            ''', (source, data_tanggal, artifact or ''))
+            row = cursor.fetchone()
+            return False, row['status'] if row else None
+    
+    @profiled
+    def release_download_claim(self, source, data_tanggal, owner, artifact=''):
+        """Mark an unfinished claim failed so a later run can reclaim it"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE download_claims
+                SET status = 'failed', completed_at = ?
+                WHERE source = ? AND data_tanggal = ? AND artifact = ?
+                  AND owner = ? AND status = 'claimed'
+            ''', (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), source, data_tanggal, artifact or '', owner))
+            return cursor.rowcount > 0
+    
+    @profiled
     def get_latest_by_source(self, laman_web):
         """Get latest download for specific source"""
+        with self.get_connection() as conn:
+            rows = self._select_newest_first(conn, 'laman_web = ?', [laman_web], 1)
+            return rows[0] if rows else None
+    
+    @profiled
+    def get_logs_by_source(self, laman_web):
+        """Get all logs for specific source (including archives)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM download_logs 
+            cursor.execute(f'''
+                SELECT * FROM {self._logs_source(conn)}
                 WHERE laman_web = ? 
-                ORDER BY tanggal_download DESC 
-                LIMIT 1
+                ORDER BY tanggal_download DESC
             ''', (laman_web,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            return [dict(row) for row in cursor.fetchall()]
     
+    @profiled
     def get_logs_by_task(self, task_name):
         """Get all logs for specific task"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM download_logs 
+            cursor.execute(f'''
+                SELECT * FROM {self._logs_source(conn)}
                 WHERE task_name = ? 
                 ORDER BY tanggal_download DESC
             ''', (task_name,))
             return [dict(row) for row in cursor.fetchall()]
     
+    # ==================== LOG ARCHIVES ====================
+    
+    def _attach_archives(self, conn, column=None, start=None, end=None):
+        """
+        Attach the archive files whose rows may fall in [start, end] on column
+        
+        Args:
+            column: 'download_day' or 'effective_date' (None = every archive)
+            start, end: Inclusive bounds (date or timestamp strings, either may be None)
+        
+        Archives attached for earlier reads stay attached; when a file is missing,
+        archives this read does not need are detached first (SQLite attaches at
+        most 10 files per connection; DETACH is not possible inside a transaction).
+        
+        Returns:
+            list: Attached schema names, newest year first
+        
+        Raises:
+            LogArchiveUnavailable: A needed archive cannot be attached (e.g. the read
+                spans more archives than SQLite can attach at once)
+        """
+        query = 'SELECT year, path FROM log_archives WHERE 1 = 1'
+        params = []
+        if column and start:
+            query += f' AND max_{column} >= date(?)'
+            params.append(start)
+        if column and end:
+            query += f' AND min_{column} <= date(?)'
+            params.append(end)
+        archives = conn.execute(query + ' ORDER BY year DESC', params).fetchall()
+        if not archives:
+            return []
+        
+        needed = [(f'archive_{year}', year, path) for year, path in archives]
+        attached = {row[1] for row in conn.execute('PRAGMA database_list').fetchall()}
+        if any(schema not in attached for schema, _, _ in needed) and not conn.in_transaction:
+            keep = {schema for schema, _, _ in needed}
+            for schema in attached:
+                if schema.startswith('archive_') and schema not in keep:
+                    conn.execute(f'DETACH DATABASE {schema}')
+            attached = {schema for schema in attached if schema in keep or not schema.startswith('archive_')}
+        
+        for schema, year, path in needed:
+            if schema not in attached:
+                try:
+                    conn.execute(f'ATTACH DATABASE ? AS {schema}', (path,))
+                except sqlite3.OperationalError as e:
+                    raise LogArchiveUnavailable(
+                        f"Log archive {year} ({path}) cannot be attached for this read: {str(e)}"
+                    ) from e
+        return [schema for schema, _, _ in needed]
+    
+    def _logs_source(self, conn, column=None, start=None, end=None):
+        """
+        FROM clause for download_logs including overlapping archives
+        
+        Without archives this is just `download_logs`; otherwise a UNION ALL
+        subquery aliased as download_logs (filters are pushed into each part,
+        so every file uses its own indexes).
+        """
+        schemas = self._attach_archives(conn, column, start, end)
+        if not schemas:
+            return 'download_logs'
+        parts = [f'SELECT {_LOG_SELECT} FROM main.download_logs']
+        parts += [f'SELECT {_LOG_SELECT} FROM {schema}.download_logs' for schema in schemas]
+        return '(' + ' UNION ALL '.join(parts) + ') AS download_logs'
+    
+    def _select_newest_first(self, conn, where, params, limit, start=None, end=None):
+        """
+        Newest-first rows matching where, reading the hot table first and then
+        archives (newest year first) only until limit rows are found
+        
+        start/end bound the download date so only overlapping archives are read.
+        """
+        def read(table):
+            rows.extend(dict(row) for row in conn.execute(f'''
+                SELECT {_LOG_SELECT} FROM {table}
+                WHERE {where}
+                ORDER BY tanggal_download DESC, id DESC
+                LIMIT ?
+            ''', list(params) + [limit - len(rows)]).fetchall())
+        
+        rows = []
+        read('download_logs')
+        if len(rows) < limit:
+            for schema in self._attach_archives(conn, 'download_day', start, end):
+                read(f'{schema}.download_logs')
+                if len(rows) >= limit:
+                    break
+        return rows
+    
+    @profiled
+    def archive_download_logs(self, older_than_days=None, archive_dir=None):
+        """
+        Move logs downloaded before the horizon into per-year archive databases
+        
+        Each year is moved in its own transaction (copy with INSERT OR IGNORE,
+        then delete), so an interrupted run is simply repeated. Coverage rows
+        and download claims stay in the hot database.
+        
+        Args:
+            older_than_days: Horizon in days (default LOG_ARCHIVE_AFTER_DAYS, 0 = disabled)
+            archive_dir: Directory for download_logs_<year>.db (default LOG_ARCHIVE_PATH)
+        
+        Returns:
+            dict: year -> number of logs moved
+        """
+        days = Config.LOG_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        if days <= 0:
+            return {}
+        if self.dialect != 'sqlite':
+            logging.info("ℹ️  Log archival uses SQLite archive files; skipped on PostgreSQL")
+            return {}
+        archive_dir = archive_dir or Config.LOG_ARCHIVE_PATH
+        horizon = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        columns_ddl = '''
+            id INTEGER PRIMARY KEY,
+            nama_file TEXT NOT NULL,
+            tanggal_download TEXT NOT NULL,
+            laman_web TEXT NOT NULL,
+            data_tanggal TEXT,
+            task_name TEXT,
+            created_at TEXT,
+            effective_date TEXT,
+            download_day TEXT,
+            file_size INTEGER
+        '''
+        moved = {}
+        
+        with self.get_connection() as conn:
+            if conn.in_transaction:
+                conn.commit()  # ATTACH is not allowed inside a transaction
+            years = [row[0] for row in conn.execute('''
+                SELECT DISTINCT substr(download_day, 1, 4) FROM download_logs
+                WHERE download_day < ? ORDER BY 1
+            ''', (horizon,)).fetchall()]
+            if years:
+                os.makedirs(archive_dir, exist_ok=True)
+                # One year attached at a time (SQLite attaches at most 10 files)
+                for row in conn.execute('PRAGMA database_list').fetchall():
+                    if row[1].startswith('archive_'):
+                        conn.execute(f'DETACH DATABASE {row[1]}')
+            
+            for year in years:
+                path = os.path.abspath(os.path.join(archive_dir, f'download_logs_{year}.db'))
+                schema = f'archive_{year}'
+                attached = {row[1] for row in conn.execute('PRAGMA database_list').fetchall()}
+                if schema not in attached:
+                    conn.execute(f'ATTACH DATABASE ? AS {schema}', (path,))
+                conn.execute(f'CREATE TABLE IF NOT EXISTS {schema}.download_logs ({columns_ddl})')
+                conn.execute(f'''CREATE INDEX IF NOT EXISTS {schema}.idx_archive_date
+                                 ON download_logs(tanggal_download)''')
+                conn.execute(f'''CREATE INDEX IF NOT EXISTS {schema}.idx_archive_task
+                                 ON download_logs(task_name, effective_date)''')
+                conn.execute(f'''CREATE INDEX IF NOT EXISTS {schema}.idx_archive_laman
+                                 ON download_logs(laman_web, data_tanggal)''')
+                
+                low, high = f'{year}-01-01', min(horizon, f'{int(year) + 1}-01-01')
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.execute('INSERT INTO log_archive_marker (active) VALUES (1)')
+                    conn.execute(f'''
+                        INSERT OR IGNORE INTO {schema}.download_logs ({_LOG_SELECT})
+                        SELECT {_LOG_SELECT} FROM main.download_logs
+                        WHERE download_day >= ? AND download_day < ?
+                    ''', (low, high))
+                    count = conn.execute('''
+                        DELETE FROM main.download_logs
+                        WHERE download_day >= ? AND download_day < ?
+                    ''', (low, high)).rowcount
+                    conn.execute('DELETE FROM log_archive_marker')
+                    conn.execute(f'''
+                        INSERT INTO log_archives (year, path, row_count, min_download_day, max_download_day,
+                                                  min_effective_date, max_effective_date, archived_at)
+                        SELECT ?, ?, COUNT(*), MIN(download_day), MAX(download_day),
+                               MIN(effective_date), MAX(effective_date), ?
+                        FROM {schema}.download_logs
+                        WHERE true
+                        ON CONFLICT(year) DO UPDATE SET
+                            path = excluded.path,
+                            row_count = excluded.row_count,
+                            min_download_day = excluded.min_download_day,
+                            max_download_day = excluded.max_download_day,
+                            min_effective_date = excluded.min_effective_date,
+                            max_effective_date = excluded.max_effective_date,
+                            archived_at = excluded.archived_at
+                    ''', (year, path, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                conn.execute(f'DETACH DATABASE {schema}')
+                moved[year] = count
+                logging.info(f"📦 Archived {count} download logs from {year} to {path}")
+        return moved
+    
+    @profiled
+    def list_log_archives(self):
+        """Archive files with row counts and date ranges"""
+        with self.get_connection() as conn:
+            return [dict(row) for row in conn.execute('SELECT * FROM log_archives ORDER BY year DESC').fetchall()]
+    
     # ==================== MIGRATION ====================
     
     def migrate_from_json(self, jobs_json='scheduler_jobs.json', 
@@ -278,22 +687,13 @@ class Database:
         migrated_jobs = 0
         migrated_logs = 0
         
-        # Migrate jobs
+        # Migrate jobs (existing ids are skipped)
         if os.path.exists(jobs_json):
             try:
                 with open(jobs_json, 'r') as f:
                     jobs = json.load(f)
                 
-                for job in jobs:
-                    try:
-                        # Check if already exists
-                        existing = self.get_job(job['id'])
-                        if not existing:
-                            self.add_job(job)
-                            migrated_jobs += 1
-                    except Exception as e:
-                        logging.warning(f"Error migrating job {job.get('id')}: {e}")
-                
+                migrated_jobs = self.add_jobs_bulk(jobs)
                 logging.info(f"✅ Migrated {migrated_jobs} jobs from {jobs_json}")
             except Exception as e:
                 logging.error(f"Error reading {jobs_json}: {e}")
@@ -304,19 +704,7 @@ class Database:
                 with open(logs_json, 'r', encoding='utf-8') as f:
                     logs = json.load(f)
                 
-                for log in logs:
-                    try:
-                        self.add_download_log(
-                            nama_file=log['nama_file'],
-                            tanggal_download=log['tanggal_download'],
-                            laman_web=log['laman_web'],
-                            data_tanggal=log.get('data_tanggal'),
-                            task_name=log.get('task_name', 'Manual')
-                        )
-                        migrated_logs += 1
-                    except Exception as e:
-                        logging.warning(f"Error migrating log {log.get('nama_file')}: {e}")
-                
+                migrated_logs = self.add_download_logs_bulk(logs)
                 logging.info(f"✅ Migrated {migrated_logs} logs from {logs_json}")
             except Exception as e:
                 logging.error(f"Error reading {logs_json}: {e}")
@@ -326,57 +714,119 @@ class Database:
     # -----------------------------
     # Batch/Log helpers
     # -----------------------------
+    @profiled
     def get_batchable_tasks(self):
         """Return distinct task names with counts and date ranges from download_logs"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT 
-                    COALESCE(task_name, '') AS task_name,
+                    task_name,
                     COUNT(*) AS total_logs,
-                    MIN(date(tanggal_download)) AS first_download,
-                    MAX(date(tanggal_download)) AS last_download,
-                    MIN(COALESCE(date(data_tanggal), date(tanggal_download))) AS first_data_date,
-                    MAX(COALESCE(date(data_tanggal), date(tanggal_download))) AS last_data_date
-                FROM download_logs
+                    MIN(download_day) AS first_download,
+                    MAX(download_day) AS last_download,
+                    MIN(effective_date) AS first_data_date,
+                    MAX(effective_date) AS last_data_date
+                FROM {self._logs_source(conn)}
                 WHERE task_name IS NOT NULL AND task_name <> ''
                 GROUP BY task_name
                 ORDER BY task_name
             ''')
             return [dict(row) for row in cursor.fetchall()]
 
-    def get_logs_for_task(self, task_name, start_date=None, end_date=None):
-        """Return logs for a specific task, optionally filtered by data_tanggal range (inclusive)"""
+    @profiled
+    def get_task_coverage(self, task_name, start_date=None, end_date=None):
+        """
+        Per-day coverage rows for a task from task_daily_coverage (inclusive range)
+        
+        Returns:
+            list: Dicts with day, log_count, first_download, last_download,
+                total_bytes, sized_count (logs with a known size), min_bytes,
+                max_bytes ordered by day
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             query = '''
-                SELECT * FROM download_logs
+                SELECT day, log_count, first_download, last_download,
+                       total_bytes, sized_count, min_bytes, max_bytes
+                FROM task_daily_coverage
                 WHERE task_name = ?
             '''
             params = [task_name]
             if start_date:
-                query += " AND date(COALESCE(data_tanggal, tanggal_download)) >= date(?)"
+                query += " AND day >= date(?)"
                 params.append(start_date)
             if end_date:
-                query += " AND date(COALESCE(data_tanggal, tanggal_download)) <= date(?)"
+                query += " AND day <= date(?)"
                 params.append(end_date)
-            query += " ORDER BY date(COALESCE(data_tanggal, tanggal_download)) ASC, id ASC"
+            query += " ORDER BY day ASC"
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    @profiled
+    def count_covered_days(self, task_name, start_date, end_date):
+        """Number of distinct days with at least one log for a task (inclusive range)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*) FROM task_daily_coverage
+                WHERE task_name = ? AND day BETWEEN date(?) AND date(?)
+            ''', (task_name, start_date, end_date))
+            return cursor.fetchone()[0]
+
+    @profiled
+    def get_logs_for_task(self, task_name, start_date=None, end_date=None, exclude_batches=None):
+        """
+        Return logs for a specific task, optionally filtered by effective_date range (inclusive);
+        exclude_batches: batch ids whose logs (batch_logs) are left out, e.g. the
+        lineage of the batch an incremental version is built on
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            query = f'''
+                SELECT * FROM {self._logs_source(conn, 'effective_date', start_date, end_date)}
+                WHERE task_name = ?
+            '''
+            params = [task_name]
+            if exclude_batches:
+                marks = ', '.join('?' * len(exclude_batches))
+                query += f"""
+                    AND NOT EXISTS (
+                        SELECT 1 FROM batch_logs
+                        WHERE batch_logs.log_id = download_logs.id AND batch_logs.batch_id IN ({marks})
+                    )"""
+                params.extend(exclude_batches)
+            if start_date:
+                query += " AND effective_date >= date(?)"
+                params.append(start_date)
+            if end_date:
+                query += " AND effective_date <= date(?)"
+                params.append(end_date)
+            query += " ORDER BY effective_date ASC, id ASC"
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
 
     # -----------------------------
     # Batch history helpers
     # -----------------------------
+    @profiled
     def add_batch_history(self, task_name, start_date, end_date, output_format,
-                           total_rows, columns, file_path, status='success', note=None):
+                           total_rows, columns, file_path, status='success', note=None,
+                           mode='full', version=1, parent_id=None, max_log_id=None, log_count=None,
+                           log_ids=None):
+        """
+        Record a batch; mode/version/parent_id/max_log_id describe its lineage and
+        log_ids (stored in batch_logs) the download logs this version added
+        """
         import json as _json
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO batch_history (
                     task_name, start_date, end_date, output_format,
-                    total_rows, columns_json, file_path, status, note, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    total_rows, columns_json, file_path, status, note, created_at,
+                    mode, version, parent_id, max_log_id, log_count
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 task_name,
                 start_date,
@@ -387,22 +837,76 @@ class Database:
                 file_path,
                 status,
                 note,
-                datetime.now().isoformat()
+                datetime.now().isoformat(),
+                mode,
+                version,
+                parent_id,
+                max_log_id,
+                log_count
             ))
-            return cursor.lastrowid
+            batch_id = cursor.lastrowid
+            if log_ids:
+                cursor.executemany('INSERT INTO batch_logs (log_id, batch_id) VALUES (?, ?)',
+                                   [(log_id, batch_id) for log_id in set(log_ids)])
+            return batch_id
+
+    @profiled
+    def get_latest_batch(self, task_name, start_date, end_date, output_format):
+        """
+        Newest successful batch with the same task, date range and format that
+        records its logs in batch_logs (a base for an incremental batch), or None
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM batch_history
+                WHERE task_name = ? AND output_format = ?
+                  AND COALESCE(start_date, '') = ? AND COALESCE(end_date, '') = ?
+                  AND status = 'success'
+                  AND EXISTS (SELECT 1 FROM batch_logs WHERE batch_logs.batch_id = batch_history.id)
+                ORDER BY id DESC
+                LIMIT 1
+            ''', (task_name, output_format, start_date or '', end_date or ''))
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
+    @profiled
+    def get_batch_lineage(self, history_id):
+        """Batch versions from the full batch up to history_id (oldest first)"""
+        lineage = []
+        seen = set()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            while history_id is not None and history_id not in seen:
+                seen.add(history_id)
+                cursor.execute('''
+                    SELECT id, task_name, start_date, end_date, output_format, total_rows,
+                           file_path, status, note, created_at, mode, version, parent_id,
+                           max_log_id, log_count
+                    FROM batch_history WHERE id = ?
+                ''', (history_id,))
+                row = cursor.fetchone()
+                if not row:
+                    break
+                lineage.append(dict(row))
+                history_id = row['parent_id']
+        return lineage[::-1]
+
+    @profiled
     def list_batch_history(self, limit=100):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, task_name, start_date, end_date, output_format,
-                       total_rows, created_at, status, file_path
+                       total_rows, created_at, status, file_path,
+                       mode, version, parent_id, log_count
                 FROM batch_history
                 ORDER BY datetime(created_at) DESC
                 LIMIT ?
             ''', (limit,))
             return [dict(row) for row in cursor.fetchall()]
 
+    @profiled
     def get_batch_history(self, history_id):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -412,20 +916,168 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    @profiled
     def get_all_download_logs(self, limit=100):
-        """Get all download logs with limit"""
+        """Get all download logs with limit (newest first, archives read only if needed)"""
+        with self.get_connection() as conn:
+            return self._select_newest_first(conn, '1 = 1', [], limit)
+    
+    # -----------------------------
+    # Crawl run history helpers
+    # -----------------------------
+    @queued_write(durable=False)
+    @profiled
+    def add_crawl_run(self, job_id, task_name, crawler_type, status, message,
+                      started_at, finished_at, retry_count=0,
+                      admission_wait_seconds=0, admission_reasons=None):
+        """Record one crawl execution (status, duration, admission deferral)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            duration = (finished_at - started_at).total_seconds() if finished_at else None
             cursor.execute('''
-                SELECT * FROM download_logs
-                ORDER BY tanggal_download DESC
+                INSERT INTO crawl_runs (
+                    job_id, task_name, crawler_type, retry_count, status, message,
+                    started_at, finished_at, duration_seconds,
+                    admission_wait_seconds, admission_reasons
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                job_id, task_name, crawler_type, retry_count, status, message,
+                started_at.strftime('%Y-%m-%d %H:%M:%S'),
+                finished_at.strftime('%Y-%m-%d %H:%M:%S') if finished_at else None,
+                round(duration, 2) if duration is not None else None,
+                admission_wait_seconds or 0,
+                '; '.join(admission_reasons) if admission_reasons else None
+            ))
+            return cursor.lastrowid
+
+    @profiled
+    def list_crawl_runs(self, limit=100, job_id=None):
+        """List recent crawl runs (newest first), optionally for one job"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if job_id:
+                cursor.execute('''
+                    SELECT * FROM crawl_runs
+                    WHERE job_id = ?
+                    ORDER BY started_at DESC, id DESC
+                    LIMIT ?
+                ''', (job_id, limit))
+            else:
+                cursor.execute('''
+                    SELECT * FROM crawl_runs
+                    ORDER BY started_at DESC, id DESC
+                    LIMIT ?
+                ''', (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    # -----------------------------
+    # Page latency helpers
+    # -----------------------------
+    @queued_write(durable=False)
+    @profiled
+    def add_latency_sample(self, site, step, seconds, timed_out=False, keep=None):
+        """
+        Record observed wait latency (seconds) for a site/step
+
+        Only the newest `keep` samples of that site/step are kept (default
+        ADAPTIVE_TIMEOUT_WINDOW, the most the adaptive timeouts read back).
+        """
+        keep = keep or Config.ADAPTIVE_TIMEOUT_WINDOW
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO page_latency (site, step, seconds, timed_out, recorded_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (site, step, float(seconds), 1 if timed_out else 0,
+                  datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            sample_id = cursor.lastrowid
+            # Prune beyond the window (idx_latency_site_step: seek to the keep-th newest id)
+            cursor.execute('''
+                DELETE FROM page_latency
+                WHERE site = ? AND step = ? AND id <= (
+                    SELECT id FROM page_latency
+                    WHERE site = ? AND step = ?
+                    ORDER BY id DESC
+                    LIMIT 1 OFFSET ?
+                )
+            ''', (site, step, site, step, keep))
+            return sample_id
+
+    @profiled
+    def get_latency_samples(self, site, step, limit=200):
+        """Return the most recent latency samples for a site/step (newest first)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT seconds FROM page_latency
+                WHERE site = ? AND step = ?
+                ORDER BY id DESC
                 LIMIT ?
-            ''', (limit,))
+            ''', (site, step, limit))
+            return [row['seconds'] for row in cursor.fetchall()]
+
+    # -----------------------------
+    # Backup catalog helpers
+    # -----------------------------
+    @profiled
+    def add_backup_record(self, run_id, trigger, db_name, source_path, status, file_path=None,
+                          compressed=False, source_bytes=None, size_bytes=None, pages=None,
+                          restarts=0, duration_seconds=None, error=None):
+        """Record one database file backup (see app/backup.py)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO backup_catalog (
+                    run_id, trigger, db_name, source_path, file_path, compressed,
+                    source_bytes, size_bytes, pages, restarts, duration_seconds,
+                    status, error, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                run_id, trigger, db_name, source_path, file_path, 1 if compressed else 0,
+                source_bytes, size_bytes, pages, restarts,
+                round(duration_seconds, 3) if duration_seconds is not None else None,
+                status, error, datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ))
+            return cursor.lastrowid
+
+    @profiled
+    def list_backups(self, limit=100, status=None):
+        """List backup catalog entries (newest first)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if status:
+                cursor.execute('''
+                    SELECT * FROM backup_catalog WHERE status = ?
+                    ORDER BY created_at DESC, id DESC LIMIT ?
+                ''', (status, limit))
+            else:
+                cursor.execute('''
+                    SELECT * FROM backup_catalog
+                    ORDER BY created_at DESC, id DESC LIMIT ?
+                ''', (limit,))
             return [dict(row) for row in cursor.fetchall()]
-    
+
+    @profiled
+    def get_backups_before(self, cutoff):
+        """Successful backups created before cutoff (datetime), candidates for retention"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM backup_catalog
+                WHERE status = 'success' AND created_at < ?
+                ORDER BY created_at ASC
+            ''', (cutoff.strftime('%Y-%m-%d %H:%M:%S'),))
+            return [dict(row) for row in cursor.fetchall()]
+
+    @profiled
+    def mark_backup_pruned(self, backup_id):
+        with self.get_connection() as conn:
+            conn.execute("UPDATE backup_catalog SET status = 'pruned' WHERE id = ?", (backup_id,))
+
     # -----------------------------
     # Report history helpers
     # -----------------------------
+    @profiled
     def add_report_history(self, task_name, generator, start_date, end_date, total_rows, file_path, status='success', note=None):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -438,6 +1090,7 @@ class Database:
             ))
             return cursor.lastrowid
 
+    @profiled
     def list_report_history(self, limit=100):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -449,6 +1102,7 @@ class Database:
             ''', (limit,))
             return [dict(row) for row in cursor.fetchall()]
 
+    @profiled
     def get_report_history(self, history_id):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -458,17 +1112,94 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    @profiled
     def get_download_logs_by_date(self, date):
         """Get download logs for specific date (YYYY-MM-DD)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM download_logs
-                WHERE date(tanggal_download) = ?
+            cursor.execute(f'''
+                SELECT * FROM {self._logs_source(conn, 'download_day', date, date)}
+                WHERE download_day = ?
                 ORDER BY tanggal_download DESC
             ''', (date,))
             return [dict(row) for row in cursor.fetchall()]
+    
+    # ==================== SEARCH ====================
+    
+    SEARCH_KINDS = ('download_log', 'job', 'batch', 'report')
+    
+    @profiled
+    def search(self, query, kinds=None, limit=20, offset=0):
+        """
+        Full-text search (search_index) over file names, task names,
+        job messages and batch/report notes, best match first
+        (FTS5 bm25 on SQLite, tsvector ts_rank on PostgreSQL)
+        
+        Args:
+            query: Free text; every word must match (prefix match, case-insensitive;
+                diacritic-insensitive on SQLite only)
+            kinds: Optional subset of SEARCH_KINDS
+            limit, offset: Page of ranked results
+        
+        Returns:
+            dict: {results: [{kind, ref, at, task_name, title, snippet, score}], has_more}
+        """
+        if self.dialect != 'sqlite':
+            return self._search_pg(query, kinds, limit, offset)
+        match = _fts_query(query)
+        if not match:
+            return {'results': [], 'has_more': False}
+        where = 'search_index MATCH ?'
+        params = [match]
+        if kinds:
+            where += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        
+        with self.get_connection() as conn:
+            # Column weights: task_name, title (file/job name) rank above body text
+            rows = conn.execute(f'''
+                SELECT kind, ref, at, task_name, title,
+                       snippet(search_index, 5, '[', ']', '…', 12) AS snippet,
+                       bm25(search_index, 0, 0, 0, 5.0, 10.0, 1.0) AS score
+                FROM search_index
+                WHERE {where}
+                ORDER BY score
+                LIMIT ? OFFSET ?
+            ''', params + [limit + 1, offset]).fetchall()
+        results = [dict(row) for row in rows[:limit]]
+        for result in results:
+            result['score'] = round(-result['score'], 3)
+        return {'results': results, 'has_more': len(rows) > limit}
+    
+    def _search_pg(self, query, kinds, limit, offset):
+        """search() on PostgreSQL: GIN-indexed tsvector document, weights title > task_name > body"""
+        match = _tsquery(query)
+        if not match:
+            return {'results': [], 'has_more': False}
+        where = 'document @@ q'
+        params = [match]
+        if kinds:
+            where += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        
+        with self.get_connection() as conn:
+            rows = conn.execute(f'''
+                SELECT kind, ref, at, task_name, title,
+                       ts_headline('simple', COALESCE(body, ''), q,
+                                   'StartSel=[, StopSel=], MaxWords=12, MinWords=3') AS snippet,
+                       ts_rank(document, q) AS score
+                FROM search_index, to_tsquery('simple', ?) AS q
+                WHERE {where}
+                ORDER BY score DESC, at DESC
+                LIMIT ? OFFSET ?
+            ''', params + [limit + 1, offset]).fetchall()
+        results = [dict(row) for row in rows[:limit]]
+        for result in results:
+            result['score'] = round(float(result['score']), 3)
+            if result['kind'] != 'job':
+                result['ref'] = int(result['ref'])  # integer ids, as stored by FTS5 on SQLite
+        return {'results': results, 'has_more': len(rows) > limit}
 
 
-# Global database instance
-db = Database()
+# Global database instance (Config.DATABASE_URL selects PostgreSQL)
+db = Database(Config.DATABASE_URL or 'crawler.db')
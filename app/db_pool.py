@@ -0,0 +1,222 @@
+"""
+SQLite Connection Pool - koneksi persisten per thread, WAL, pragma dan retry SQLITE_BUSY
+"""
+import logging
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from app.config import Config
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+class _BusyRetry:
+    """Run a sqlite3 call, retrying with backoff while the database is locked"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __call__(self, func, *args):
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                return func(*args)
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e):
+                    raise
+                waited = time.monotonic() - start
+                if attempt >= self.pool.busy_retries:
+                    self.pool._count('busy_errors', waited)
+                    raise
+                delay = min(0.05 * (2 ** attempt), 1.0)
+                self.pool._count('busy_retries', waited + delay)
+                time.sleep(delay)
+                attempt += 1
+
+
+class RetryingCursor(sqlite3.Cursor):
+    """Cursor whose execute()/executemany() retry on SQLITE_BUSY (and report to the pool's profiler)"""
+
+    def execute(self, sql, parameters=()):
+        profiler = self.connection._profiler
+        if profiler is None:
+            return self.connection._retry(super().execute, sql, parameters)
+        start = time.perf_counter()
+        result = self.connection._retry(super().execute, sql, parameters)
+        profiler.record_query(self.connection, sql, parameters, time.perf_counter() - start)
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        profiler = self.connection._profiler
+        if profiler is None:
+            return self.connection._retry(super().executemany, sql, seq_of_parameters)
+        start = time.perf_counter()
+        result = self.connection._retry(super().executemany, sql, seq_of_parameters)
+        profiler.record_query(self.connection, sql, seq_of_parameters, time.perf_counter() - start, many=True)
+        return result
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection using RetryingCursor and retrying commit()"""
+
+    dialect = 'sqlite'
+    _retry = None  # set by ConnectionPool after connect
+    _profiler = None  # app.db_profiler.QueryProfiler, optional
+
+    def cursor(self, factory=RetryingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        return self._retry(super().commit)
+
+
+class ConnectionPool:
+    """
+    Satu koneksi SQLite persisten per thread.
+
+    Scheduler thread dan Flask request thread masing-masing memakai koneksinya
+    sendiri (tanpa connect/close per query). Setiap koneksi baru di-set WAL,
+    busy_timeout, synchronous=NORMAL, cache dan mmap sesuai Config.
+    """
+
+    dialect = 'sqlite'
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self, db_path, busy_timeout_ms=None, busy_retries=None,
+                 cache_size_kb=None, mmap_size=None, profiler=None):
+        self.db_path = db_path
+        self.profiler = profiler
+        self.busy_timeout_ms = busy_timeout_ms if busy_timeout_ms is not None else Config.DB_BUSY_TIMEOUT_MS
+        self.busy_retries = busy_retries if busy_retries is not None else Config.DB_BUSY_RETRIES
+        self.cache_size_kb = cache_size_kb if cache_size_kb is not None else Config.DB_CACHE_SIZE_KB
+        self.mmap_size = mmap_size if mmap_size is not None else Config.DB_MMAP_SIZE
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._retry = _BusyRetry(self)
+        self.stats = {
+            'connections_opened': 0,
+            'checkouts': 0,
+            'reuses': 0,
+            'busy_retries': 0,
+            'busy_errors': 0,
+            'lock_wait_seconds': 0.0,
+        }
+
+    def _count(self, key, lock_wait=0.0):
+        with self._lock:
+            self.stats[key] += 1
+            self.stats['lock_wait_seconds'] += lock_wait
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            factory=PooledConnection,
+            check_same_thread=False,  # only close_all() touches another thread's connection
+        )
+        conn._retry = self._retry
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        journal_mode = conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        if journal_mode.lower() != 'wal':
+            logging.warning(f"⚠️ {self.db_path}: journal_mode is {journal_mode}, WAL not available")
+        conn._profiler = self.profiler  # after the setup pragmas
+
+        with self._lock:
+            self._connections.add(conn)
+            self.stats['connections_opened'] += 1
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Checkout this thread's connection; commit on success, rollback on error
+
+        Nested checkouts in the same thread share the outer transaction, which
+        is committed or rolled back only by the outermost block.
+        """
+        conn = getattr(self._local, 'conn', None)
+        with self._lock:
+            self.stats['checkouts'] += 1
+            if conn is not None:
+                self.stats['reuses'] += 1
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            self._local.depth = 0
+
+        self._local.depth += 1
+        try:
+            yield conn
+            if self._local.depth == 1:
+                conn.commit()
+        except Exception:
+            if self._local.depth == 1:
+                conn.rollback()
+            raise
+        finally:
+            self._local.depth -= 1
+
+    def in_transaction(self):
+        """True while this thread is inside a connection() block"""
+        return getattr(self._local, 'depth', 0) > 0
+
+    def close_all(self):
+        """Close every pooled connection (threads reconnect on next checkout)"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections = weakref.WeakSet()
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+    def checkpoint(self, mode='PASSIVE'):
+        """Fold the WAL back into the main database file"""
+        with self.connection() as conn:
+            return conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['open_connections'] = len(self._connections)
+        stats['lock_wait_seconds'] = round(stats['lock_wait_seconds'], 3)
+        stats['reuse_ratio'] = round(stats['reuses'] / stats['checkouts'], 3) if stats['checkouts'] else 0.0
+        return stats
+
+
+def is_postgres_url(target):
+    return str(target).startswith(('postgres://', 'postgresql://'))
+
+
+def create_pool(target, schema=None, profiler=None):
+    """
+    Connection pool for a database target
+
+    target: path of a SQLite file (default backend) or a postgresql:// URL
+    (app.pg_pool, tables in `schema`). Both pools expose connection(),
+    in_transaction(), close_all(), checkpoint(), get_stats(), `dialect`
+    and `IntegrityError`.
+    """
+    if is_postgres_url(target):
+        from app.pg_pool import PgConnectionPool
+        return PgConnectionPool(target, schema=schema, profiler=profiler)
+    return ConnectionPool(target, profiler=profiler)
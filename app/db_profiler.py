@@ -0,0 +1,215 @@
+"""
+Query Profiler - latency histogram per Database method dan slow-query log dengan EXPLAIN QUERY PLAN
+"""
+import functools
+import logging
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from app.config import Config
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Statements worth an EXPLAIN QUERY PLAN (not PRAGMA/BEGIN/ATTACH/DDL)
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class _Histogram:
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (max for the open bucket)"""
+        if not self.count:
+            return None
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else round(self.max, 2)
+        return round(self.max, 2)
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count, 2) if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max, 2),
+            'buckets': dict(zip([f'<={b}ms' for b in BUCKETS_MS] + [f'>{BUCKETS_MS[-1]}ms'], self.counts)),
+        }
+
+
+class QueryProfiler:
+    """
+    Instrumentasi Database layer.
+
+    - `track(method)` membungkus method Database yang diberi `@profiled`: latency per method
+    - `record_query()` dipanggil oleh cursor pool untuk setiap statement; statement
+      di atas `DB_SLOW_QUERY_MS` dicatat (SQL, parameter, method, EXPLAIN QUERY PLAN)
+    """
+
+    def __init__(self, slow_ms=None, explain=None, max_slow=None, enabled=None):
+        self.enabled = Config.DB_PROFILE if enabled is None else enabled
+        self.slow_ms = Config.DB_SLOW_QUERY_MS if slow_ms is None else slow_ms
+        self.explain = Config.DB_SLOW_QUERY_EXPLAIN if explain is None else explain
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._methods = {}        # method -> _Histogram (whole get_connection block)
+        self._statements = {}     # sql -> slow-query aggregate
+        self._recent = deque(maxlen=max_slow or Config.DB_SLOW_QUERY_LOG_SIZE)
+
+    @property
+    def current_method(self):
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def track(self, method):
+        """Time a Database method (its get_connection block) and label its queries"""
+        if not self.enabled:
+            yield
+            return
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(method)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            stack.pop()
+            with self._lock:
+                histogram = self._methods.get(method)
+                if histogram is None:
+                    histogram = self._methods[method] = _Histogram()
+                histogram.add(elapsed_ms)
+
+    def record_query(self, conn, sql, parameters, seconds, many=False):
+        """Called after each statement; slow ones go to the slow-query log"""
+        if not self.enabled:
+            return
+        ms = seconds * 1000
+        if ms < self.slow_ms:
+            return
+
+        sql_text = ' '.join(sql.split())
+        if many:
+            parameters = next(iter(parameters), ()) if isinstance(parameters, (list, tuple)) else ()
+        plan = self._explain(conn, sql_text, parameters) if self.explain else None
+        entry = {
+            'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'method': self.current_method,
+            'sql': sql_text,
+            'params': _format_params(parameters),
+            'duration_ms': round(ms, 2),
+            'executemany': many,
+            'plan': plan,
+        }
+        logging.warning(
+            f"🐢 Slow query {entry['duration_ms']}ms in {entry['method'] or '-'}: "
+            f"{sql_text[:200]} params={entry['params']}" + (f" plan={' | '.join(plan)}" if plan else '')
+        )
+        with self._lock:
+            self._recent.append(entry)
+            aggregate = self._statements.get(sql_text)
+            if aggregate is None:
+                aggregate = self._statements[sql_text] = {
+                    'sql': sql_text, 'methods': set(), 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                }
+            aggregate['count'] += 1
+            aggregate['total_ms'] += ms
+            if entry['method']:
+                aggregate['methods'].add(entry['method'])
+            if ms >= aggregate['max_ms']:
+                aggregate.update(max_ms=ms, params=entry['params'], plan=plan, at=entry['at'])
+
+    def _explain(self, conn, sql, parameters):
+        if getattr(conn, 'dialect', 'sqlite') != 'sqlite' or not sql.lstrip().upper().startswith(EXPLAINABLE):
+            return None
+        try:
+            cursor = conn.cursor(sqlite3.Cursor)  # plain cursor: not profiled, no retry
+            rows = cursor.execute('EXPLAIN QUERY PLAN ' + sql, parameters).fetchall()
+            return [row[3] for row in rows]
+        except sqlite3.Error as e:
+            return [f'EXPLAIN failed: {str(e)}']
+
+    # ==================== REPORTING ====================
+
+    def method_stats(self):
+        """Per-method latency histograms, slowest (p95) first"""
+        with self._lock:
+            stats = [dict(method=m, **h.to_dict()) for m, h in self._methods.items()]
+        return sorted(stats, key=lambda s: (s['p95_ms'] or 0, s['max_ms']), reverse=True)
+
+    def slowest_queries(self, limit=20):
+        """Distinct slow statements ordered by their worst duration"""
+        with self._lock:
+            rows = [dict(a, methods=sorted(a['methods'])) for a in self._statements.values()]
+        for row in rows:
+            row['avg_ms'] = round(row.pop('total_ms') / row['count'], 2)
+            row['max_ms'] = round(row['max_ms'], 2)
+        return sorted(rows, key=lambda r: r['max_ms'], reverse=True)[:limit]
+
+    def recent_slow_queries(self, limit=50):
+        with self._lock:
+            return list(self._recent)[-limit:][::-1]
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self._statements.clear()
+            self._recent.clear()
+
+
+def profiled(method):
+    """
+    Decorator for `Database` methods: latency histogram and slow-query label under the
+    method's own name (nested profiled calls get their own entry). Place it below
+    `@queued_write` so queued writes are timed where they run, in the writer thread.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.profiler.track(name):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _format_params(parameters):
+    """Parameters for the log, long values truncated"""
+    if isinstance(parameters, dict):
+        items = parameters.items()
+        return {k: _short(v) for k, v in items}
+    try:
+        return [_short(v) for v in parameters]
+    except TypeError:
+        return repr(parameters)
+
+
+def _short(value, limit=100):
+    if isinstance(value, (bytes, bytearray)):
+        return f'<{len(value)} bytes>'
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit] + '…'
+    return value
@@ -46,6 +46,20 @@ class DownloadLog:
             'task_name': task_name or 'Manual'
         }
     
+    def add_downloads(self, records):
+        """
+        Add many download records in one transaction (see Database.add_download_logs_bulk)
+        
+        Args:
+            records: List of dicts with the same keys as add_download() arguments
+        
+        Returns:
+            int: Number of records logged
+        """
+        count = db.add_download_logs_bulk(records)
+        logging.info(f"📝 {count} downloads logged")
+        return count
+    
     def get_latest_by_source(self, laman_web):
         """
         Get latest download for specific source/laman from database
@@ -60,14 +74,7 @@ class DownloadLog:
     
     def get_all_by_source(self, laman_web):
         """Get all downloads for specific source from database"""
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM download_logs 
-                WHERE laman_web = ? 
-                ORDER BY tanggal_download DESC
-            ''', (laman_web,))
-            return [dict(row) for row in cursor.fetchall()]
+        return db.get_logs_by_source(laman_web)
     
     def check_if_exists(self, laman_web, data_tanggal):
         """
@@ -82,10 +89,27 @@ class DownloadLog:
         """
         return db.check_download_exists(laman_web, data_tanggal)
     
+    def claim(self, laman_web, data_tanggal, owner, artifact=''):
+        """
+        Reserve a download before starting it (see Database.claim_download)
+        
+        Returns:
+            (claimed: bool, status of the existing claim or None)
+        """
+        return db.claim_download(laman_web, data_tanggal, owner, artifact=artifact)
+    
+    def release_claim(self, laman_web, data_tanggal, owner, artifact=''):
+        """Release a claim whose download failed"""
+        return db.release_download_claim(laman_web, data_tanggal, owner, artifact=artifact)
+    
     def get_all_logs(self, limit=100):
         """Get all download logs from database"""
         return db.get_all_download_logs(limit=limit)
     
+    def get_logs_page(self, **kwargs):
+        """Keyset-paginated logs (see Database.list_download_logs_page)"""
+        return db.list_download_logs_page(**kwargs)
+    
     def get_stats(self):
         """Get download statistics"""
         logs = self.get_all_logs(limit=10000)
@@ -0,0 +1,63 @@
+"""
+Download Log Archiver - pindahkan download_logs lama ke database arsip per tahun secara berkala
+"""
+import logging
+import threading
+from app.config import Config
+from app.database import db
+
+
+class LogArchiver:
+    """
+    Background thread yang menjalankan `Database.archive_download_logs()`
+    setiap `LOG_ARCHIVE_INTERVAL_HOURS` (nonaktif jika `LOG_ARCHIVE_AFTER_DAYS=0`).
+    """
+
+    def __init__(self, database=None, interval_hours=None):
+        self.db = database or db
+        self.interval_hours = interval_hours or Config.LOG_ARCHIVE_INTERVAL_HOURS
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_result = None
+
+    def run(self, older_than_days=None):
+        """Archive now; returns {year: logs moved}"""
+        self.last_result = self.db.archive_download_logs(older_than_days)
+        return self.last_result
+
+    def start(self):
+        """Start the background archiver thread (idempotent)"""
+        if Config.LOG_ARCHIVE_AFTER_DAYS <= 0:
+            logging.info("ℹ️  LOG_ARCHIVE_AFTER_DAYS=0, download log archival disabled")
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='log-archiver', daemon=True)
+            self._thread.start()
+        logging.info("📦 Download log archiver started")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run()
+            except Exception as e:
+                logging.error(f"Log archiver error: {str(e)}")
+            self._stop.wait(self.interval_hours * 3600)
+
+    def get_stats(self):
+        archives = self.db.list_log_archives()
+        return {
+            'after_days': Config.LOG_ARCHIVE_AFTER_DAYS,
+            'archives': archives,
+            'archived_logs': sum(a['row_count'] for a in archives),
+        }
+
+
+# Global log archiver instance
+log_archiver = LogArchiver()
@@ -6,6 +6,11 @@ from flask import Blueprint, render_template, request, jsonify, flash, redirect,
 from app.auth import auth_manager, login_required, admin_required
 from app.database import db
 from app.scheduler import scheduler_instance
+from app.crawlers.watchdog import browser_watchdog
+from app.crawlers.browser_contexts import shared_chrome
+from app.backup import backup_manager
+from app.log_archive import log_archiver
+from app.parse_cache import parse_cache
 import os
 from datetime import datetime
 
@@ -224,36 +229,90 @@ def system():
     return render_template('management/system.html', 
                          system_info=system_info,
                          db_size=db_size,
-                         scheduler_jobs=len(scheduler_jobs))
+                         schema_version=db.schema_version(),
+                         scheduler_jobs=len(scheduler_jobs),
+                         watchdog=browser_watchdog.get_stats(),
+                         shared_browser=shared_chrome.get_stats(),
+                         db_pool=db.get_pool_stats(),
+                         backup=backup_manager.get_stats(),
+                         backups=db.list_backups(limit=10),
+                         log_archive=log_archiver.get_stats())
+
+@management_bp.route('/system/watchdog')
+@login_required
+@admin_required
+def watchdog_stats():
+    """Browser watchdog counters (sessions, reaped processes, memory reclaimed)"""
+    return jsonify({
+        'success': True,
+        'watchdog': browser_watchdog.get_stats(),
+        'shared_browser': shared_chrome.get_stats()
+    })
+
+@management_bp.route('/system/db-pool')
+@login_required
+@admin_required
+def db_pool_stats():
+    """SQLite connection pool metrics (reuse, busy retries, lock wait)"""
+    return jsonify({'success': True, 'db_pool': db.get_pool_stats()})
+
+@management_bp.route('/system/db-profile')
+@login_required
+@admin_required
+def db_profile():
+    """Per-method query latency and slowest queries (with EXPLAIN QUERY PLAN)"""
+    profile = {
+        'enabled': db.profiler.enabled,
+        'slow_ms': db.profiler.slow_ms,
+        'methods': db.profiler.method_stats(),
+        'slowest': db.profiler.slowest_queries(limit=int(request.args.get('limit', 20))),
+        'recent': db.profiler.recent_slow_queries(),
+    }
+    if request.args.get('format') == 'json':
+        return jsonify({'success': True, 'profile': profile})
+    return render_template('management/db_profile.html', profile=profile)
+
+@management_bp.route('/system/db-profile/reset', methods=['POST'])
+@login_required
+@admin_required
+def reset_db_profile():
+    """Clear latency histograms and the slow-query log"""
+    db.profiler.reset()
+    return jsonify({'success': True, 'message': 'Statistik query direset'})
+
+@management_bp.route('/system/watchdog/reap', methods=['POST'])
+@login_required
+@admin_required
+def reap_browsers():
+    """Reap orphaned Chrome/chromedriver processes now"""
+    if not browser_watchdog.available:
+        return jsonify({'success': False, 'message': 'psutil tidak terinstall, watchdog nonaktif'}), 500
+    killed, reclaimed = browser_watchdog.reap_orphans()
+    return jsonify({
+        'success': True,
+        'message': f'{killed} proses browser yatim dihentikan ({reclaimed / 1024 / 1024:.1f} MB)',
+        'watchdog': browser_watchdog.get_stats()
+    })
 
 @management_bp.route('/system/backup', methods=['POST'])
 @login_required
 @admin_required
 def create_backup():
-    """Create database backup"""
+    """Create database backup (online, via the sqlite3 backup API)"""
     try:
-        import shutil
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_dir = 'backups'
-        
-        # Create backups directory if not exists
-        os.makedirs(backup_dir, exist_ok=True)
-        
-        # Backup crawler database
-        crawler_db = 'crawler.db'
-        if os.path.exists(crawler_db):
-            backup_file = os.path.join(backup_dir, f'crawler_{timestamp}.db')
-            shutil.copy2(crawler_db, backup_file)
-        
-        # Backup users database
-        users_db = 'users.db'
-        if os.path.exists(users_db):
-            backup_file = os.path.join(backup_dir, f'users_{timestamp}.db')
-            shutil.copy2(users_db, backup_file)
+        results = backup_manager.run_backup(trigger='manual')
+        failed = [r for r in results if r['status'] != 'success']
+        if failed:
+            return jsonify({
+                'success': False,
+                'message': 'Gagal membuat backup: ' + '; '.join(f"{r['db_name']}: {r['error']}" for r in failed),
+                'backups': results
+            }), 500
         
         return jsonify({
             'success': True,
-            'message': f'Backup berhasil dibuat: {timestamp}'
+            'message': f"Backup berhasil dibuat: {results[0]['run_id'] if results else '-'}",
+            'backups': results
         })
     except Exception as e:
         return jsonify({
@@ -261,6 +320,58 @@ def create_backup():
             'message': f'Gagal membuat backup: {str(e)}'
         }), 500
 
+@management_bp.route('/system/backups')
+@login_required
+@admin_required
+def list_backups():
+    """Backup catalog (file, size, duration, status) and backup settings"""
+    limit = min(int(request.args.get('limit', 100)), 1000)
+    return jsonify({
+        'success': True,
+        'backup': backup_manager.get_stats(),
+        'backups': db.list_backups(limit=limit)
+    })
+
+@management_bp.route('/system/log-archives')
+@login_required
+@admin_required
+def log_archives():
+    """Per-year download log archive files (row counts, date ranges)"""
+    return jsonify({'success': True, 'log_archive': log_archiver.get_stats()})
+
+@management_bp.route('/system/log-archives/run', methods=['POST'])
+@login_required
+@admin_required
+def run_log_archive():
+    """Archive download logs older than LOG_ARCHIVE_AFTER_DAYS now"""
+    try:
+        moved = log_archiver.run()
+        return jsonify({
+            'success': True,
+            'message': f'{sum(moved.values())} log diarsipkan' + (f" ({', '.join(sorted(moved))})" if moved else ''),
+            'moved': moved
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Gagal mengarsipkan log: {str(e)}'}), 500
+
+@management_bp.route('/system/parse-cache')
+@login_required
+@admin_required
+def parse_cache_stats():
+    """Parsed-file cache used by batch/report (entries, disk usage, hit ratio)"""
+    return jsonify({'success': True, 'parse_cache': parse_cache.get_stats()})
+
+@management_bp.route('/system/parse-cache/clear', methods=['POST'])
+@login_required
+@admin_required
+def clear_parse_cache():
+    """Delete every cached parse (files are parsed again on next use)"""
+    try:
+        parse_cache.clear()
+        return jsonify({'success': True, 'message': 'Parse cache dikosongkan'})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Gagal mengosongkan cache: {str(e)}'}), 500
+
 @management_bp.route('/system/logs')
 @login_required
 @admin_required
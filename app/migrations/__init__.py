@@ -0,0 +1,105 @@
+"""
+Schema Migrations - versioned, ordered migrations tracked in `schema_version`
+"""
+import logging
+from collections import namedtuple
+from datetime import datetime
+
+# version: int (strictly increasing), name: str, apply: callable(cursor)
+Migration = namedtuple('Migration', ['version', 'name', 'apply'])
+
+
+def current_version(conn):
+    """Highest applied migration version (0 for a new or pre-migration database)"""
+    if getattr(conn, 'dialect', 'sqlite') == 'postgresql':
+        # resolved through search_path, i.e. the pool's schema
+        row = conn.execute("SELECT to_regclass('schema_version')").fetchone()
+        row = row if row and row[0] else None
+    else:
+        row = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+        ).fetchone()
+    if row is None:
+        return 0
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+# pg_advisory_xact_lock key shared by every schema's migrations
+MIGRATION_LOCK_ID = 7_301_934
+
+
+def _lock_for_migration(cursor, dialect):
+    """
+    Start a migration transaction that excludes other processes migrating the same database
+
+    SQLite: BEGIN IMMEDIATE takes the write lock up front. PostgreSQL: a
+    transaction-scoped advisory lock (released on commit/rollback).
+    """
+    if dialect == 'postgresql':
+        cursor.execute('BEGIN')
+        cursor.execute('SELECT pg_advisory_xact_lock(?)', (MIGRATION_LOCK_ID,))
+    else:
+        cursor.execute('BEGIN IMMEDIATE')
+
+
+def run_migrations(conn, migrations, label='database'):
+    """
+    Apply pending migrations, each in its own transaction
+
+    When the schema is already current this only runs two read queries,
+    so no DDL is executed on process start. Each migration takes the write
+    lock (advisory lock on PostgreSQL) and re-reads the version inside its
+    transaction, so a migration another process applied meanwhile is skipped.
+
+    Args:
+        conn: sqlite3 connection (or app.pg_pool.PgConnection)
+        migrations: Ordered list of Migration
+        label: Name used in log messages
+
+    Returns:
+        list: Versions applied in this call
+    """
+    versions = [m.version for m in migrations]
+    if versions != sorted(set(versions)):
+        raise ValueError(f"{label}: migration versions must be unique and increasing")
+
+    version = current_version(conn)
+    pending = [m for m in migrations if m.version > version]
+    if not pending:
+        logging.debug(f"{label}: schema current (v{version})")
+        return []
+
+    if conn.in_transaction:
+        conn.commit()
+    dialect = getattr(conn, 'dialect', 'sqlite')
+
+    applied = []
+    for migration in pending:
+        cursor = conn.cursor()
+        _lock_for_migration(cursor, dialect)
+        try:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TEXT NOT NULL
+                )
+            ''')
+            if current_version(conn) >= migration.version:
+                conn.rollback()
+                logging.info(f"ℹ️  {label}: migration {migration.version} ({migration.name}) "
+                             f"already applied by another process")
+                continue
+            migration.apply(cursor)
+            cursor.execute(
+                'INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)',
+                (migration.version, migration.name, datetime.now().isoformat())
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logging.error(f"❌ {label}: migration {migration.version} ({migration.name}) failed")
+            raise
+        applied.append(migration.version)
+        logging.info(f"✅ {label}: applied migration {migration.version} ({migration.name})")
+    return applied
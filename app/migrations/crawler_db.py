@@ -0,0 +1,488 @@
+"""
+Migrations for crawler.db
+
+Append new migrations at the end with the next version number; never edit
+a migration that has been released. Statements use IF NOT EXISTS so
+databases created before versioning adopt the baseline without errors.
+"""
+import os
+from app.config import Config
+from app.migrations import Migration
+
+
+def _v1_baseline(cursor):
+    """Tables that existed before versioned migrations"""
+    # Table: scheduled_jobs
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            crawler_type TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            minute INTEGER NOT NULL,
+            max_retries INTEGER DEFAULT 3,
+            retry_delay INTEGER DEFAULT 300,
+            status TEXT DEFAULT 'active',
+            created_at TEXT NOT NULL,
+            last_run TEXT,
+            last_message TEXT
+        )
+    ''')
+
+    # Table: download_logs
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS download_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama_file TEXT NOT NULL,
+            tanggal_download TEXT NOT NULL,
+            laman_web TEXT NOT NULL,
+            data_tanggal TEXT,
+            task_name TEXT DEFAULT 'Manual',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Table: batch_history
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS batch_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_name TEXT NOT NULL,
+            start_date TEXT,
+            end_date TEXT,
+            output_format TEXT NOT NULL,
+            total_rows INTEGER NOT NULL,
+            columns_json TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            status TEXT DEFAULT 'success',
+            note TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Table: report_history
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS report_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_name TEXT NOT NULL,
+            generator TEXT NOT NULL,
+            start_date TEXT,
+            end_date TEXT,
+            total_rows INTEGER NOT NULL,
+            file_path TEXT NOT NULL,
+            status TEXT DEFAULT 'success',
+            note TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_jobs_status
+        ON scheduled_jobs(status)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_logs_laman
+        ON download_logs(laman_web, data_tanggal)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_logs_date
+        ON download_logs(tanggal_download)
+    ''')
+
+
+def _v2_page_latency(cursor):
+    """Observed wait latency per site/step (adaptive timeouts)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS page_latency (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            site TEXT NOT NULL,
+            step TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            timed_out INTEGER DEFAULT 0,
+            recorded_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_latency_site_step
+        ON page_latency(site, step, id)
+    ''')
+
+
+def _v3_crawl_runs(cursor):
+    """One row per crawl execution (status, duration, admission deferral)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT,
+            task_name TEXT,
+            crawler_type TEXT,
+            retry_count INTEGER DEFAULT 0,
+            status TEXT NOT NULL,
+            message TEXT,
+            started_at TEXT NOT NULL,
+            finished_at TEXT,
+            duration_seconds REAL,
+            admission_wait_seconds REAL DEFAULT 0,
+            admission_reasons TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_runs_job
+        ON crawl_runs(job_id, started_at)
+    ''')
+
+
+def _add_column(cursor, table, column, declaration):
+    """ALTER TABLE ADD COLUMN unless the column already exists"""
+    columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})').fetchall()}
+    if column not in columns:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {declaration}')
+
+
+def _v4_log_date_columns(cursor):
+    """
+    Sargable date columns for download_logs
+
+    effective_date = data date, falling back to download date (YYYY-MM-DD)
+    download_day   = download date (YYYY-MM-DD)
+    """
+    _add_column(cursor, 'download_logs', 'effective_date', 'TEXT')
+    _add_column(cursor, 'download_logs', 'download_day', 'TEXT')
+    cursor.execute('''
+        UPDATE download_logs
+        SET effective_date = COALESCE(date(data_tanggal), date(tanggal_download)),
+            download_day = date(tanggal_download)
+        WHERE effective_date IS NULL OR download_day IS NULL
+    ''')
+    # Covers get_batchable_tasks and the range/sort of get_logs_for_task
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_logs_task_effective
+        ON download_logs(task_name, effective_date, download_day)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_logs_download_day
+        ON download_logs(download_day, tanggal_download)
+    ''')
+
+
+def _v5_download_claims(cursor):
+    """
+    Claim-before-download reservations, unique per (source, data_tanggal, artifact)
+
+    status: claimed (download in progress) | done (logged) | failed (may be reclaimed)
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS download_claims (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            data_tanggal TEXT NOT NULL,
+            artifact TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL,
+            owner TEXT,
+            claimed_at TEXT NOT NULL,
+            completed_at TEXT,
+            download_log_id INTEGER,
+            UNIQUE (source, data_tanggal, artifact)
+        )
+    ''')
+    # Everything already logged counts as done
+    cursor.execute('''
+        INSERT OR IGNORE INTO download_claims
+            (source, data_tanggal, artifact, status, claimed_at, completed_at, download_log_id)
+        SELECT laman_web, data_tanggal, '', 'done',
+               MIN(tanggal_download), MAX(tanggal_download), MAX(id)
+        FROM download_logs
+        WHERE data_tanggal IS NOT NULL
+        GROUP BY laman_web, data_tanggal
+    ''')
+
+
+def _v6_task_daily_coverage(cursor):
+    """
+    Per task/day coverage maintained by triggers on download_logs
+
+    day = download_logs.effective_date; sizes come from download_logs.file_size
+    (recorded at log time, backfilled here from files still in DOWNLOAD_PATH).
+    """
+    _add_column(cursor, 'download_logs', 'file_size', 'INTEGER')
+    sizes = []
+    for log_id, nama_file in cursor.execute(
+            'SELECT id, nama_file FROM download_logs WHERE file_size IS NULL').fetchall():
+        path = nama_file if os.path.isabs(nama_file) else os.path.join(Config.DOWNLOAD_PATH, nama_file)
+        try:
+            sizes.append((os.path.getsize(path), log_id))
+        except OSError:
+            continue
+    cursor.executemany('UPDATE download_logs SET file_size = ? WHERE id = ?', sizes)
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_daily_coverage (
+            task_name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            log_count INTEGER NOT NULL DEFAULT 0,
+            first_download TEXT,
+            last_download TEXT,
+            total_bytes INTEGER NOT NULL DEFAULT 0,
+            sized_count INTEGER NOT NULL DEFAULT 0,
+            min_bytes INTEGER,
+            max_bytes INTEGER,
+            PRIMARY KEY (task_name, day)
+        ) WITHOUT ROWID
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_coverage_insert
+        AFTER INSERT ON download_logs
+        WHEN NEW.task_name IS NOT NULL AND NEW.effective_date IS NOT NULL
+        BEGIN
+            INSERT INTO task_daily_coverage
+                (task_name, day, log_count, first_download, last_download,
+                 total_bytes, sized_count, min_bytes, max_bytes)
+            VALUES (NEW.task_name, NEW.effective_date, 1, NEW.tanggal_download, NEW.tanggal_download,
+                    COALESCE(NEW.file_size, 0), NEW.file_size IS NOT NULL, NEW.file_size, NEW.file_size)
+            ON CONFLICT(task_name, day) DO UPDATE SET
+                log_count = log_count + 1,
+                first_download = MIN(first_download, excluded.first_download),
+                last_download = MAX(last_download, excluded.last_download),
+                total_bytes = total_bytes + excluded.total_bytes,
+                sized_count = sized_count + excluded.sized_count,
+                min_bytes = COALESCE(MIN(min_bytes, excluded.min_bytes), min_bytes, excluded.min_bytes),
+                max_bytes = COALESCE(MAX(max_bytes, excluded.max_bytes), max_bytes, excluded.max_bytes);
+        END
+    ''')
+
+    # Deletes (and updates, as delete + insert) recompute the affected day from its logs
+    refresh_old_day = '''
+            DELETE FROM task_daily_coverage WHERE task_name = OLD.task_name AND day = OLD.effective_date;
+            INSERT INTO task_daily_coverage
+                (task_name, day, log_count, first_download, last_download,
+                 total_bytes, sized_count, min_bytes, max_bytes)
+            SELECT task_name, effective_date, COUNT(*), MIN(tanggal_download), MAX(tanggal_download),
+                   COALESCE(SUM(file_size), 0), COUNT(file_size), MIN(file_size), MAX(file_size)
+            FROM download_logs
+            WHERE task_name = OLD.task_name AND effective_date = OLD.effective_date
+            GROUP BY task_name, effective_date;
+    '''
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_coverage_delete
+        AFTER DELETE ON download_logs
+        WHEN OLD.task_name IS NOT NULL AND OLD.effective_date IS NOT NULL
+        BEGIN
+            {refresh_old_day}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_coverage_update
+        AFTER UPDATE OF task_name, effective_date, tanggal_download, file_size ON download_logs
+        BEGIN
+            {refresh_old_day.replace('OLD.', 'NEW.')}
+            {refresh_old_day}
+        END
+    ''')
+
+    cursor.execute('DELETE FROM task_daily_coverage')
+    cursor.execute('''
+        INSERT INTO task_daily_coverage
+            (task_name, day, log_count, first_download, last_download,
+                 total_bytes, sized_count, min_bytes, max_bytes)
+        SELECT task_name, effective_date, COUNT(*), MIN(tanggal_download), MAX(tanggal_download),
+               COALESCE(SUM(file_size), 0), COUNT(file_size), MIN(file_size), MAX(file_size)
+        FROM download_logs
+        WHERE task_name IS NOT NULL AND effective_date IS NOT NULL
+        GROUP BY task_name, effective_date
+    ''')
+
+
+def _v7_log_keyset_indexes(cursor):
+    """
+    Indexes for keyset pagination of /api/downloads, ordered by (tanggal_download, id)
+
+    idx_logs_date (tanggal_download) already serves the unfiltered list
+    (id is the rowid, implicitly the last index column).
+    """
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_logs_task_download
+        ON download_logs(task_name, tanggal_download)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_logs_source_download
+        ON download_logs(laman_web, tanggal_download)
+    ''')
+
+
+def _v8_backup_catalog(cursor):
+    """
+    One row per database file backed up (app/backup.py)
+
+    status: success | failed | pruned (file removed by retention)
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS backup_catalog (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            trigger TEXT NOT NULL,
+            db_name TEXT NOT NULL,
+            source_path TEXT NOT NULL,
+            file_path TEXT,
+            compressed INTEGER DEFAULT 0,
+            source_bytes INTEGER,
+            size_bytes INTEGER,
+            pages INTEGER,
+            restarts INTEGER DEFAULT 0,
+            duration_seconds REAL,
+            status TEXT NOT NULL,
+            error TEXT,
+            created_at TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_backup_status_created
+        ON backup_catalog(status, created_at)
+    ''')
+
+
+def _v9_log_archives(cursor):
+    """
+    Catalog of per-year download_logs archive files (Database.archive_download_logs)
+
+    Rows moved to an archive keep their task_daily_coverage: the delete
+    trigger is skipped while log_archive_marker holds a row, which only the
+    archiving transaction ever sees.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS log_archives (
+            year TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            min_download_day TEXT,
+            max_download_day TEXT,
+            min_effective_date TEXT,
+            max_effective_date TEXT,
+            archived_at TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE TABLE IF NOT EXISTS log_archive_marker (active INTEGER)')
+    cursor.execute('DROP TRIGGER IF EXISTS trg_coverage_delete')
+    cursor.execute('''
+        CREATE TRIGGER trg_coverage_delete
+        AFTER DELETE ON download_logs
+        WHEN OLD.task_name IS NOT NULL AND OLD.effective_date IS NOT NULL
+             AND NOT EXISTS (SELECT 1 FROM log_archive_marker)
+        BEGIN
+            DELETE FROM task_daily_coverage WHERE task_name = OLD.task_name AND day = OLD.effective_date;
+            INSERT INTO task_daily_coverage
+                (task_name, day, log_count, first_download, last_download,
+                 total_bytes, sized_count, min_bytes, max_bytes)
+            SELECT task_name, effective_date, COUNT(*), MIN(tanggal_download), MAX(tanggal_download),
+                   COALESCE(SUM(file_size), 0), COUNT(file_size), MIN(file_size), MAX(file_size)
+            FROM download_logs
+            WHERE task_name = OLD.task_name AND effective_date = OLD.effective_date
+            GROUP BY task_name, effective_date;
+        END
+    ''')
+
+
+# search_index rowid = source rowid * 4 + kind code, so triggers update by rowid
+_SEARCH_KINDS = {'download_log': 0, 'job': 1, 'batch': 2, 'report': 3}
+
+# kind -> (source table, columns mapped to ref, at, task_name, title, body)
+_SEARCH_SOURCES = {
+    'download_log': ('download_logs',
+                     "{r}.id, {r}.tanggal_download, {r}.task_name, {r}.nama_file, {r}.laman_web",
+                     ('nama_file', 'task_name', 'laman_web')),
+    'job': ('scheduled_jobs',
+            "{r}.id, COALESCE({r}.last_run, {r}.created_at), {r}.name, {r}.crawler_type, {r}.last_message",
+            ('name', 'crawler_type', 'last_run', 'last_message')),
+    'batch': ('batch_history',
+              "{r}.id, {r}.created_at, {r}.task_name, {r}.file_path, {r}.note",
+              ('task_name', 'file_path', 'note')),
+    'report': ('report_history',
+               "{r}.id, {r}.created_at, {r}.task_name, {r}.generator || ' ' || {r}.file_path, {r}.note",
+               ('task_name', 'generator', 'file_path', 'note')),
+}
+
+
+def _v10_search_index(cursor):
+    """
+    FTS5 index over download logs, job messages and batch/report notes (Database.search)
+
+    Kept in sync by triggers on the source tables. Logs moved to an archive
+    stay indexed (delete trigger skipped while log_archive_marker holds a row).
+    """
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            kind UNINDEXED, ref UNINDEXED, at UNINDEXED,
+            task_name, title, body,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    ''')
+    for kind, (table, columns, watched) in _SEARCH_SOURCES.items():
+        code = _SEARCH_KINDS[kind]
+        insert = (f"INSERT INTO search_index (rowid, kind, ref, at, task_name, title, body) "
+                  f"SELECT NEW.rowid * 4 + {code}, '{kind}', {columns.format(r='NEW')};")
+        delete = f"DELETE FROM search_index WHERE rowid = OLD.rowid * 4 + {code};"
+        skip_archive = ' WHEN NOT EXISTS (SELECT 1 FROM log_archive_marker)' if table == 'download_logs' else ''
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_search_{kind}_insert '
+                       f'AFTER INSERT ON {table} BEGIN {insert} END')
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_search_{kind}_delete '
+                       f'AFTER DELETE ON {table}{skip_archive} BEGIN {delete} END')
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_search_{kind}_update '
+                       f'AFTER UPDATE OF {", ".join(watched)} ON {table} BEGIN {delete} {insert} END')
+        cursor.execute(f"INSERT INTO search_index (rowid, kind, ref, at, task_name, title, body) "
+                       f"SELECT src.rowid * 4 + {code}, '{kind}', {columns.format(r='src')} FROM {table} src")
+
+
+def _v11_batch_lineage(cursor):
+    """
+    Lineage of incremental batches
+
+    parent_id  = batch this version was built from (NULL for a full batch)
+    max_log_id = highest download_logs.id covered, the next increment reads id > max_log_id
+    """
+    _add_column(cursor, 'batch_history', 'mode', "TEXT DEFAULT 'full'")
+    _add_column(cursor, 'batch_history', 'version', 'INTEGER DEFAULT 1')
+    _add_column(cursor, 'batch_history', 'parent_id', 'INTEGER')
+    _add_column(cursor, 'batch_history', 'max_log_id', 'INTEGER')
+    _add_column(cursor, 'batch_history', 'log_count', 'INTEGER')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_batch_task_range
+        ON batch_history(task_name, output_format, start_date, end_date, id)
+    ''')
+
+
+def _v12_batch_logs(cursor):
+    """
+    Download logs merged into each batch version (only the logs that version added)
+
+    A lineage covers the union of its versions' rows; the next increment reads
+    in-range logs not covered yet, so ids committed out of order are not missed.
+    Batches recorded before this table have no rows and are not used as a base.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS batch_logs (
+            log_id INTEGER NOT NULL,
+            batch_id INTEGER NOT NULL,
+            PRIMARY KEY (log_id, batch_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_batch_logs_batch ON batch_logs(batch_id)')
+
+
+MIGRATIONS = [
+    Migration(1, 'baseline', _v1_baseline),
+    Migration(2, 'page_latency', _v2_page_latency),
+    Migration(3, 'crawl_runs', _v3_crawl_runs),
+    Migration(4, 'log_date_columns', _v4_log_date_columns),
+    Migration(5, 'download_claims', _v5_download_claims),
+    Migration(6, 'task_daily_coverage', _v6_task_daily_coverage),
+    Migration(7, 'log_keyset_indexes', _v7_log_keyset_indexes),
+    Migration(8, 'backup_catalog', _v8_backup_catalog),
+    Migration(9, 'log_archives', _v9_log_archives),
+    Migration(10, 'search_index', _v10_search_index),
+    Migration(11, 'batch_lineage', _v11_batch_lineage),
+    Migration(12, 'batch_logs', _v12_batch_logs),
+]
@@ -0,0 +1,376 @@
+"""
+Migrations for the crawler schema on PostgreSQL (DATABASE_URL)
+
+The baseline matches crawler_db.py up to v9 (same tables, columns and
+indexes), with task_daily_coverage maintained by a PL/pgSQL trigger and
+sqlite_date()/sqlite_datetime() standing in for SQLite's date functions
+(app/pg_pool.py rewrites date(...)/datetime(...) calls to them).
+
+SQLite-only features are not created here: per-year log archive files
+(log_archives stays empty). Later migrations mirror SQLite ones
+(v2 = SQLite v11, v3 = SQLite v12, v4 = the FTS5 search_index of v10 as a
+tsvector column with a GIN index).
+Append new migrations at the end; never edit a released migration.
+"""
+from app.migrations import Migration
+
+_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS scheduled_jobs (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        crawler_type TEXT NOT NULL,
+        start_date TEXT NOT NULL,
+        end_date TEXT NOT NULL,
+        hour INTEGER NOT NULL,
+        minute INTEGER NOT NULL,
+        max_retries INTEGER DEFAULT 3,
+        retry_delay INTEGER DEFAULT 300,
+        status TEXT DEFAULT 'active',
+        created_at TEXT NOT NULL,
+        last_run TEXT,
+        last_message TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS download_logs (
+        id SERIAL PRIMARY KEY,
+        nama_file TEXT NOT NULL,
+        tanggal_download TEXT NOT NULL,
+        laman_web TEXT NOT NULL,
+        data_tanggal TEXT,
+        task_name TEXT DEFAULT 'Manual',
+        created_at TEXT DEFAULT to_char(now(), 'YYYY-MM-DD HH24:MI:SS'),
+        effective_date TEXT,
+        download_day TEXT,
+        file_size BIGINT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS batch_history (
+        id SERIAL PRIMARY KEY,
+        task_name TEXT NOT NULL,
+        start_date TEXT,
+        end_date TEXT,
+        output_format TEXT NOT NULL,
+        total_rows INTEGER NOT NULL,
+        columns_json TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        status TEXT DEFAULT 'success',
+        note TEXT,
+        created_at TEXT DEFAULT to_char(now(), 'YYYY-MM-DD HH24:MI:SS')
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS report_history (
+        id SERIAL PRIMARY KEY,
+        task_name TEXT NOT NULL,
+        generator TEXT NOT NULL,
+        start_date TEXT,
+        end_date TEXT,
+        total_rows INTEGER NOT NULL,
+        file_path TEXT NOT NULL,
+        status TEXT DEFAULT 'success',
+        note TEXT,
+        created_at TEXT DEFAULT to_char(now(), 'YYYY-MM-DD HH24:MI:SS')
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS page_latency (
+        id SERIAL PRIMARY KEY,
+        site TEXT NOT NULL,
+        step TEXT NOT NULL,
+        seconds DOUBLE PRECISION NOT NULL,
+        timed_out INTEGER DEFAULT 0,
+        recorded_at TEXT DEFAULT to_char(now(), 'YYYY-MM-DD HH24:MI:SS')
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS crawl_runs (
+        id SERIAL PRIMARY KEY,
+        job_id TEXT,
+        task_name TEXT,
+        crawler_type TEXT,
+        retry_count INTEGER DEFAULT 0,
+        status TEXT NOT NULL,
+        message TEXT,
+        started_at TEXT NOT NULL,
+        finished_at TEXT,
+        duration_seconds DOUBLE PRECISION,
+        admission_wait_seconds DOUBLE PRECISION DEFAULT 0,
+        admission_reasons TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS download_claims (
+        id SERIAL PRIMARY KEY,
+        source TEXT NOT NULL,
+        data_tanggal TEXT NOT NULL,
+        artifact TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL,
+        owner TEXT,
+        claimed_at TEXT NOT NULL,
+        completed_at TEXT,
+        download_log_id INTEGER,
+        UNIQUE (source, data_tanggal, artifact)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS task_daily_coverage (
+        task_name TEXT NOT NULL,
+        day TEXT NOT NULL,
+        log_count INTEGER NOT NULL DEFAULT 0,
+        first_download TEXT,
+        last_download TEXT,
+        total_bytes BIGINT NOT NULL DEFAULT 0,
+        sized_count INTEGER NOT NULL DEFAULT 0,
+        min_bytes BIGINT,
+        max_bytes BIGINT,
+        PRIMARY KEY (task_name, day)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS backup_catalog (
+        id SERIAL PRIMARY KEY,
+        run_id TEXT NOT NULL,
+        trigger TEXT NOT NULL,
+        db_name TEXT NOT NULL,
+        source_path TEXT NOT NULL,
+        file_path TEXT,
+        compressed INTEGER DEFAULT 0,
+        source_bytes BIGINT,
+        size_bytes BIGINT,
+        pages INTEGER,
+        restarts INTEGER DEFAULT 0,
+        duration_seconds DOUBLE PRECISION,
+        status TEXT NOT NULL,
+        error TEXT,
+        created_at TEXT NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS log_archives (
+        year TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        row_count INTEGER NOT NULL DEFAULT 0,
+        min_download_day TEXT,
+        max_download_day TEXT,
+        min_effective_date TEXT,
+        max_effective_date TEXT,
+        archived_at TEXT NOT NULL
+    )
+    ''',
+]
+
+_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_jobs_status ON scheduled_jobs(status)',
+    'CREATE INDEX IF NOT EXISTS idx_logs_laman ON download_logs(laman_web, data_tanggal)',
+    'CREATE INDEX IF NOT EXISTS idx_logs_date ON download_logs(tanggal_download, id)',
+    'CREATE INDEX IF NOT EXISTS idx_logs_task_effective ON download_logs(task_name, effective_date, download_day)',
+    'CREATE INDEX IF NOT EXISTS idx_logs_download_day ON download_logs(download_day, tanggal_download)',
+    'CREATE INDEX IF NOT EXISTS idx_logs_task_download ON download_logs(task_name, tanggal_download, id)',
+    'CREATE INDEX IF NOT EXISTS idx_logs_source_download ON download_logs(laman_web, tanggal_download, id)',
+    'CREATE INDEX IF NOT EXISTS idx_latency_site_step ON page_latency(site, step, id)',
+    'CREATE INDEX IF NOT EXISTS idx_runs_job ON crawl_runs(job_id, started_at)',
+    'CREATE INDEX IF NOT EXISTS idx_backup_status_created ON backup_catalog(status, created_at)',
+]
+
+# SQLite date()/datetime() semantics: NULL unless the text starts with YYYY-MM-DD
+_FUNCTIONS = [
+    r'''
+    CREATE OR REPLACE FUNCTION sqlite_date(v TEXT, modifier TEXT DEFAULT NULL) RETURNS TEXT AS $$
+    BEGIN
+        IF v IS NULL OR v !~ '^\d{4}-\d{2}-\d{2}' THEN
+            RETURN NULL;
+        END IF;
+        RETURN to_char(substr(v, 1, 10)::date + COALESCE(modifier, '0 days')::interval, 'YYYY-MM-DD');
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql IMMUTABLE
+    ''',
+    r'''
+    CREATE OR REPLACE FUNCTION sqlite_datetime(v TEXT) RETURNS TEXT AS $$
+    BEGIN
+        IF v IS NULL OR v !~ '^\d{4}-\d{2}-\d{2}' THEN
+            RETURN NULL;
+        END IF;
+        RETURN to_char(replace(v, 'T', ' ')::timestamp, 'YYYY-MM-DD HH24:MI:SS');
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql IMMUTABLE
+    ''',
+    # Recompute one task/day of task_daily_coverage from download_logs
+    '''
+    CREATE OR REPLACE FUNCTION refresh_task_coverage(p_task TEXT, p_day TEXT) RETURNS void AS $$
+    BEGIN
+        DELETE FROM task_daily_coverage WHERE task_name = p_task AND day = p_day;
+        INSERT INTO task_daily_coverage
+            (task_name, day, log_count, first_download, last_download,
+             total_bytes, sized_count, min_bytes, max_bytes)
+        SELECT task_name, effective_date, COUNT(*), MIN(tanggal_download), MAX(tanggal_download),
+               COALESCE(SUM(file_size), 0), COUNT(file_size), MIN(file_size), MAX(file_size)
+        FROM download_logs
+        WHERE task_name = p_task AND effective_date = p_day
+        GROUP BY task_name, effective_date;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    # Inserts are folded in with an upsert (safe under concurrent writers);
+    # deletes and updates recompute the affected days
+    '''
+    CREATE OR REPLACE FUNCTION trg_task_coverage() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            IF NEW.task_name IS NOT NULL AND NEW.effective_date IS NOT NULL THEN
+                INSERT INTO task_daily_coverage AS c
+                    (task_name, day, log_count, first_download, last_download,
+                     total_bytes, sized_count, min_bytes, max_bytes)
+                VALUES (NEW.task_name, NEW.effective_date, 1, NEW.tanggal_download, NEW.tanggal_download,
+                        COALESCE(NEW.file_size, 0), CASE WHEN NEW.file_size IS NULL THEN 0 ELSE 1 END,
+                        NEW.file_size, NEW.file_size)
+                ON CONFLICT (task_name, day) DO UPDATE SET
+                    log_count = c.log_count + 1,
+                    first_download = LEAST(c.first_download, EXCLUDED.first_download),
+                    last_download = GREATEST(c.last_download, EXCLUDED.last_download),
+                    total_bytes = c.total_bytes + EXCLUDED.total_bytes,
+                    sized_count = c.sized_count + EXCLUDED.sized_count,
+                    min_bytes = LEAST(c.min_bytes, EXCLUDED.min_bytes),
+                    max_bytes = GREATEST(c.max_bytes, EXCLUDED.max_bytes);
+            END IF;
+            RETURN NULL;
+        END IF;
+        IF TG_OP = 'UPDATE' AND NEW.task_name IS NOT NULL AND NEW.effective_date IS NOT NULL THEN
+            PERFORM refresh_task_coverage(NEW.task_name, NEW.effective_date);
+        END IF;
+        IF OLD.task_name IS NOT NULL AND OLD.effective_date IS NOT NULL THEN
+            PERFORM refresh_task_coverage(OLD.task_name, OLD.effective_date);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+]
+
+
+def _v1_baseline(cursor):
+    """All crawler tables as of SQLite schema v9, with the coverage trigger"""
+    for statement in _TABLES + _INDEXES + _FUNCTIONS:
+        cursor.execute(statement)
+    cursor.execute('DROP TRIGGER IF EXISTS trg_coverage ON download_logs')
+    cursor.execute('''
+        CREATE TRIGGER trg_coverage
+        AFTER INSERT OR DELETE OR UPDATE OF task_name, effective_date, tanggal_download, file_size
+        ON download_logs
+        FOR EACH ROW EXECUTE FUNCTION trg_task_coverage()
+    ''')
+
+
+def _v2_batch_lineage(cursor):
+    """Lineage of incremental batches (SQLite v11)"""
+    for column, declaration in (
+        ('mode', "TEXT DEFAULT 'full'"),
+        ('version', 'INTEGER DEFAULT 1'),
+        ('parent_id', 'INTEGER'),
+        ('max_log_id', 'INTEGER'),
+        ('log_count', 'INTEGER'),
+    ):
+        cursor.execute(f'ALTER TABLE batch_history ADD COLUMN IF NOT EXISTS {column} {declaration}')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_batch_task_range
+        ON batch_history(task_name, output_format, start_date, end_date, id)
+    ''')
+
+
+def _v3_batch_logs(cursor):
+    """Download logs merged into each batch version (SQLite v12)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS batch_logs (
+            log_id INTEGER NOT NULL,
+            batch_id INTEGER NOT NULL,
+            PRIMARY KEY (log_id, batch_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_batch_logs_batch ON batch_logs(batch_id)')
+
+
+# kind -> (source table, ref/at/task_name/title/body expressions, columns whose update re-indexes)
+_SEARCH_SOURCES = {
+    'download_log': ('download_logs',
+                     "{r}.id::text, {r}.tanggal_download, {r}.task_name, {r}.nama_file, {r}.laman_web",
+                     ('nama_file', 'task_name', 'laman_web')),
+    'job': ('scheduled_jobs',
+            "{r}.id, COALESCE({r}.last_run, {r}.created_at), {r}.name, {r}.crawler_type, {r}.last_message",
+            ('name', 'crawler_type', 'last_run', 'last_message')),
+    'batch': ('batch_history',
+              "{r}.id::text, {r}.created_at, {r}.task_name, {r}.file_path, {r}.note",
+              ('task_name', 'file_path', 'note')),
+    'report': ('report_history',
+               "{r}.id::text, {r}.created_at, {r}.task_name, {r}.generator || ' ' || {r}.file_path, {r}.note",
+               ('task_name', 'generator', 'file_path', 'note')),
+}
+
+
+def _search_text(column):
+    """Punctuation -> spaces, so file names split into words like FTS5's unicode61 tokenizer"""
+    return f"to_tsvector('simple', regexp_replace(COALESCE({column}, ''), '[^[:alnum:]]+', ' ', 'g'))"
+
+
+def _v4_search_index(cursor):
+    """
+    Full-text search_index (SQLite v10): tsvector column with a GIN index
+
+    Weights mirror the bm25 column weights on SQLite: title (A) above
+    task_name (B) above body (D). Kept in sync by one trigger per source table.
+    """
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS search_index (
+            kind TEXT NOT NULL,
+            ref TEXT NOT NULL,
+            at TEXT,
+            task_name TEXT,
+            title TEXT,
+            body TEXT,
+            document tsvector GENERATED ALWAYS AS (
+                setweight({_search_text('title')}, 'A') ||
+                setweight({_search_text('task_name')}, 'B') ||
+                setweight({_search_text('body')}, 'D')
+            ) STORED,
+            PRIMARY KEY (kind, ref)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_search_document ON search_index USING GIN (document)')
+    for kind, (table, columns, watched) in _SEARCH_SOURCES.items():
+        cursor.execute(f'''
+            CREATE OR REPLACE FUNCTION trg_search_{kind}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    DELETE FROM search_index WHERE kind = '{kind}' AND ref = OLD.id::text;
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    INSERT INTO search_index (kind, ref, at, task_name, title, body)
+                    SELECT '{kind}', {columns.format(r='NEW')};
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        cursor.execute(f'DROP TRIGGER IF EXISTS trg_search_{kind} ON {table}')
+        cursor.execute(f'''
+            CREATE TRIGGER trg_search_{kind}
+            AFTER INSERT OR DELETE OR UPDATE OF {', '.join(watched)}
+            ON {table}
+            FOR EACH ROW EXECUTE FUNCTION trg_search_{kind}()
+        ''')
+        cursor.execute(f"INSERT INTO search_index (kind, ref, at, task_name, title, body) "
+                       f"SELECT '{kind}', {columns.format(r='src')} FROM {table} src "
+                       f"ON CONFLICT (kind, ref) DO NOTHING")
+
+
+MIGRATIONS = [
+    Migration(1, 'baseline', _v1_baseline),
+    Migration(2, 'batch_lineage', _v2_batch_lineage),
+    Migration(3, 'batch_logs', _v3_batch_logs),
+    Migration(4, 'search_index', _v4_search_index),
+]
@@ -0,0 +1,28 @@
+"""
+Default rows shared by migrations
+
+Migrations that seed data import the rows from here instead of from another
+migration module, so released migrations never have to change.
+users_db.py v1 keeps its own copy of DEFAULT_SETTINGS (released before this module).
+"""
+from datetime import datetime
+
+DEFAULT_SETTINGS = [
+    ('app_name', 'BPS Web Crawler System', 'Application name'),
+    ('maintenance_mode', 'false', 'Enable/disable maintenance mode'),
+    ('max_concurrent_jobs', '3', 'Maximum concurrent crawler jobs'),
+    ('session_timeout', '3600', 'Session timeout in seconds'),
+    ('enable_notifications', 'true', 'Enable email notifications'),
+    ('notification_email', 'admin@bps.go.id', 'Notification recipient email'),
+    ('auto_backup', 'true', 'Enable automatic database backup'),
+    ('backup_retention_days', '30', 'Days to keep backup files'),
+]
+
+
+def insert_default_settings(cursor):
+    """Default app_settings rows (existing keys are kept)"""
+    for key, value, description in DEFAULT_SETTINGS:
+        cursor.execute('''
+            INSERT OR IGNORE INTO app_settings (key, value, description, updated_at)
+            VALUES (?, ?, ?, ?)
+        ''', (key, value, description, datetime.now().isoformat()))
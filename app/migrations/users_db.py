@@ -0,0 +1,56 @@
+"""
+Migrations for users.db
+
+Append new migrations at the end with the next version number; never edit
+a migration that has been released.
+"""
+from datetime import datetime
+from app.migrations import Migration
+
+
+def _v1_baseline(cursor):
+    """Users and settings tables plus default settings"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            email TEXT,
+            full_name TEXT,
+            role TEXT DEFAULT 'user',
+            is_active INTEGER DEFAULT 1,
+            created_at TEXT NOT NULL,
+            last_login TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS app_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            description TEXT,
+            updated_at TEXT NOT NULL,
+            updated_by TEXT
+        )
+    ''')
+
+    default_settings = [
+        ('app_name', 'BPS Web Crawler System', 'Application name'),
+        ('maintenance_mode', 'false', 'Enable/disable maintenance mode'),
+        ('max_concurrent_jobs', '3', 'Maximum concurrent crawler jobs'),
+        ('session_timeout', '3600', 'Session timeout in seconds'),
+        ('enable_notifications', 'true', 'Enable email notifications'),
+        ('notification_email', 'admin@bps.go.id', 'Notification recipient email'),
+        ('auto_backup', 'true', 'Enable automatic database backup'),
+        ('backup_retention_days', '30', 'Days to keep backup files'),
+    ]
+    for key, value, description in default_settings:
+        cursor.execute('''
+            INSERT OR IGNORE INTO app_settings (key, value, description, updated_at)
+            VALUES (?, ?, ?, ?)
+        ''', (key, value, description, datetime.now().isoformat()))
+
+
+MIGRATIONS = [
+    Migration(1, 'baseline', _v1_baseline),
+]
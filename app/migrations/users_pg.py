@@ -0,0 +1,40 @@
+"""
+Migrations for the users schema on PostgreSQL (DATABASE_URL)
+
+Same tables as users_db.py in PostgreSQL DDL. Append new migrations at the
+end with the next version number; never edit a released migration.
+"""
+from app.migrations import Migration
+from app.migrations.defaults import insert_default_settings
+
+
+def _v1_baseline(cursor):
+    """Users and settings tables plus default settings"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            email TEXT,
+            full_name TEXT,
+            role TEXT DEFAULT 'user',
+            is_active INTEGER DEFAULT 1,
+            created_at TEXT NOT NULL,
+            last_login TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS app_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            description TEXT,
+            updated_at TEXT NOT NULL,
+            updated_by TEXT
+        )
+    ''')
+    insert_default_settings(cursor)
+
+
+MIGRATIONS = [
+    Migration(1, 'baseline', _v1_baseline),
+]
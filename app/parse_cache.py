@@ -0,0 +1,216 @@
+"""
+Parse Cache - hasil parsing file Excel download disimpan sebagai Feather, dipakai ulang oleh batch/report
+"""
+import hashlib
+import logging
+import os
+import threading
+from app.config import Config
+
+ENTRY_SUFFIX = '.feather'
+
+
+class ParseCache:
+    """
+    Cache DataFrame hasil parsing file download (immutable) di `PARSE_CACHE_PATH`.
+
+    - Key: sha256 isi file; digest diingat per (path, size, mtime) sehingga file
+      yang tidak berubah tidak di-hash ulang dalam satu proses
+    - Dengan process pool, proses utama menghitung digest dan membaca hit sendiri;
+      worker hanya mem-parse miss (digest dikirim) dan mengembalikan counter-nya
+    - Entry Feather (Arrow IPC, butuh pyarrow) ditulis atomik; DataFrame yang tidak
+      bisa disimpan (kolom campuran, nama kolom non-string) tetap dikembalikan, tanpa cache
+    - LRU per ukuran disk: hit memperbarui mtime entry, entry terlama dihapus
+      sampai total <= `PARSE_CACHE_MAX_MB` (0 = cache nonaktif)
+    """
+
+    MAX_FINGERPRINTS = 10000
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or Config.PARSE_CACHE_PATH
+        self.max_bytes = int(Config.PARSE_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._fingerprints = {}   # (abspath, size, mtime_ns) -> sha256
+        self._available = None
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stored': 0,
+            'uncacheable': 0,
+            'evictions': 0,
+        }
+
+    @property
+    def enabled(self):
+        return self.disabled_reason is None
+
+    @property
+    def disabled_reason(self):
+        """Why the cache is off (None = enabled)"""
+        if self.max_bytes <= 0:
+            return 'PARSE_CACHE_MAX_MB=0'
+        if self._available is None:
+            try:
+                import pyarrow.feather  # noqa: F401
+                self._available = True
+            except ImportError:
+                logging.warning("⚠️ Parse cache nonaktif: pyarrow tidak terinstall (lihat requirements.txt)")
+                self._available = False
+        return None if self._available else 'pyarrow tidak terinstall'
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def counters(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def add_counters(self, counters):
+        """Fold counters returned by a pool worker into this process's stats"""
+        with self._lock:
+            for key, n in counters.items():
+                self.stats[key] += n
+
+    def fingerprint(self, filepath):
+        """Content hash of a file, re-hashed only when path/size/mtime change"""
+        st = os.stat(filepath)
+        key = (os.path.abspath(filepath), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._fingerprints.get(key)
+        if digest is not None:
+            return digest
+
+        sha = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        with self._lock:
+            if len(self._fingerprints) >= self.MAX_FINGERPRINTS:
+                self._fingerprints.clear()
+            self._fingerprints[key] = digest
+        return digest
+
+    def entry_path(self, digest):
+        return os.path.join(self.path, digest + ENTRY_SUFFIX)
+
+    def lookup(self, filepath, digest=None):
+        """Cached DataFrame of `filepath` (counted as a hit), or None"""
+        if not self.enabled:
+            return None
+        import pandas as pd
+
+        entry = self.entry_path(digest or self.fingerprint(filepath))
+        if not os.path.exists(entry):
+            return None
+        try:
+            df = pd.read_feather(entry)
+            os.utime(entry)  # LRU: last use
+        except FileNotFoundError:
+            return None  # evicted meanwhile
+        except Exception as e:
+            logging.warning(f"⚠️ Parse cache: entry rusak {os.path.basename(entry)}: {str(e)}")
+            self._remove(entry)
+            return None
+        self._count('hits')
+        return df
+
+    def load(self, filepath, parser, digest=None):
+        """
+        DataFrame of `filepath` from the cache, else `parser(filepath)` (then cached)
+
+        digest: fingerprint already computed by the caller (e.g. the parent of a pool worker)
+        """
+        if not self.enabled:
+            return parser(filepath)
+        digest = digest or self.fingerprint(filepath)
+        df = self.lookup(filepath, digest)
+        if df is not None:
+            return df
+
+        self._count('misses')
+        df = parser(filepath)
+        self.store(self.entry_path(digest), df)
+        return df
+
+    def store(self, entry, df):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = f'{entry}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            df.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, entry)  # atomic: concurrent workers never read a partial entry
+        except Exception as e:
+            logging.info(f"Parse cache: {os.path.basename(entry)} tidak di-cache ({str(e)})")
+            self._remove(tmp_path)
+            self._count('uncacheable')
+            return False
+        self._count('stored')
+        self.evict()
+        return True
+
+    def _entries(self):
+        """[(last_used, size, path)] oldest first"""
+        entries = []
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.path, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        return sorted(entries)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+        if evicted:
+            self._count('evictions', evicted)
+        return evicted
+
+    def clear(self):
+        for _, _, path in self._entries():
+            self._remove(path)
+        with self._lock:
+            self._fingerprints.clear()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get_stats(self):
+        """Counters of this process plus what is on disk"""
+        entries = self._entries()
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats.update(
+            enabled=self.enabled,
+            disabled_reason=self.disabled_reason,
+            path=self.path,
+            entries=len(entries),
+            size_bytes=sum(size for _, size, _ in entries),
+            max_bytes=self.max_bytes,
+            hit_ratio=round(stats['hits'] / lookups, 3) if lookups else 0.0,
+        )
+        return stats
+
+
+# Global parse cache instance
+parse_cache = ParseCache()
@@ -90,6 +90,8 @@ def _read(path):
             return pd.read_csv(path, parse_dates=['data_tanggal'])
         except Exception:
             return pd.read_csv(path)
+    if ext == '.parquet':
+        return pd.read_parquet(path)
     # Excel fallback
     try:
         return pd.read_excel(path, engine='openpyxl', parse_dates=['data_tanggal'])
@@ -72,6 +72,8 @@ def _read(path):
     ext = os.path.splitext(path)[1].lower()
     if ext == '.csv':
         return pd.read_csv(path)
+    if ext == '.parquet':
+        return pd.read_parquet(path)
     # Excel: prefer openpyxl engine for .xlsx
     try:
         return pd.read_excel(path, engine='openpyxl')
@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, request, jsonify, send_file
 import os
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 
 from app.auth import login_required
 from app.config import Config
@@ -32,25 +32,14 @@ def eligibles():
         job = db.get_job_by_name(name)
         if not job:
             continue
-        # Compute coverage
+        # Compute coverage (indexed count on task_daily_coverage)
         start = job.get('start_date')
         end = job.get('end_date')
-        logs = db.get_logs_for_task(name, start, end)
-        covered = set()
-        for l in logs:
-            d = l.get('data_tanggal') or l.get('tanggal_download')
-            if not d:
-                continue
-            covered.add(str(d)[:10])
         try:
             sd = datetime.fromisoformat(start).date()
             ed = datetime.fromisoformat(end).date()
-            days = 0
-            cur = sd
-            while cur <= ed:
-                days += 1
-                cur += timedelta(days=1)
-            if days > 0 and len(covered) >= days:
+            days = (ed - sd).days + 1
+            if days > 0 and db.count_covered_days(name, start, end) >= days:
                 eligible.append({'task_name': name, 'start_date': start, 'end_date': end, 'days': days})
         except Exception:
             pass
@@ -92,35 +81,15 @@ def run():
             import pandas as pd
         except Exception as e:
             return jsonify({'success': False, 'message': f'Pandas diperlukan: {e}'}), 500
-        from app.batch_routes import _read_table_file
-        frames = []
-        headers = None
-        for log in logs:
-            filename = log['nama_file']
-            filepath = filename if os.path.isabs(filename) else os.path.join(Config.DOWNLOAD_PATH, filename)
-            if not os.path.exists(filepath):
-                continue
-            df, err = _read_table_file(filepath)
-            if err:
-                continue
-            if headers is None:
-                headers = list(df.columns)
-            else:
-                for col in headers:
-                    if col not in df.columns:
-                        df[col] = None
-                df = df[headers]
-            df['data_tanggal'] = log.get('data_tanggal') or log.get('tanggal_download')
-            df['source_file'] = filename
-            frames.append(df)
-        if not frames:
-            return jsonify({'success': False, 'message': 'Tidak ada data untuk dibentuk report.'}), 404
-        combined = pd.concat(frames, ignore_index=True)
+        from app.batch_merge import merge_logs_to_file
         reports_dir = os.path.join(Config.DOWNLOAD_PATH, 'reports')
         os.makedirs(reports_dir, exist_ok=True)
         tmp_name = f"tmp_batch_{task_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         batch_file_path = os.path.join(reports_dir, tmp_name)
-        combined.to_csv(batch_file_path, index=False, encoding='utf-8-sig')
+        # Streamed file by file into the temp CSV (never all in memory)
+        result = merge_logs_to_file(logs, batch_file_path, 'csv')
+        if not result['files']:
+            return jsonify({'success': False, 'message': 'Tidak ada data untuk dibentuk report.'}), 404
 
     gen_fn = get_generator(generator)
     if not gen_fn:
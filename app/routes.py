@@ -4,6 +4,8 @@ from app.config import Config
 from app.scheduler import scheduler_instance
 from app.auth import login_required
 import os
+import base64
+import json
 import logging
 from datetime import datetime
 
@@ -22,7 +24,9 @@ def start_crawl():
     Expected JSON payload:
     {
         "crawler_type": "seruti" atau "susenas",
-        "headless": true
+        "headless": true,
+        "time_budget": 900,  // optional, seconds (default CRAWL_TIME_BUDGET)
+        "run_id": "manual-seruti"  // optional, untuk POST /api/scheduler/job/<run_id>/cancel-run
     }
     """
     try:
@@ -44,10 +48,16 @@ def start_crawl():
                 'message': f'Crawler tidak ditemukan: {crawler_type}'
             }), 400
         
-        # Initialize and run crawler
+        # Initialize and run crawler (cancellable and recorded in run history like scheduled runs)
         crawler = CrawlerClass(headless=data.get('headless', True))
-        result = crawler.run()
-        
+        time_budget = int(data.get('time_budget', Config.CRAWL_TIME_BUDGET))
+        run_id = data.get('run_id') or f'manual-{crawler_type}'
+        try:
+            result = scheduler_instance.run_manual_crawl(run_id, crawler_type, crawler, time_budget=time_budget or None)
+        except RuntimeError as e:
+            return jsonify({'success': False, 'message': str(e)}), 409
+        
+        result['run_id'] = run_id
         return jsonify(result)
         
     except Exception as e:
@@ -57,32 +67,73 @@ def start_crawl():
             'message': str(e)
         }), 500
 
+def _encode_cursor(key):
+    """Opaque cursor string for a (tanggal_download, id) keyset position"""
+    if not key:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(value):
+    """Inverse of _encode_cursor; raises ValueError for malformed cursors"""
+    if not value:
+        return None
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        tanggal_download, log_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(tanggal_download), int(log_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {value}")
+
+
 @main_bp.route('/api/downloads', methods=['GET'])
 def list_downloads():
-    """List semua file yang sudah didownload dari download log"""
+    """
+    List file yang sudah didownload (keyset pagination, terbaru dulu)
+    
+    Query params:
+        limit (default 50, max 500), cursor (next_cursor halaman sebelumnya),
+        since (latest dari respons sebelumnya, hanya log yang lebih baru),
+        task, source, start_date, end_date (tanggal download, YYYY-MM-DD)
+    """
     try:
         from app.download_log import download_logger
         
-        # Get all logs from download log
-        logs = download_logger.get_all_logs()
-        
-        # Sort by download date (newest first)
-        logs_sorted = sorted(logs, key=lambda x: x['tanggal_download'], reverse=True)
+        try:
+            limit = max(1, min(int(request.args.get('limit', 50)), 500))
+            cursor = _decode_cursor(request.args.get('cursor'))
+            since = _decode_cursor(request.args.get('since'))
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
+        page = download_logger.get_logs_page(
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            task_name=request.args.get('task'),
+            laman_web=request.args.get('source'),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+        )
         
         # Format logs untuk display
         formatted_logs = []
-        for log in logs_sorted:
+        for log in page['logs']:
             formatted_logs.append({
+                'id': log['id'],
                 'filename': log['nama_file'],
                 'downloaded': log['tanggal_download'],
                 'source': log['laman_web'],
-                'data_date': log.get('data_tanggal', '-'),
+                'data_date': log.get('data_tanggal') or '-',
                 'task_name': log.get('task_name', 'Manual')
             })
         
         return jsonify({
             'success': True,
-            'logs': formatted_logs
+            'logs': formatted_logs,
+            'has_more': page['has_more'],
+            'next_cursor': _encode_cursor(page['next_cursor']),
+            'latest': _encode_cursor(page['latest'])
         })
         
     except Exception as e:
@@ -92,6 +143,47 @@ def list_downloads():
             'message': str(e)
         }), 500
 
+
+@main_bp.route('/api/search', methods=['GET'])
+def search():
+    """
+    Full-text search di download log, pesan job, dan catatan batch/report
+    
+    Query params:
+        q (wajib), kind (download_log/job/batch/report, boleh berulang),
+        limit (default 20, max 100), offset
+    """
+    from app.database import db
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'message': 'Parameter q wajib diisi'}), 400
+    kinds = request.args.getlist('kind')
+    invalid = [k for k in kinds if k not in db.SEARCH_KINDS]
+    if invalid:
+        return jsonify({'success': False, 'message': f"Invalid kind: {', '.join(invalid)}"}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit/offset harus angka'}), 400
+    
+    try:
+        page = db.search(query, kinds=kinds or None, limit=limit, offset=offset)
+        return jsonify({
+            'success': True,
+            'query': query,
+            'results': page['results'],
+            'has_more': page['has_more'],
+            'next_offset': offset + limit if page['has_more'] else None
+        })
+    except Exception as e:
+        logging.error(f"Error searching: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
 @main_bp.route('/api/download/<filename>', methods=['GET'])
 def download_file(filename):
     """Download file dari server"""
@@ -380,6 +472,29 @@ def delete_scheduler_job(job_id):
             'message': f'Error: {str(e)}'
         }), 500
 
+@main_bp.route('/api/scheduler/job/<job_id>/cancel-run', methods=['POST'])
+def cancel_running_job(job_id):
+    """Cancel the crawl currently running for a job (jadwal berikutnya tetap aktif)"""
+    try:
+        cancelled = scheduler_instance.cancel_running_job(job_id)
+        
+        if cancelled:
+            return jsonify({
+                'success': True,
+                'message': '🛑 Crawl yang sedang berjalan dibatalkan'
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'Tidak ada crawl yang sedang berjalan untuk job ini'
+            }), 404
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/scheduler/job/<job_id>', methods=['GET'])
 def get_job_details(job_id):
     """Get job details"""
@@ -403,6 +518,28 @@ def get_job_details(job_id):
             'message': f'Error: {str(e)}'
         }), 500
 
+@main_bp.route('/api/scheduler/runs', methods=['GET'])
+def get_crawl_runs():
+    """
+    Get crawl run history (status, duration, admission deferral)
+    Query params: job_id (optional), limit (default 100)
+    """
+    try:
+        from app.database import db
+        
+        limit = min(int(request.args.get('limit', 100)), 1000)
+        runs = db.list_crawl_runs(limit=limit, job_id=request.args.get('job_id'))
+        
+        return jsonify({
+            'success': True,
+            'runs': runs
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/scheduler/retry-config', methods=['POST'])
 def update_retry_config():
     """
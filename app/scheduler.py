@@ -6,6 +6,7 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from datetime import datetime, timedelta
 import logging
+import threading
 import time
 from app.crawlers import get_crawler
 from app.config import Config
@@ -27,6 +28,9 @@ class CrawlScheduler:
             'max_retries': 3,
             'retry_delay': 300  # 5 minutes in seconds
         }
+        # Crawlers currently running, keyed by job_id (for cancellation)
+        self._running = {}
+        self._running_lock = threading.Lock()
         # Migrate existing JSON data on first run
         self.migrate_if_needed()
         
@@ -79,10 +83,17 @@ class CrawlScheduler:
                 task_name=task_name
             )
             
-            # Run crawl
-            result = crawler.run()
+            # Run crawl (bounded by total time budget, cancellable via cancel_running_job)
+            started_at = datetime.now()
+            result = self.run_crawler(job_id, crawler, time_budget=Config.CRAWL_TIME_BUDGET or None)
             
-            if result['success']:
+            self._record_run(job_id, task_name, crawler_type, retry_count, crawler, result, started_at)
+            
+            if result.get('cancelled'):
+                # Only this run was cancelled (recorded in crawl_runs); the schedule stays active
+                logging.warning(f"🛑 AUTO CRAWL CANCELLED: {result['message']}")
+                db.update_job_status(job_id, 'active', f"Run dibatalkan: {result.get('message')}")
+            elif result['success']:
                 if result.get('skipped'):
                     logging.info(f"⏭️  CRAWL SKIPPED: {result['message']}")
                     db.update_job_status(job_id, 'skipped', result.get('message'))
@@ -92,6 +103,8 @@ class CrawlScheduler:
                         logging.info(f"📄 File downloaded: {result['file']}")
                     db.update_job_status(job_id, 'success', result.get('message'))
             else:
+                if result.get('timed_out'):
+                    logging.warning(f"⏱️ AUTO CRAWL TIMED OUT after {result.get('elapsed_seconds')}s")
                 logging.warning(f"⚠️ AUTO CRAWL FAILED: {result['message']}")
                 
                 # Retry logic
@@ -111,10 +124,10 @@ class CrawlScheduler:
                         replace_existing=True
                     )
                     
-                    self.update_job_status(job_id, 'retrying', f'Retry {retry_count}/{self.retry_config["max_retries"]}')
+                    db.update_job_status(job_id, 'retrying', f'Retry {retry_count}/{self.retry_config["max_retries"]}')
                 else:
                     logging.error(f"❌ Max retries reached for job {job_id}")
-                    self.update_job_status(job_id, 'failed', f'Failed after {retry_count} retries')
+                    db.update_job_status(job_id, 'failed', f'Failed after {retry_count} retries')
                 
         except Exception as e:
             logging.error(f"❌ AUTO CRAWL ERROR: {str(e)}")
@@ -135,14 +148,41 @@ class CrawlScheduler:
                     replace_existing=True
                 )
                 
-                self.update_job_status(job_id, 'retrying', f'Error: {str(e)}, retry {retry_count}')
+                db.update_job_status(job_id, 'retrying', f'Error: {str(e)}, retry {retry_count}')
             else:
-                self.update_job_status(job_id, 'failed', f'Error: {str(e)}')
+                db.update_job_status(job_id, 'failed', f'Error: {str(e)}')
         
         logging.info("=" * 60)
         logging.info("🏁 AUTO CRAWL FINISHED")
         logging.info("=" * 60)
     
+    def _record_run(self, job_id, task_name, crawler_type, retry_count, crawler, result, started_at):
+        """Save one crawl execution to run history (incl. admission deferral)"""
+        if result.get('cancelled'):
+            status = 'cancelled'
+        elif result.get('timed_out'):
+            status = 'timed_out'
+        elif result.get('skipped'):
+            status = 'skipped'
+        else:
+            status = 'success' if result.get('success') else 'failed'
+        admission = getattr(crawler, 'admission', None) or {}
+        try:
+            db.add_crawl_run(
+                job_id=job_id,
+                task_name=task_name,
+                crawler_type=crawler_type,
+                status=status,
+                message=result.get('message'),
+                started_at=started_at,
+                finished_at=datetime.now(),
+                retry_count=retry_count,
+                admission_wait_seconds=admission.get('wait_seconds', 0),
+                admission_reasons=admission.get('reasons')
+            )
+        except Exception as e:
+            logging.error(f"Error recording crawl run for {job_id}: {str(e)}")
+    
     def add_scheduled_job(self, name, start_date, end_date, hour, minute, 
                          crawler_type='seruti', max_retries=3, retry_delay=300):
         """
@@ -212,6 +252,61 @@ class CrawlScheduler:
         
         return job_id
     
+    def run_crawler(self, run_id, crawler, time_budget=None, exclusive=False):
+        """
+        Run a crawler registered under run_id, so cancel_running_job(run_id) can stop it
+        
+        Args:
+            run_id: Job ID (scheduled) or manual run ID
+            exclusive: Raise instead of replacing a crawl already running under run_id
+        
+        Raises:
+            RuntimeError: exclusive and a crawl is already running under run_id
+        """
+        with self._running_lock:
+            if exclusive and run_id in self._running:
+                raise RuntimeError(f"Crawl {run_id} sedang berjalan")
+            self._running[run_id] = crawler
+        try:
+            return crawler.run(time_budget=time_budget)
+        finally:
+            with self._running_lock:
+                if self._running.get(run_id) is crawler:
+                    del self._running[run_id]
+    
+    def run_manual_crawl(self, run_id, crawler_type, crawler, time_budget=None):
+        """
+        Run a manual crawl (POST /api/crawl): cancellable via run_id and recorded in
+        run history like scheduled runs
+        
+        Raises:
+            RuntimeError: a crawl is already running under run_id
+        """
+        started_at = datetime.now()
+        result = self.run_crawler(run_id, crawler, time_budget=time_budget, exclusive=True)
+        self._record_run(run_id, crawler.task_name or 'Manual', crawler_type, 0, crawler, result, started_at)
+        return result
+    
+    def cancel_running_job(self, job_id):
+        """
+        Cancel a crawl that is currently running (future triggers are kept)
+        
+        Returns:
+            bool: True if a running crawl was found and cancelled
+        """
+        with self._running_lock:
+            crawler = self._running.get(job_id)
+        if not crawler:
+            return False
+        crawler.cancel()
+        logging.info(f"🛑 Running crawl for job {job_id} cancelled")
+        return True
+    
+    def get_running_job_ids(self):
+        """Get IDs of jobs with a crawl currently running"""
+        with self._running_lock:
+            return list(self._running.keys())
+    
     def remove_job(self, job_id):
         """Remove scheduled job (cancel active job, mark as cancelled)"""
         try:
@@ -221,6 +316,12 @@ class CrawlScheduler:
             except:
                 pass  # Job might not be in scheduler (already completed/failed)
             
+            # Drop pending retries and stop the run in progress, if any
+            for job in self.scheduler.get_jobs():
+                if job.id.startswith(f'{job_id}_retry_'):
+                    self.scheduler.remove_job(job.id)
+            self.cancel_running_job(job_id)
+            
             # Update status in database (keep history, don't delete)
             db.cancel_job(job_id)
             
@@ -239,6 +340,7 @@ class CrawlScheduler:
         
         # Get active jobs from scheduler
         active_job_ids = {job.id for job in self.scheduler.get_jobs()}
+        running_job_ids = set(self.get_running_job_ids())
         
         for job_config in all_jobs_db:
             job_info = {
@@ -255,7 +357,8 @@ class CrawlScheduler:
                 'last_message': job_config.get('last_message'),
                 'max_retries': job_config.get('max_retries'),
                 'retry_delay': job_config.get('retry_delay'),
-                'is_active': job_config['id'] in active_job_ids
+                'is_active': job_config['id'] in active_job_ids,
+                'is_running': job_config['id'] in running_job_ids
             }
             
             # Get next_run from scheduler if active
@@ -289,6 +392,7 @@ class CrawlScheduler:
                     job_config['is_active'] = False
             except:
                 job_config['is_active'] = False
+            job_config['is_running'] = job_id in self.get_running_job_ids()
         
         return job_config
     
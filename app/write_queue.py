@@ -0,0 +1,190 @@
+"""
+Write-Behind Queue - satu writer thread untuk write ke crawler.db dengan group commit
+"""
+import atexit
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from app.config import Config
+
+_STOP = object()
+
+
+class _WriteOp:
+    __slots__ = ('method', 'args', 'kwargs', 'future', 'durable')
+
+    def __init__(self, method, args, kwargs, durable):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.durable = durable
+
+
+class WriteQueue:
+    """
+    Antrian write untuk `Database`.
+
+    - Satu writer thread memegang koneksi write; operasi dieksekusi berurutan (FIFO)
+    - Operasi yang sudah mengantre di-commit bersama dalam satu transaksi (group commit),
+      masing-masing dalam SAVEPOINT sehingga satu operasi gagal tidak membatalkan yang lain
+    - `durable=True`: caller menunggu sampai transaksi di-commit (hasil/exception dikembalikan);
+      `durable=False`: fire-and-forget, error hanya di-log
+    """
+
+    def __init__(self, pool, batch_size=None, group_wait_ms=None, max_pending=None, enabled=None):
+        self.pool = pool
+        self.enabled = Config.DB_WRITE_BEHIND if enabled is None else enabled
+        self.batch_size = batch_size or Config.DB_WRITE_BATCH_SIZE
+        self.group_wait = (Config.DB_WRITE_GROUP_WAIT_MS if group_wait_ms is None else group_wait_ms) / 1000.0
+        self._queue = queue.Queue(maxsize=max_pending or Config.DB_WRITE_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._atexit_registered = False
+        self.stats = {
+            'submitted': 0,
+            'committed': 0,
+            'failed': 0,
+            'batches': 0,
+            'max_batch': 0,
+            'commit_seconds': 0.0,
+        }
+
+    def in_writer_thread(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def runs_inline(self):
+        """Execute directly instead of queueing (disabled, closed, writer thread, or open transaction)"""
+        return (not self.enabled or self._closed or self.in_writer_thread()
+                or self.pool.in_transaction())
+
+    def submit(self, method, args=(), kwargs=None, durable=False):
+        """Queue a write; returns its result when durable, else a Future"""
+        op = _WriteOp(method, args, kwargs or {}, durable)
+        self._ensure_started()
+        with self._lock:
+            self.stats['submitted'] += 1
+        self._queue.put(op)  # blocks when DB_WRITE_QUEUE_SIZE writes are pending (backpressure)
+        if durable:
+            return op.future.result()
+        return op.future
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is committed"""
+        if not self._thread or self.in_writer_thread():
+            return True
+        marker = _WriteOp(lambda: None, (), {}, True)
+        self._queue.put(marker)
+        try:
+            marker.future.result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def stop(self, timeout=10):
+        """Drain the queue and stop the writer; later writes run inline"""
+        with self._lock:
+            thread, self._closed = self._thread, True
+        if thread and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name='db-writer', daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.stop)  # pending fire-and-forget writes are committed on exit
+                self._atexit_registered = True
+
+    def _loop(self):
+        while True:
+            op = self._queue.get()
+            if op is _STOP:
+                return
+            batch = [op]
+            stopping = False
+            deadline = time.monotonic() + self.group_wait
+            while len(batch) < self.batch_size:
+                try:
+                    op = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if op is _STOP:
+                    stopping = True
+                    break
+                batch.append(op)
+            self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch):
+        outcomes = []
+        start = time.perf_counter()
+        try:
+            with self.pool.connection() as conn:
+                conn.execute('BEGIN IMMEDIATE')  # take the write lock once for the whole group
+                for op in batch:
+                    conn.execute('SAVEPOINT write_op')
+                    try:
+                        result = op.method(*op.args, **op.kwargs)
+                        conn.execute('RELEASE write_op')
+                        outcomes.append((op, result, None))
+                    except Exception as e:
+                        conn.execute('ROLLBACK TO write_op')
+                        conn.execute('RELEASE write_op')
+                        outcomes.append((op, None, e))
+        except Exception as e:
+            logging.error(f"❌ DB write batch of {len(batch)} failed: {str(e)}")
+            outcomes = [(op, None, e) for op in batch]
+
+        failed = 0
+        for op, result, error in outcomes:
+            if error is None:
+                op.future.set_result(result)
+                continue
+            failed += 1
+            op.future.set_exception(error)
+            if not op.durable:
+                logging.error(f"❌ Queued write {getattr(op.method, '__name__', op.method)} failed: {str(error)}")
+        with self._lock:
+            self.stats['batches'] += 1
+            self.stats['committed'] += len(batch) - failed
+            self.stats['failed'] += failed
+            self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+            self.stats['commit_seconds'] += time.perf_counter() - start
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats['enabled'] = self.enabled
+        stats['pending'] = self._queue.qsize()
+        stats['commit_seconds'] = round(stats['commit_seconds'], 3)
+        stats['avg_batch'] = round((stats['committed'] + stats['failed']) / stats['batches'], 2) if stats['batches'] else 0.0
+        return stats
+
+
+def queued_write(durable=False):
+    """
+    Decorator for `Database` write methods: route the call through `self.write_queue`.
+
+    Callers may override per call with `durable=`; inside the writer thread (or when
+    the queue is off) the method runs directly on the current connection.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, durable=durable, **kwargs):
+            write_queue = self.write_queue
+            if write_queue.runs_inline():
+                return method(self, *args, **kwargs)
+            return write_queue.submit(method, (self,) + args, kwargs, durable=durable)
+        return wrapper
+    return decorator
@@ -0,0 +1,61 @@
+"""
+Test adaptive timeouts (p99 x factor, clamped to floor/ceiling)
+"""
+import unittest
+import sys
+import os
+import uuid
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.crawlers.timeouts import LatencyTracker
+from app.database import Database
+
+
+class AdaptiveTimeoutTest(unittest.TestCase):
+    def setUp(self):
+        self.tracker = LatencyTracker(window=50, factor=1.5, floor=2, ceiling=60, min_samples=5)
+        self.site = f"TEST_{uuid.uuid4().hex[:8]}"
+
+    def test_default_until_enough_samples(self):
+        self.tracker.record(self.site, 'login_form', 1.0)
+        self.assertEqual(self.tracker.timeout_for(self.site, 'login_form', 10), 10)
+
+    def test_timeout_from_p99(self):
+        for v in [1.0, 1.2, 0.8, 1.1, 3.0, 1.0]:
+            self.tracker.record(self.site, 'login_form', v)
+        self.assertEqual(self.tracker.percentile(self.site, 'login_form'), 3.0)
+        self.assertAlmostEqual(self.tracker.timeout_for(self.site, 'login_form', 10), 4.5)
+
+    def test_floor_and_ceiling(self):
+        for _ in range(5):
+            self.tracker.record(self.site, 'fast', 0.1)
+            self.tracker.record(self.site, 'slow', 100, timed_out=True)
+        self.assertEqual(self.tracker.timeout_for(self.site, 'fast', 10), 2)
+        self.assertEqual(self.tracker.timeout_for(self.site, 'slow', 10), 60)
+
+    def test_history_reloaded_from_database(self):
+        for v in [2.0] * 5:
+            self.tracker.record(self.site, 'download', v)
+        self.tracker.reset()
+        self.assertAlmostEqual(self.tracker.timeout_for(self.site, 'download', 30), 3.0)
+
+    def test_samples_pruned_to_window(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        db = Database(os.path.join(tmp, 'crawler.db'))
+        self.addCleanup(db.pool.close_all)
+        db.write_queue.enabled = False
+
+        for v in range(8):
+            db.add_latency_sample('Seruti', 'login_form', float(v), keep=5)
+        db.add_latency_sample('Seruti', 'download', 1.0, keep=5)
+        db.add_latency_sample('Susenas', 'login_form', 1.0, keep=5)
+        self.assertEqual(db.get_latency_samples('Seruti', 'login_form', limit=100), [7.0, 6.0, 5.0, 4.0, 3.0])
+        with db.get_connection() as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM page_latency').fetchone()[0], 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
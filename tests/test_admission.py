@@ -0,0 +1,83 @@
+"""
+Test admission control (defer browser launch while host is short on resources)
+"""
+import unittest
+import sys
+import os
+import time
+import types
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.crawlers import admission
+from app.crawlers.admission import AdmissionController, AdmissionDenied
+from app.crawlers.watchdog import SESSION_SWITCH
+
+
+class FakeController(AdmissionController):
+    """Controller fed by a list of samples instead of the real host"""
+
+    def __init__(self, samples):
+        super().__init__()
+        self.min_free_mb = 1024
+        self.max_load_per_cpu = 1.5
+        self.max_chrome = 4
+        self.backoff_initial = 1
+        self.backoff_max = 4
+        self.max_wait = 0
+        self.samples = list(samples)
+
+    def sample(self):
+        return self.samples.pop(0) if len(self.samples) > 1 else self.samples[0]
+
+
+OK = {'free_mb': 4096, 'load_per_cpu': 0.5, 'chrome_processes': 1}
+LOW_MEM = {'free_mb': 200, 'load_per_cpu': 0.5, 'chrome_processes': 1}
+BUSY = {'free_mb': 4096, 'load_per_cpu': 3.0, 'chrome_processes': 5}
+
+
+class AdmissionTest(unittest.TestCase):
+    def test_admitted_when_resources_available(self):
+        controller = FakeController([OK])
+        self.assertEqual(controller.check(), {})
+        record = controller.wait_for_admission(sleep=lambda s: self.fail('should not sleep'))
+        self.assertEqual(record['reasons'], [])
+
+    def test_thresholds(self):
+        controller = FakeController([OK])
+        self.assertEqual(set(controller.check(LOW_MEM)), {'memory'})
+        self.assertEqual(set(controller.check(BUSY)), {'load', 'chrome'})
+        self.assertEqual(controller.check({'free_mb': None, 'load_per_cpu': None, 'chrome_processes': None}), {})
+
+    def test_counts_only_crawler_browsers(self):
+        def proc(name, *cmdline):
+            return types.SimpleNamespace(info={'name': name, 'cmdline': list(cmdline) or None})
+        processes = [
+            proc('chrome', 'chrome', f'{SESSION_SWITCH}123-a'),
+            proc('chromium', 'chromium', f'{SESSION_SWITCH}123-b', '--headless=new'),
+            proc('chrome', 'chrome', '--type=renderer', f'{SESSION_SWITCH}123-a'),  # helper
+            proc('chrome', 'chrome', '--profile-directory=Default'),  # user's own browser
+            proc('chrome', 'chrome', '--type=renderer'),
+            proc('python', 'python', 'run.py'),
+            proc('chrome'),  # cmdline not readable
+        ]
+        fake = types.SimpleNamespace(process_iter=lambda attrs=None: processes)
+        with mock.patch.object(admission, 'psutil', fake):
+            self.assertEqual(AdmissionController._count_chrome(), 2)
+
+    def test_exponential_backoff_until_admitted(self):
+        controller = FakeController([LOW_MEM, BUSY, BUSY, BUSY, OK])
+        sleeps = []
+        record = controller.wait_for_admission(sleep=sleeps.append)
+        self.assertEqual(sleeps, [1, 2, 4, 4])
+        self.assertEqual(len(record['reasons']), 3)
+
+    def test_denied_after_max_wait(self):
+        controller = FakeController([LOW_MEM])
+        controller.max_wait = 0.01
+        with self.assertRaises(AdmissionDenied):
+            controller.wait_for_admission(sleep=lambda s: time.sleep(0.02))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Test AuthManager settings cache (write-through, TTL reload) and pooled connections
+"""
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.auth import AuthManager
+
+
+class AuthSettingsCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.path = os.path.join(self.tmp, 'users.db')
+        self.auth = AuthManager(self.path, settings_ttl=float('inf'))
+        self.addCleanup(self.auth.pool.close_all)
+
+    def external_update(self, key, value):
+        conn = sqlite3.connect(self.path)
+        conn.execute('UPDATE app_settings SET value = ? WHERE key = ?', (value, key))
+        conn.commit()
+        conn.close()
+
+    def test_reads_are_served_from_cache(self):
+        self.assertEqual(self.auth.get_setting('max_concurrent_jobs'), '3')
+        checkouts = self.auth.pool.get_stats()['checkouts']
+        for _ in range(100):
+            self.auth.get_setting('max_concurrent_jobs')
+            self.auth.get_all_settings()
+        self.assertEqual(self.auth.pool.get_stats()['checkouts'], checkouts)
+
+        self.external_update('max_concurrent_jobs', '9')
+        self.assertEqual(self.auth.get_setting('max_concurrent_jobs'), '3')
+        self.auth.invalidate_settings()
+        self.assertEqual(self.auth.get_setting('max_concurrent_jobs'), '9')
+
+    def test_update_writes_through(self):
+        self.auth.get_all_settings()
+        self.assertTrue(self.auth.update_setting('auto_backup', 'false', 'admin'))
+        self.assertFalse(self.auth.get_bool_setting('auto_backup'))
+        setting = {s['key']: s for s in self.auth.get_all_settings()}['auto_backup']
+        self.assertEqual((setting['value'], setting['updated_by']), ('false', 'admin'))
+        self.assertFalse(self.auth.update_setting('no_such_key', 'x'))
+
+        fresh = AuthManager(self.path)
+        self.addCleanup(fresh.pool.close_all)
+        self.assertEqual(fresh.get_setting('auto_backup'), 'false')
+
+    def test_ttl_reload_and_typed_getters(self):
+        auth = AuthManager(self.path, settings_ttl=0.01)
+        self.addCleanup(auth.pool.close_all)
+        self.assertEqual(auth.get_int_setting('session_timeout'), 3600)
+        self.external_update('session_timeout', 'abc')
+        time.sleep(0.02)
+        self.assertEqual(auth.get_int_setting('session_timeout', 60), 60)
+        self.assertEqual(auth.get_setting('missing', 'x'), 'x')
+
+    def test_zero_ttl_always_reloads(self):
+        auth = AuthManager(self.path, settings_ttl=0)
+        self.addCleanup(auth.pool.close_all)
+        self.assertEqual(auth.get_setting('max_concurrent_jobs'), '3')
+        self.external_update('max_concurrent_jobs', '9')
+        self.assertEqual(auth.get_setting('max_concurrent_jobs'), '9')
+
+    def test_users_on_pooled_connection(self):
+        self.assertIsNotNone(self.auth.verify_user('admin', 'admin123'))
+        user_id = self.auth.create_user('budi', 'secret', role='user')
+        self.assertIsNotNone(user_id)
+        self.assertIsNone(self.auth.create_user('budi', 'other'))
+        self.assertTrue(self.auth.update_user(user_id, full_name='Budi'))
+        self.assertTrue(self.auth.change_password(user_id, 'new'))
+        self.assertIsNotNone(self.auth.verify_user('budi', 'new'))
+        self.assertTrue(self.auth.delete_user(user_id))
+        self.assertIsNone(self.auth.verify_user('budi', 'new'))
+        self.assertEqual(self.auth.pool.get_stats()['connections_opened'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
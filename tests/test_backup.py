@@ -0,0 +1,128 @@
+"""
+Test online database backups (sqlite3 backup API), compression, retention and catalog
+"""
+import unittest
+import sys
+import os
+import gzip
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+from app.backup import BackupManager
+
+
+class BackupManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+        self.db.add_download_log('a.xlsx', '2025-11-01 09:00:00', 'SerutiCrawler', '2025-11-01', 'Harian')
+
+        self.users_path = os.path.join(self.tmp, 'users.db')
+        conn = sqlite3.connect(self.users_path)
+        conn.execute('CREATE TABLE users (username TEXT)')
+        conn.execute("INSERT INTO users VALUES ('admin')")
+        conn.commit()
+        conn.close()
+
+        self.settings = {'auto_backup': 'true', 'backup_retention_days': '30'}
+        self.backup_dir = os.path.join(self.tmp, 'backups')
+
+    def manager(self, **kwargs):
+        kwargs.setdefault('compress', False)
+        return BackupManager(
+            backup_dir=self.backup_dir,
+            databases={'crawler': self.db.db_path, 'users': self.users_path},
+            settings=self.settings, database=self.db, pages=1, sleep=0, **kwargs
+        )
+
+    def test_backup_is_consistent_copy(self):
+        results = self.manager().run_backup()
+        self.assertEqual([r['status'] for r in results], ['success', 'success'])
+
+        crawler = results[0]
+        self.assertTrue(crawler['file_path'].startswith(self.backup_dir))
+        self.assertGreater(crawler['pages'], 1)
+        copy = sqlite3.connect(crawler['file_path'])
+        self.assertEqual(copy.execute('SELECT nama_file FROM download_logs').fetchall(), [('a.xlsx',)])
+        self.assertEqual(copy.execute('PRAGMA integrity_check').fetchone()[0], 'ok')
+        copy.close()
+
+        catalog = self.db.list_backups()
+        self.assertEqual({c['db_name'] for c in catalog}, {'crawler', 'users'})
+        self.assertTrue(all(c['size_bytes'] and c['duration_seconds'] is not None for c in catalog))
+
+    def test_log_archives_are_backed_up(self):
+        self.db.add_download_log('old.xlsx', '2023-06-01 09:00:00', 'SerutiCrawler', '2023-06-01', 'Harian')
+        self.db.archive_download_logs(older_than_days=30, archive_dir=os.path.join(self.tmp, 'archive'))
+
+        results = {r['db_name']: r for r in self.manager().run_backup()}
+        self.assertLessEqual({'crawler', 'users', 'download_logs_2023'}, set(results))
+        self.assertEqual(results['download_logs_2023']['status'], 'success')
+        copy = sqlite3.connect(results['download_logs_2023']['file_path'])
+        self.assertEqual(copy.execute('SELECT nama_file FROM download_logs').fetchall(), [('old.xlsx',)])
+        copy.close()
+
+    def test_compressed_backup(self):
+        results = self.manager(compress=True).run_backup()
+        users = results[1]
+        self.assertTrue(users['file_path'].endswith('.db.gz'))
+        restored = os.path.join(self.tmp, 'restored.db')
+        with gzip.open(users['file_path'], 'rb') as src, open(restored, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        conn = sqlite3.connect(restored)
+        self.assertEqual(conn.execute('SELECT username FROM users').fetchall(), [('admin',)])
+        conn.close()
+
+    def test_failed_backup_is_catalogued(self):
+        manager = self.manager()
+        manager._databases = {'broken': os.path.join(self.tmp, 'not_a_db.db')}
+        with open(manager._databases['broken'], 'w') as f:
+            f.write('not sqlite')
+        results = manager.run_backup()
+        self.assertEqual(results[0]['status'], 'failed')
+        self.assertEqual(self.db.list_backups()[0]['status'], 'failed')
+        self.assertFalse(any(name.endswith('.partial') for name in os.listdir(self.backup_dir)))
+
+    def test_retention_prunes_old_backups(self):
+        manager = self.manager()
+        old, _ = manager.run_backup()
+        with self.db.get_connection() as conn:
+            conn.execute('UPDATE backup_catalog SET created_at = ? WHERE id = ?',
+                         ((datetime.now() - timedelta(days=40)).strftime('%Y-%m-%d %H:%M:%S'), old['id']))
+
+        self.settings['backup_retention_days'] = '0'
+        self.assertEqual(manager.prune(), 0)
+        self.settings['backup_retention_days'] = '30'
+        self.assertEqual(manager.prune(), 1)
+        self.assertFalse(os.path.exists(old['file_path']))
+        self.assertEqual(self.db.list_backups(status='pruned')[0]['id'], old['id'])
+
+    def test_backup_due_follows_settings(self):
+        manager = self.manager()
+        self.assertTrue(manager.backup_due())
+        manager.run_backup(trigger='auto')
+        self.assertFalse(manager.backup_due())
+        self.settings['auto_backup'] = 'false'
+        self.assertFalse(manager.backup_due())
+
+    def test_first_auto_backup_waits_one_interval(self):
+        manager = self.manager()
+        manager.start(check_interval=0.3)
+        self.addCleanup(manager.stop)
+        time.sleep(0.1)
+        self.assertEqual(self.db.list_backups(), [])
+        self.assertFalse(os.path.exists(self.backup_dir))
+
+        time.sleep(0.5)
+        self.assertEqual({c['db_name'] for c in self.db.list_backups()}, {'crawler', 'users'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Test streaming batch merge: files are aligned to the first file's columns and
+appended to the output one chunk at a time (CSV, Parquet, XLSX)
+"""
+import unittest
+import sys
+import os
+import csv
+import tempfile
+import shutil
+import importlib.util
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import batch_merge
+from app.batch_merge import CsvWriter, PreviewWriter, merge_logs, merge_logs_to_file
+
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+HAS_OPENPYXL = importlib.util.find_spec('openpyxl') is not None
+
+
+@unittest.skipUnless(HAS_PANDAS, 'pandas not installed')
+class BatchMergeTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.logs = [
+            self.write_csv('a.csv', ['id', 'nama', 'nilai'], [[1, 'x', 10], [2, 'y', 20], [3, 'z', 30]], '2025-11-01'),
+            # columns in another order, one missing and one extra
+            self.write_csv('b.csv', ['nama', 'id', 'extra'], [['p', 4, 'drop'], ['q', 5, 'drop']], '2025-11-02'),
+            {'nama_file': os.path.join(self.dir, 'missing.csv'), 'data_tanggal': '2025-11-03'},
+            self.write_csv('c.csv', ['id', 'nama', 'nilai'], [[6, 'r', 'n/a']], None),
+        ]
+
+    def write_csv(self, name, header, rows, data_tanggal):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return {'nama_file': path, 'data_tanggal': data_tanggal, 'tanggal_download': '2025-11-09 08:00:00'}
+
+    def test_csv_streamed_in_chunks(self):
+        out_path = os.path.join(self.dir, 'out.csv')
+        written = []
+        original = CsvWriter.write
+
+        def spy(writer, df):
+            written.append(len(df))
+            original(writer, df)
+
+        with mock.patch.object(CsvWriter, 'write', spy):
+            result = merge_logs_to_file(self.logs, out_path, 'csv', chunk_rows=2, workers=1)
+
+        self.assertEqual(written, [2, 1, 2, 1])  # one chunk at a time, never the whole dataset
+        self.assertEqual(result['total_rows'], 6)
+        self.assertEqual(result['files'], 3)
+        self.assertEqual(result['columns'], ['id', 'nama', 'nilai', 'data_tanggal', 'source_file'])
+        self.assertEqual([s['file'] for s in result['skipped']], [self.logs[2]['nama_file']])
+
+        with open(out_path, encoding='utf-8') as f:
+            content = f.read()
+        self.assertEqual(content.count('\ufeff'), 1)
+        rows = list(csv.DictReader(content.lstrip('\ufeff').splitlines()))
+        self.assertEqual([r['id'] for r in rows], ['1', '2', '3', '4', '5', '6'])
+        self.assertEqual(rows[3]['nilai'], '')
+        self.assertNotIn('extra', rows[3])
+        self.assertEqual(rows[3]['data_tanggal'], '2025-11-02')
+        self.assertEqual(rows[5]['data_tanggal'], '2025-11-09 08:00:00')  # falls back to download time
+
+    def test_partially_read_csv_is_reported(self):
+        broken = self.write_csv('broken.csv', ['id', 'nama', 'nilai'], [[7, 's', 1], [8, 't', 2], [9, 'u', 3]], '2025-11-04')
+        logs = [self.logs[0], broken]
+        original = batch_merge.iter_table_chunks
+
+        def fail_after_first_chunk(filepath, chunk_rows=None, digest=None):
+            chunks = original(filepath, chunk_rows, digest)
+            yield next(chunks)
+            if filepath == broken['nama_file']:
+                raise ValueError('Error tokenizing data')
+            yield from chunks
+
+        out_path = os.path.join(self.dir, 'out.csv')
+        with mock.patch.object(batch_merge, 'iter_table_chunks', fail_after_first_chunk):
+            result = merge_logs_to_file(logs, out_path, 'csv', chunk_rows=2, workers=1)
+
+        self.assertEqual((result['files'], result['total_rows'], result['skipped']), (2, 5, []))
+        self.assertEqual([(p['file'], p['rows']) for p in result['partial']], [(broken['nama_file'], 2)])
+        self.assertEqual(result['merged_logs'], logs)
+        with open(out_path, encoding='utf-8-sig') as f:
+            self.assertEqual([r['id'] for r in csv.DictReader(f)], ['1', '2', '3', '7', '8'])
+
+    def test_process_pool_keeps_log_order(self):
+        broken = os.path.join(self.dir, 'broken.xlsx')
+        with open(broken, 'w') as f:
+            f.write('not a workbook')
+        logs = self.logs + [{'nama_file': broken, 'data_tanggal': '2025-11-04'}] + self.logs[:2] * 3
+
+        batch_merge.start_parse_pool(3)
+        self.addCleanup(batch_merge.stop_parse_pool)
+        serial_path = os.path.join(self.dir, 'serial.csv')
+        pooled_path = os.path.join(self.dir, 'pooled.csv')
+        serial = merge_logs_to_file(logs, serial_path, 'csv', workers=1)
+        pooled = merge_logs_to_file(logs, pooled_path, 'csv', workers=3)
+
+        self.assertEqual((serial['workers'], pooled['workers']), (1, 3))
+        with open(serial_path, encoding='utf-8-sig') as f1, open(pooled_path, encoding='utf-8-sig') as f2:
+            self.assertEqual(f1.read(), f2.read())
+        self.assertEqual(pooled['total_rows'], 6 + 5 * 3)
+        self.assertEqual([s['file'] for s in pooled['skipped']], [self.logs[2]['nama_file'], broken])
+
+        # Per-file parse time, in log order (missing files are not parsed)
+        self.assertEqual([p['file'] for p in pooled['parse_times']],
+                         [l['nama_file'] for l in logs if l is not self.logs[2]])
+        self.assertEqual([p['rows'] for p in pooled['parse_times']], [3, 2, 1, 0, 3, 2, 3, 2, 3, 2])
+        self.assertTrue(all(p['seconds'] >= 0 for p in pooled['parse_times']))
+
+    def test_pool_is_started_once_not_per_merge(self):
+        out_path = os.path.join(self.dir, 'out.csv')
+        with mock.patch.object(batch_merge, 'ProcessPoolExecutor', side_effect=AssertionError('forked per merge')):
+            result = merge_logs_to_file(self.logs, out_path, 'csv', workers=3)
+        self.assertEqual(result['workers'], 1)  # no pool started: parsed in this process
+
+        pool = batch_merge.start_parse_pool(2)
+        self.addCleanup(batch_merge.stop_parse_pool)
+        self.assertIs(batch_merge.start_parse_pool(4), pool)
+        with mock.patch.object(batch_merge, 'ProcessPoolExecutor', side_effect=AssertionError('forked per merge')):
+            for _ in range(2):
+                result = merge_logs_to_file(self.logs, out_path, 'csv', workers=3)
+                self.assertEqual((result['workers'], result['total_rows']), (2, 6))  # capped by the pool
+
+    def test_default_workers_are_capped(self):
+        with mock.patch.object(batch_merge.os, 'cpu_count', return_value=64), \
+                mock.patch.object(batch_merge.multiprocessing, 'get_all_start_methods', return_value=['fork']):
+            self.assertEqual(batch_merge.parse_workers(0), batch_merge.DEFAULT_MAX_PARSE_WORKERS)
+            self.assertEqual(batch_merge.parse_workers(8), 8)  # explicit setting wins
+        with mock.patch.object(batch_merge.multiprocessing, 'get_all_start_methods', return_value=['spawn']):
+            self.assertEqual(batch_merge.parse_workers(0), 1)
+
+    def test_preview_keeps_head_only(self):
+        writer = PreviewWriter(limit=4)
+        result = merge_logs(self.logs, writer, chunk_rows=2)
+        self.assertEqual(result['total_rows'], 6)
+        self.assertEqual([r[0] for r in writer.rows()], ['1', '2', '3', '4'])
+
+    def test_nothing_readable_removes_output(self):
+        out_path = os.path.join(self.dir, 'empty.csv')
+        result = merge_logs_to_file([self.logs[2]], out_path, 'csv')
+        self.assertEqual(result['files'], 0)
+        self.assertFalse(os.path.exists(out_path))
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow not installed')
+    def test_parquet_row_groups(self):
+        import pyarrow.parquet as pq
+
+        out_path = os.path.join(self.dir, 'out.parquet')
+        result = merge_logs_to_file(self.logs, out_path, 'parquet', chunk_rows=2)
+        self.assertEqual(result['total_rows'], 6)
+
+        parquet = pq.ParquetFile(out_path)
+        self.assertEqual(parquet.metadata.num_row_groups, 4)
+        table = parquet.read()
+        self.assertEqual(table.column('id').to_pylist(), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        self.assertEqual(table.column('nilai').to_pylist(), [10.0, 20.0, 30.0, None, None, None])  # 'n/a' -> null
+        self.assertEqual(table.column('nama').to_pylist(), ['x', 'y', 'z', 'p', 'q', 'r'])
+
+    @unittest.skipUnless(HAS_OPENPYXL, 'openpyxl not installed')
+    def test_xlsx_write_only_spills_to_new_sheet(self):
+        from openpyxl import load_workbook
+
+        out_path = os.path.join(self.dir, 'out.xlsx')
+        with mock.patch.object(batch_merge, 'EXCEL_MAX_ROWS', 5):
+            result = merge_logs_to_file(self.logs, out_path, 'xlsx', chunk_rows=2)
+        self.assertEqual(result['total_rows'], 6)
+
+        workbook = load_workbook(out_path, read_only=True)
+        self.assertEqual(workbook.sheetnames, ['BatchLog', 'BatchLog_2'])
+        first = list(workbook['BatchLog'].values)
+        second = list(workbook['BatchLog_2'].values)
+        self.assertEqual(first[0], ('id', 'nama', 'nilai', 'data_tanggal', 'source_file'))
+        self.assertEqual(len(first) + len(second), 6 + 2)  # header on each sheet
+        self.assertEqual(second[-1][:2], (6, 'r'))
+        self.assertIsNone(first[4][2])  # missing column -> empty cell
+        workbook.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Test browser contexts on a shared Chrome (isolated context + download directory per crawl)
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.crawlers import browser_contexts
+from app.crawlers.browser_contexts import SharedChrome
+from app.crawlers.base_crawler import BaseCrawler
+
+
+class FakeHost:
+    """Host WebDriver that answers the CDP commands used by SharedChrome"""
+
+    def __init__(self, *args, **kwargs):
+        self.capabilities = {'goog:chromeOptions': {'debuggerAddress': 'localhost:9333'}}
+        self.service = mock.Mock()
+        self.service.process.poll.return_value = None
+        self.commands = []
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+        if cmd == 'Target.createBrowserContext':
+            return {'browserContextId': f"CTX{len(self.commands)}"}
+        if cmd == 'Target.createTarget':
+            return {'targetId': f"TARGET-{params['browserContextId']}"}
+        return {}
+
+    def quit(self):
+        self.quit_called = True
+
+
+class NoopCrawler(BaseCrawler):
+    def login(self): pass
+    def navigate_to_data_page(self): pass
+    def get_data_date(self): return "2025-11-07"
+    def download_data(self): return None
+
+
+class SharedChromeTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(browser_contexts.webdriver, 'Chrome', FakeHost)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.chrome = SharedChrome(recycle_after=2)
+        self.factories = (lambda session=None: mock.Mock(), lambda: '/usr/bin/chromedriver')
+
+    def test_contexts_share_one_chrome(self):
+        ctx1, target1 = self.chrome.open_context('/tmp/a', *self.factories)
+        ctx2, target2 = self.chrome.open_context('/tmp/b', *self.factories)
+
+        self.assertNotEqual(ctx1, ctx2)
+        self.assertEqual(target1, f"TARGET-{ctx1}")
+        self.assertEqual(self.chrome.stats['launches'], 1)
+        self.assertEqual(self.chrome.get_stats()['active_contexts'], 2)
+
+        downloads = [p for c, p in self.chrome._host.commands if c == 'Browser.setDownloadBehavior']
+        self.assertEqual([(d['browserContextId'], d['downloadPath']) for d in downloads],
+                         [(ctx1, '/tmp/a'), (ctx2, '/tmp/b')])
+
+    def test_recycle_when_idle(self):
+        ctx1, _ = self.chrome.open_context('/tmp/a', *self.factories)
+        ctx2, _ = self.chrome.open_context('/tmp/b', *self.factories)
+        host = self.chrome._host
+        self.chrome.close_context(ctx1)
+        self.assertTrue(self.chrome.running)
+        self.chrome.close_context(ctx2)
+
+        self.assertIn(('Target.disposeBrowserContext', {'browserContextId': ctx2}), host.commands)
+        self.assertTrue(host.quit_called)
+        self.assertFalse(self.chrome.running)
+
+    def test_recycle_when_idle_after_passing_threshold(self):
+        # Never idle at an exact multiple of recycle_after: 3 contexts open at once
+        contexts = [self.chrome.open_context(f'/tmp/{i}', *self.factories)[0] for i in range(3)]
+        host = self.chrome._host
+        for ctx in contexts:
+            self.chrome.close_context(ctx)
+        self.assertTrue(host.quit_called)
+
+        # Counter restarts with the new Chrome
+        ctx, _ = self.chrome.open_context('/tmp/d', *self.factories)
+        self.assertEqual(self.chrome.get_stats()['contexts_since_launch'], 1)
+        self.chrome.close_context(ctx)
+        self.assertTrue(self.chrome.running)
+        self.assertEqual(self.chrome.stats['launches'], 2)
+
+
+class CollectDownloadsTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        patcher = mock.patch.object(Config, 'DOWNLOAD_PATH', self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_moves_context_downloads_and_renames_collisions(self):
+        crawler = NoopCrawler()
+        crawler.download_path = os.path.join(self.root, '.contexts', crawler.session_id)
+        os.makedirs(crawler.download_path)
+        for name in ('report.xlsx', 'other.xlsx', 'partial.xlsx.crdownload'):
+            open(os.path.join(crawler.download_path, name), 'w').close()
+        open(os.path.join(self.root, 'report.xlsx'), 'w').close()
+
+        filename = crawler._collect_downloads('report.xlsx')
+
+        self.assertEqual(filename, 'report (1).xlsx')
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'other.xlsx')))
+        self.assertEqual(os.listdir(crawler.download_path), ['partial.xlsx.crdownload'])
+
+    def test_local_backend_is_untouched(self):
+        crawler = NoopCrawler()
+        crawler.download_path = self.root
+        self.assertEqual(crawler._collect_downloads('report.xlsx'), 'report.xlsx')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Test bulk ingest API (executemany, chunked commits) and JSON migration
+"""
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+
+
+def make_logs(n):
+    return [{
+        'nama_file': f'file_{i}.xlsx',
+        'tanggal_download': f'2025-11-{i % 28 + 1:02d} 08:00:00',
+        'laman_web': 'SerutiCrawler',
+        'data_tanggal': f'2025-11-{i % 28 + 1:02d}',
+        'task_name': 'Harian',
+    } for i in range(n)]
+
+
+class BulkInsertTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+
+    def count(self, sql):
+        with self.db.get_connection() as conn:
+            return conn.execute(sql).fetchone()[0]
+
+    def test_bulk_logs_in_chunks(self):
+        commits = []
+        with self.db.get_connection() as conn:
+            conn.set_trace_callback(lambda s: commits.append(s) if s == 'COMMIT' else None)
+        logs = make_logs(1200) + [{'nama_file': None, 'tanggal_download': 'x', 'laman_web': 'y'}, {'foo': 1}]
+
+        self.assertEqual(self.db.add_download_logs_bulk(logs, chunk_size=500), 1200)
+        self.assertEqual(len(commits), 3)
+        self.assertEqual(self.count('SELECT COUNT(*) FROM download_logs WHERE effective_date IS NOT NULL'), 1200)
+        self.assertEqual(self.count("SELECT COUNT(*) FROM download_claims WHERE status = 'done'"), 28)
+        self.assertEqual(self.db.claim_download('SerutiCrawler', '2025-11-03', 'run-1'), (False, 'done'))
+
+    def test_bulk_logs_commit_per_chunk_with_queue_on(self):
+        self.addCleanup(self.db.write_queue.stop)
+        self.db.write_queue.enabled = True
+        self.db.add_job({
+            'id': 'job-1', 'name': 'Harian', 'crawler_type': 'seruti', 'start_date': '2025-11-01',
+            'end_date': '2025-11-30', 'hour': 8, 'minute': 0, 'created_at': '2025-11-01 00:00:00',
+        })
+        self.db.update_job_status('job-1', 'running', 'writer started')
+        self.assertTrue(self.db.flush_writes(5))
+        submitted = self.db.get_pool_stats()['write_queue']['submitted']
+
+        commits = []
+        with self.db.get_connection() as conn:
+            conn.set_trace_callback(lambda s: commits.append(s) if s == 'COMMIT' else None)
+        self.assertEqual(self.db.add_download_logs_bulk(make_logs(1200), chunk_size=500), 1200)
+
+        self.assertEqual(len(commits), 3)  # one transaction per chunk, not one for the whole import
+        self.assertEqual(self.db.get_pool_stats()['write_queue']['submitted'], submitted)
+        # Queued writes still go through while/after the import
+        self.db.update_job_status('job-1', 'success', 'done', durable=True)
+        self.assertEqual(self.db.get_job('job-1')['status'], 'success')
+
+    def test_migrate_from_json(self):
+        jobs_json = os.path.join(self.tmp, 'jobs.json')
+        logs_json = os.path.join(self.tmp, 'logs.json')
+        job = {'id': 'job_1', 'name': 'Harian', 'crawler_type': 'seruti', 'start_date': '2025-11-01',
+               'end_date': '2025-12-31', 'hour': 8, 'minute': 0, 'created_at': '2025-11-01T00:00:00'}
+        with open(jobs_json, 'w') as f:
+            json.dump([job, job, {'id': 'broken'}], f)
+        with open(logs_json, 'w') as f:
+            json.dump(make_logs(50), f)
+
+        self.assertEqual(self.db.migrate_from_json(jobs_json, logs_json), (1, 50))
+        self.assertEqual(self.db.migrate_from_json(jobs_json, os.path.join(self.tmp, 'missing.json')), (0, 0))
+        self.assertEqual(self.db.get_job('job_1')['name'], 'Harian')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Test deadline-aware crawl execution (global time budget) and cancellation
+"""
+import unittest
+import sys
+import os
+import time
+import threading
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.crawlers.base_crawler import BaseCrawler
+
+
+class SlowCrawler(BaseCrawler):
+    """Crawler tanpa browser; login menggantung lebih lama dari budget"""
+
+    def setup_driver(self):
+        return True
+
+    def login(self):
+        self._sleep(30)
+
+    def navigate_to_data_page(self): pass
+    def get_data_date(self): return "2025-11-07"
+    def download_data(self): return None
+
+
+class CrawlDeadlineTest(unittest.TestCase):
+    def test_budget_aborts_with_partial_result(self):
+        crawler = SlowCrawler(task_name='TEST_DEADLINE')
+        start = time.monotonic()
+        result = crawler.run(time_budget=0.5)
+        elapsed = time.monotonic() - start
+
+        self.assertFalse(result['success'])
+        self.assertTrue(result['timed_out'])
+        self.assertEqual(result['steps_completed'], ['setup'])
+        self.assertLess(elapsed, 5)
+        self.assertIsNone(crawler.deadline)
+
+    def test_budget_clamps_step_timeouts(self):
+        crawler = SlowCrawler()
+        crawler.deadline = time.monotonic() + 2
+        self.assertLessEqual(crawler._budget(10), 2)
+        self.assertEqual(crawler._budget(1), 1)
+
+    def test_late_lookups_never_wait_past_deadline(self):
+        class FakeDriver:
+            def __init__(self):
+                self.implicit_waits = []
+
+            def implicitly_wait(self, seconds):
+                self.implicit_waits.append(seconds)
+
+            def find_elements(self, by, value):
+                return []
+
+            def find_element(self, by, value):
+                return 'element'
+
+        crawler = SlowCrawler()
+        crawler.driver = FakeDriver()
+        crawler._implicit_timeout = lambda: 60
+        crawler._clamp_implicit_wait()
+        self.assertEqual(crawler.driver.implicit_waits, [60])  # no budget: full implicit wait
+
+        crawler.deadline = time.monotonic() + 2
+        crawler._find_elements('css selector', 'select')
+        self.assertLessEqual(crawler.driver.implicit_waits[-1], 2)
+        crawler._wait_for('step', lambda d: d.find_element('id', 'x'), timeout=1)
+        self.assertLessEqual(crawler.driver.implicit_waits[-1], 1)
+
+
+class CrawlCancelTest(unittest.TestCase):
+    def test_cancel_stops_run_within_a_second(self):
+        crawler = SlowCrawler(task_name='TEST_CANCEL')
+        results = []
+        worker = threading.Thread(target=lambda: results.append(crawler.run()))
+        worker.start()
+        time.sleep(0.2)
+
+        start = time.monotonic()
+        crawler.cancel()
+        worker.join(timeout=5)
+
+        self.assertFalse(worker.is_alive())
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertTrue(results[0]['cancelled'])
+        self.assertEqual(results[0]['steps_completed'], ['setup'])
+
+    def test_manual_run_registered_for_cancel(self):
+        from app.scheduler import CrawlScheduler
+        scheduler = CrawlScheduler()
+        crawler = SlowCrawler(task_name='TEST_MANUAL_CANCEL')
+        results = []
+        worker = threading.Thread(target=lambda: results.append(
+            scheduler.run_crawler('manual-seruti', crawler, exclusive=True)))
+        worker.start()
+        time.sleep(0.2)
+
+        self.assertEqual(scheduler.get_running_job_ids(), ['manual-seruti'])
+        with self.assertRaises(RuntimeError):
+            scheduler.run_crawler('manual-seruti', SlowCrawler(), exclusive=True)
+        self.assertTrue(scheduler.cancel_running_job('manual-seruti'))
+        worker.join(timeout=5)
+
+        self.assertTrue(results[0]['cancelled'])
+        self.assertEqual(scheduler.get_running_job_ids(), [])
+
+    def test_manual_run_recorded_in_history(self):
+        from app.scheduler import CrawlScheduler
+        scheduler = CrawlScheduler()
+        crawler = SlowCrawler()
+        with mock.patch('app.scheduler.db') as db:
+            result = scheduler.run_manual_crawl('manual-seruti', 'seruti', crawler, time_budget=0.3)
+
+        self.assertTrue(result['timed_out'])
+        run = db.add_crawl_run.call_args.kwargs
+        self.assertEqual((run['job_id'], run['task_name'], run['crawler_type'], run['status']),
+                         ('manual-seruti', 'Manual', 'seruti', 'timed_out'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Test pooled SQLite connections (per-thread reuse, WAL, busy retry)
+"""
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db_pool import ConnectionPool
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.pool = ConnectionPool(os.path.join(self.tmp, 'test.db'), busy_timeout_ms=50, busy_retries=2)
+        self.addCleanup(self.pool.close_all)
+        with self.pool.connection() as conn:
+            conn.execute('CREATE TABLE t (v INTEGER)')
+
+    def test_connection_reused_per_thread_with_wal(self):
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            self.assertIs(first, second)
+            self.assertEqual(second.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            self.assertEqual(second.execute('PRAGMA synchronous').fetchone()[0], 1)
+
+        other = []
+        worker = threading.Thread(target=lambda: other.append(self._checkout()))
+        worker.start()
+        worker.join()
+        self.assertIsNot(other[0], first)
+        self.assertEqual(self.pool.get_stats()['connections_opened'], 2)
+        self.assertGreater(self.pool.get_stats()['reuses'], 0)
+
+    def _checkout(self):
+        with self.pool.connection() as conn:
+            return conn
+
+    def test_nested_checkout_commits_once(self):
+        with self.assertRaises(ValueError):
+            with self.pool.connection() as conn:
+                conn.execute('INSERT INTO t VALUES (1)')
+                with self.pool.connection() as inner:
+                    inner.execute('INSERT INTO t VALUES (2)')
+                raise ValueError('rollback outer')
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM t').fetchone()[0], 0)
+
+    def test_busy_is_retried_and_counted(self):
+        blocker = sqlite3.connect(self.pool.db_path)
+        blocker.execute('BEGIN IMMEDIATE')
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                with self.pool.connection() as conn:
+                    conn.execute('INSERT INTO t VALUES (1)')
+        finally:
+            blocker.rollback()
+            blocker.close()
+        stats = self.pool.get_stats()
+        self.assertEqual(stats['busy_retries'], 2)
+        self.assertEqual(stats['busy_errors'], 1)
+        self.assertGreater(stats['lock_wait_seconds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Test query profiling: per-method latency histograms and the slow-query log with EXPLAIN QUERY PLAN
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+
+
+class QueryProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+        self.profiler = self.db.profiler
+        self.profiler.enabled = True
+        self.profiler.explain = True
+        self.profiler.reset()
+
+    def test_latency_recorded_per_method(self):
+        self.profiler.slow_ms = 10 ** 6
+        self.db.add_download_log('a.xlsx', '2025-11-01 09:00:00', 'SerutiCrawler', '2025-11-01', 'Harian')
+        for _ in range(3):
+            self.db.get_logs_for_task('Harian')
+        stats = {s['method']: s for s in self.profiler.method_stats()}
+        self.assertEqual(stats['get_logs_for_task']['count'], 3)
+        self.assertEqual(stats['add_download_log']['count'], 1)
+        self.assertEqual(sum(stats['get_logs_for_task']['buckets'].values()), 3)
+        self.assertIsNotNone(stats['get_logs_for_task']['p95_ms'])
+        self.assertEqual(self.profiler.slowest_queries(), [])
+
+    def test_queued_writes_and_helpers_use_public_method_name(self):
+        self.db.add_job({
+            'id': 'job-1', 'name': 'Harian', 'crawler_type': 'seruti', 'start_date': '2025-11-01',
+            'end_date': '2025-11-30', 'hour': 8, 'minute': 0, 'created_at': '2025-11-01 00:00:00',
+        })
+        self.profiler.slow_ms = 0
+        with self.assertLogs(level='WARNING'):
+            self.db.update_job_status('job-1', 'failed', 'timeout')
+            self.db.flush_writes()
+            self.db.get_logs_by_task('Harian')
+        methods = {s['method'] for s in self.profiler.method_stats()}
+        self.assertLessEqual({'add_job', 'update_job_status', 'get_logs_by_task'}, methods)
+        self.assertFalse(methods & {'wrapper', '_run', 'run', '<module>'})
+        update = [q for q in self.profiler.slowest_queries(limit=100) if 'UPDATE scheduled_jobs' in q['sql']]
+        self.assertEqual(update[0]['methods'], ['update_job_status'])
+
+    def test_slow_queries_carry_params_and_plan(self):
+        self.profiler.slow_ms = 0
+        with self.assertLogs(level='WARNING'):
+            self.db.get_logs_for_task('Harian', '2025-11-01', '2025-11-30')
+        slow = [q for q in self.profiler.slowest_queries(limit=100) if 'FROM download_logs' in q['sql']]
+        self.assertTrue(slow)
+        query = slow[0]
+        self.assertEqual(query['methods'], ['get_logs_for_task'])
+        self.assertIn('Harian', query['params'])
+        self.assertTrue(any('download_logs' in step for step in query['plan']))
+        self.assertEqual(self.profiler.recent_slow_queries(limit=1)[0]['method'], 'get_logs_for_task')
+
+        self.profiler.reset()
+        self.assertEqual((self.profiler.method_stats(), self.profiler.slowest_queries()), ([], []))
+
+    def test_disabled_profiler_records_nothing(self):
+        self.profiler.enabled = False
+        self.profiler.slow_ms = 0
+        self.db.get_logs_for_task('Harian')
+        self.assertEqual(self.profiler.method_stats(), [])
+        self.assertEqual(self.profiler.recent_slow_queries(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Test atomic download dedup (claim-before-download on a unique key)
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+
+
+class DownloadClaimTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+
+    def test_only_one_concurrent_claim_wins(self):
+        results = []
+        barrier = threading.Barrier(8)
+
+        def claim(owner):
+            barrier.wait()
+            results.append(self.db.claim_download('SerutiCrawler', '2025-11-07', owner)[0])
+
+        threads = [threading.Thread(target=claim, args=(f"run-{i}",)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(self.db.claim_download('SerutiCrawler', '2025-11-07', 'late'), (False, 'claimed'))
+
+    def test_logged_download_is_done(self):
+        self.assertTrue(self.db.claim_download('SerutiCrawler', '2025-11-07', 'run-1')[0])
+        self.db.add_download_log('a.xlsx', '2025-11-07 08:00:00', 'SerutiCrawler', '2025-11-07', 'Harian')
+        self.assertFalse(self.db.release_download_claim('SerutiCrawler', '2025-11-07', 'run-1'))
+        self.assertEqual(self.db.claim_download('SerutiCrawler', '2025-11-07', 'run-2'), (False, 'done'))
+
+    def test_failed_or_stale_claim_can_be_reclaimed(self):
+        self.assertTrue(self.db.claim_download('SerutiCrawler', '2025-11-07', 'run-1')[0])
+        self.assertFalse(self.db.release_download_claim('SerutiCrawler', '2025-11-07', 'someone-else'))
+        self.assertTrue(self.db.release_download_claim('SerutiCrawler', '2025-11-07', 'run-1'))
+        self.assertTrue(self.db.claim_download('SerutiCrawler', '2025-11-07', 'run-2')[0])
+
+        # run-2 died without releasing; a negative ttl makes its claim stale
+        self.assertTrue(self.db.claim_download('SerutiCrawler', '2025-11-07', 'run-3', ttl=-1)[0])
+
+    def test_artifacts_are_claimed_separately(self):
+        self.assertTrue(self.db.claim_download('SusenasCrawler', '2025-11-07', 'run-1', artifact='r1')[0])
+        self.assertTrue(self.db.claim_download('SusenasCrawler', '2025-11-07', 'run-1', artifact='r2')[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Test keyset pagination of download logs ((tanggal_download, id) cursor, filters, since)
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+
+
+class DownloadPaginationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+        records = []
+        for i in range(10):
+            records.append({
+                'nama_file': f'f{i}.xlsx',
+                # pairs share a timestamp so the id tie-break matters
+                'tanggal_download': f'2025-11-{1 + i // 2:02d} 08:00:00',
+                'laman_web': 'SerutiCrawler' if i % 2 == 0 else 'SusenasCrawler',
+                'data_tanggal': None,
+                'task_name': 'Harian' if i < 6 else 'Manual',
+            })
+        self.db.add_download_logs_bulk(records)
+
+    def names(self, page):
+        return [l['nama_file'] for l in page['logs']]
+
+    def test_pages_walk_all_rows_once(self):
+        seen = []
+        cursor = None
+        while True:
+            page = self.db.list_download_logs_page(limit=3, cursor=cursor)
+            seen.extend(self.names(page))
+            if not page['has_more']:
+                self.assertIsNone(page['next_cursor'])
+                break
+            cursor = page['next_cursor']
+        self.assertEqual(seen, [f'f{i}.xlsx' for i in range(9, -1, -1)])
+
+    def test_filters(self):
+        page = self.db.list_download_logs_page(limit=50, task_name='Harian', laman_web='SusenasCrawler')
+        self.assertEqual(self.names(page), ['f5.xlsx', 'f3.xlsx', 'f1.xlsx'])
+        page = self.db.list_download_logs_page(limit=50, start_date='2025-11-02', end_date='2025-11-03')
+        self.assertEqual(self.names(page), ['f5.xlsx', 'f4.xlsx', 'f3.xlsx', 'f2.xlsx'])
+
+    def test_since_returns_only_newer_rows(self):
+        first = self.db.list_download_logs_page(limit=3)
+        page = self.db.list_download_logs_page(limit=50, since=first['latest'])
+        self.assertEqual(page['logs'], [])
+        self.assertEqual(page['latest'], first['latest'])
+
+        self.db.add_download_log('new.xlsx', '2025-11-05 08:00:00', 'SerutiCrawler', None, 'Harian')
+        page = self.db.list_download_logs_page(limit=50, since=first['latest'])
+        self.assertEqual(self.names(page), ['new.xlsx'])
+        self.assertEqual(page['latest'][0], '2025-11-05 08:00:00')
+
+    def test_queries_use_indexes(self):
+        with self.db.get_connection() as conn:
+            def plan(sql, params):
+                return ' '.join(r['detail'] for r in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+            base = 'SELECT * FROM download_logs WHERE {} ORDER BY tanggal_download DESC, id DESC LIMIT 51'
+            keyset = 'tanggal_download <= ? AND (tanggal_download < ? OR id < ?)'
+            self.assertIn('idx_logs_date', plan(base.format(keyset), ('2025-11-03', '2025-11-03', 5)))
+            self.assertIn('idx_logs_task_download', plan(
+                base.format('task_name = ? AND ' + keyset), ('Harian', '2025-11-03', '2025-11-03', 5)))
+            self.assertNotIn('TEMP B-TREE', plan(base.format('task_name = ?'), ('Harian',)))
+
+
+if __name__ == '__main__':
+    unittest.main()
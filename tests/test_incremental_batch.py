@@ -0,0 +1,152 @@
+"""
+Test incremental batches: only logs not yet merged into the previous version are parsed and
+appended to a new versioned file, with lineage in batch_history
+"""
+import unittest
+import sys
+import os
+import csv
+import shutil
+import tempfile
+import importlib.util
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+from app.batch_merge import MergeError, extend_batch, merge_logs_to_file
+
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class BatchLineageTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+
+    def add_batch(self, **kwargs):
+        values = dict(task_name='Harian', start_date='2025-11-01', end_date='2025-11-30', output_format='csv',
+                      total_rows=10, columns=['id'], file_path='/out/b.csv')
+        values.update(kwargs)
+        return self.db.add_batch_history(**values)
+
+    def test_logs_not_covered_by_lineage(self):
+        first = self.db.add_download_log('a.csv', '2025-11-01 09:00:00', 'Seruti', '2025-11-01', 'Harian')
+        second = self.db.add_download_log('b.csv', '2025-11-02 09:00:00', 'Seruti', '2025-11-02', 'Harian')
+        third = self.db.add_download_log('c.csv', '2025-11-03 09:00:00', 'Seruti', '2025-11-03', 'Harian')
+        # Only second was merged: a lower id committed later (first) or a skipped file is still picked up
+        full = self.add_batch(max_log_id=second, log_count=1, log_ids=[second])
+
+        logs = self.db.get_logs_for_task('Harian', '2025-11-01', '2025-11-30', exclude_batches=[full])
+        self.assertEqual([l['id'] for l in logs], [first, third])
+        v2 = self.add_batch(mode='incremental', version=2, parent_id=full, log_ids=[first, third])
+        lineage = [b['id'] for b in self.db.get_batch_lineage(v2)]
+        self.assertEqual(self.db.get_logs_for_task('Harian', '2025-11-01', '2025-11-30', exclude_batches=lineage), [])
+        # Another lineage does not hide logs
+        self.assertEqual(len(self.db.get_logs_for_task('Harian', exclude_batches=[v2])), 1)
+
+    def test_latest_compatible_batch(self):
+        self.add_batch()  # no batch_logs rows: not a base
+        self.add_batch(max_log_id=5)  # recorded before batch_logs: not a base either
+        full = self.add_batch(max_log_id=5, log_count=5, log_ids=[1, 2, 5])
+        self.add_batch(output_format='parquet', log_ids=[9])
+        self.add_batch(end_date='2025-11-15', log_ids=[9])
+        self.add_batch(status='failed', log_ids=[9])
+        self.assertEqual(self.db.get_latest_batch('Harian', '2025-11-01', '2025-11-30', 'csv')['id'], full)
+
+        increment = self.add_batch(mode='incremental', version=2, parent_id=full, max_log_id=7, log_count=7,
+                                   log_ids=[7])
+        latest = self.db.get_latest_batch('Harian', '2025-11-01', '2025-11-30', 'csv')
+        self.assertEqual((latest['id'], latest['version'], latest['max_log_id']), (increment, 2, 7))
+
+        # Open ranges match open ranges only
+        self.assertIsNone(self.db.get_latest_batch('Harian', None, None, 'csv'))
+        open_range = self.add_batch(start_date=None, end_date='', log_ids=[3])
+        self.assertEqual(self.db.get_latest_batch('Harian', '', None, 'csv')['id'], open_range)
+
+    def test_lineage(self):
+        full = self.add_batch(max_log_id=5)
+        v2 = self.add_batch(mode='incremental', version=2, parent_id=full, max_log_id=7)
+        v3 = self.add_batch(mode='incremental', version=3, parent_id=v2, max_log_id=8)
+        lineage = self.db.get_batch_lineage(v3)
+        self.assertEqual([(b['id'], b['version'], b['mode']) for b in lineage],
+                         [(full, 1, 'full'), (v2, 2, 'incremental'), (v3, 3, 'incremental')])
+        self.assertEqual(self.db.get_batch_lineage(9999), [])
+
+
+@unittest.skipUnless(HAS_PANDAS, 'pandas not installed')
+class ExtendBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def log(self, name, header, rows, day):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return {'nama_file': path, 'data_tanggal': day}
+
+    def test_csv_version_appends_new_rows(self):
+        old_logs = [self.log('d1.csv', ['id', 'nama'], [[1, 'a'], [2, 'b']], '2025-11-01')]
+        parent_path = os.path.join(self.tmp, 'v1.csv')
+        parent = merge_logs_to_file(old_logs, parent_path, 'csv')
+        with open(parent_path, 'rb') as f:
+            parent_bytes = f.read()
+
+        # A new day whose file has the columns in another order plus an extra one
+        new_logs = [self.log('d2.csv', ['nama', 'extra', 'id'], [['c', 'x', 3]], '2025-11-02')]
+        out_path = os.path.join(self.tmp, 'v2.csv')
+        result = extend_batch(parent_path, new_logs, out_path, 'csv', parent['columns'])
+
+        self.assertEqual((result['files'], result['total_rows']), (1, 1))
+        self.assertEqual(result['merged_logs'], new_logs)
+        self.assertEqual([p['file'] for p in result['parse_times']], [new_logs[0]['nama_file']])  # only new files parsed
+        with open(out_path, 'rb') as f:
+            content = f.read()
+        self.assertTrue(content.startswith(parent_bytes))
+        self.assertEqual(content.count('\ufeff'.encode('utf-8')), 1)
+        rows = list(csv.DictReader(content.decode('utf-8-sig').splitlines()))
+        self.assertEqual([(r['id'], r['nama'], r['data_tanggal']) for r in rows],
+                         [('1', 'a', '2025-11-01'), ('2', 'b', '2025-11-01'), ('3', 'c', '2025-11-02')])
+        with open(parent_path, 'rb') as f:
+            self.assertEqual(f.read(), parent_bytes)  # previous version untouched
+
+    def test_unreadable_increment_leaves_no_file(self):
+        parent_path = os.path.join(self.tmp, 'v1.csv')
+        merge_logs_to_file([self.log('d1.csv', ['id'], [[1]], '2025-11-01')], parent_path, 'csv')
+        out_path = os.path.join(self.tmp, 'v2.csv')
+        result = extend_batch(parent_path, [{'nama_file': os.path.join(self.tmp, 'gone.csv')}], out_path, 'csv',
+                              ['id', 'data_tanggal', 'source_file'])
+        self.assertEqual((result['files'], result['merged_logs']), (0, []))
+        self.assertFalse(os.path.exists(out_path))
+
+    def test_xlsx_not_incremental(self):
+        with self.assertRaises(MergeError):
+            extend_batch('a.xlsx', [], os.path.join(self.tmp, 'b.xlsx'), 'xlsx', [])
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow not installed')
+    def test_parquet_version_copies_row_groups(self):
+        import pyarrow.parquet as pq
+
+        parent_path = os.path.join(self.tmp, 'v1.parquet')
+        parent = merge_logs_to_file(
+            [self.log('d1.csv', ['id', 'nama'], [[1, 'a'], [2, 'b']], '2025-11-01'),
+             self.log('d2.csv', ['id', 'nama'], [[3, 'c']], '2025-11-02')],
+            parent_path, 'parquet')
+        out_path = os.path.join(self.tmp, 'v2.parquet')
+        extend_batch(parent_path, [self.log('d3.csv', ['id', 'nama'], [[4, 'd']], '2025-11-03')],
+                     out_path, 'parquet', parent['columns'])
+
+        source = pq.ParquetFile(out_path)
+        self.assertEqual(source.metadata.num_row_groups, 3)
+        self.assertEqual(source.schema_arrow, pq.ParquetFile(parent_path).schema_arrow)
+        table = source.read()
+        self.assertEqual(table.column('id').to_pylist(), [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(table.column('data_tanggal').to_pylist()[-1], '2025-11-03')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Test archival of old download_logs into per-year databases and transparent reads via ATTACH
+"""
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database, LogArchiveUnavailable
+
+
+class LogArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.archive_dir = os.path.join(self.tmp, 'archive')
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+        self.recent = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        self.db.add_download_logs_bulk([
+            {'nama_file': 'old23.xlsx', 'tanggal_download': '2023-06-01 08:00:00',
+             'laman_web': 'SerutiCrawler', 'data_tanggal': '2023-06-01', 'task_name': 'Harian'},
+            {'nama_file': 'old24a.xlsx', 'tanggal_download': '2024-03-01 08:00:00',
+             'laman_web': 'SerutiCrawler', 'data_tanggal': '2024-03-01', 'task_name': 'Harian'},
+            {'nama_file': 'old24b.xlsx', 'tanggal_download': '2024-03-02 08:00:00',
+             'laman_web': 'SusenasCrawler', 'data_tanggal': '2024-03-02', 'task_name': 'Harian'},
+            {'nama_file': 'new.xlsx', 'tanggal_download': f'{self.recent} 08:00:00',
+             'laman_web': 'SerutiCrawler', 'data_tanggal': self.recent, 'task_name': 'Harian'},
+        ])
+
+    def archive(self):
+        return self.db.archive_download_logs(older_than_days=30, archive_dir=self.archive_dir)
+
+    def hot_count(self):
+        with self.db.get_connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM main.download_logs').fetchone()[0]
+
+    def test_moves_old_logs_into_yearly_files(self):
+        self.assertEqual(self.archive(), {'2023': 1, '2024': 2})
+        self.assertEqual(self.hot_count(), 1)
+        self.assertEqual(self.archive(), {})
+
+        conn = sqlite3.connect(os.path.join(self.archive_dir, 'download_logs_2024.db'))
+        self.assertEqual([r[0] for r in conn.execute('SELECT nama_file FROM download_logs ORDER BY id')],
+                         ['old24a.xlsx', 'old24b.xlsx'])
+        conn.close()
+        archives = {a['year']: a for a in self.db.list_log_archives()}
+        self.assertEqual((archives['2024']['row_count'], archives['2024']['max_download_day']), (2, '2024-03-02'))
+
+    def test_history_remains_queryable(self):
+        self.archive()
+        self.assertEqual(len(self.db.get_logs_for_task('Harian')), 4)
+        self.assertEqual([l['nama_file'] for l in self.db.get_logs_for_task('Harian', '2024-01-01', '2024-12-31')],
+                         ['old24a.xlsx', 'old24b.xlsx'])
+        self.assertEqual([l['nama_file'] for l in self.db.get_all_download_logs(limit=10)],
+                         ['new.xlsx', 'old24b.xlsx', 'old24a.xlsx', 'old23.xlsx'])
+        self.assertEqual(self.db.get_batchable_tasks()[0]['total_logs'], 4)
+        self.assertEqual(self.db.get_latest_by_source('SusenasCrawler')['nama_file'], 'old24b.xlsx')
+        self.assertTrue(self.db.check_download_exists('SerutiCrawler', '2023-06-01'))
+        self.assertEqual([l['nama_file'] for l in self.db.get_download_logs_by_date('2024-03-01')], ['old24a.xlsx'])
+
+        page = self.db.list_download_logs_page(limit=2)
+        self.assertEqual([l['nama_file'] for l in page['logs']], ['new.xlsx', 'old24b.xlsx'])
+        page = self.db.list_download_logs_page(limit=2, cursor=page['next_cursor'])
+        self.assertEqual([l['nama_file'] for l in page['logs']], ['old24a.xlsx', 'old23.xlsx'])
+        self.assertFalse(page['has_more'])
+
+    def test_hot_reads_skip_archives(self):
+        self.archive()
+        self.db.pool.close_all()  # fresh connection, nothing attached yet
+        self.assertEqual(self.db.get_all_download_logs(limit=1)[0]['nama_file'], 'new.xlsx')
+        self.db.get_logs_for_task('Harian', self.recent, self.recent)
+        with self.db.get_connection() as conn:
+            attached = {row[1] for row in conn.execute('PRAGMA database_list')}
+        self.assertEqual(attached, {'main'})
+
+    def test_archives_beyond_attach_limit(self):
+        self.db.add_download_logs_bulk([
+            {'nama_file': f'y{year}.xlsx', 'tanggal_download': f'{year}-05-01 08:00:00',
+             'laman_web': 'SerutiCrawler', 'data_tanggal': f'{year}-05-01', 'task_name': 'Harian'}
+            for year in range(2010, 2020)
+        ])
+        self.assertEqual(len(self.archive()), 12)  # 2010-2019, 2023, 2024
+
+        # Each read attaches what it needs, detaching archives of earlier reads
+        for year in range(2010, 2020):
+            self.assertEqual([l['nama_file'] for l in self.db.get_logs_for_task('Harian', f'{year}-01-01', f'{year}-12-31')],
+                             [f'y{year}.xlsx'])
+        self.assertEqual(len(self.db.get_logs_for_task('Harian', '2023-01-01', '2024-12-31')), 3)
+        # More archives than one connection can attach: fail instead of returning part of the history
+        with self.assertRaises(LogArchiveUnavailable):
+            self.db.get_logs_for_task('Harian')
+
+    def test_coverage_kept_for_archived_days(self):
+        self.archive()
+        self.assertEqual(self.db.count_covered_days('Harian', '2024-03-01', '2024-03-02'), 2)
+        with self.db.get_connection() as conn:
+            conn.execute('DELETE FROM download_logs')  # normal deletes still maintain coverage
+        self.assertEqual(self.db.count_covered_days('Harian', self.recent, self.recent), 0)
+        self.assertEqual(self.db.count_covered_days('Harian', '2024-03-01', '2024-03-02'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
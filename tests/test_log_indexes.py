@@ -0,0 +1,56 @@
+"""
+Test sargable download_logs date columns (effective_date/download_day) and their indexes
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+
+
+class LogDateColumnsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+        self.db.add_download_log('a.xlsx', '2025-11-03 08:00:00', 'SerutiCrawler', '2025-11-01', 'Harian')
+        self.db.add_download_log('b.xlsx', '2025-11-04 08:00:00', 'SerutiCrawler', None, 'Harian')
+        self.db.add_download_log('c.xlsx', '2025-11-05 08:00:00', 'SerutiCrawler', '05 Nov 2025', 'Harian')
+
+    def plan(self, sql, params=()):
+        with self.db.get_connection() as conn:
+            return ' '.join(row['detail'] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+
+    def test_columns_populated_on_insert(self):
+        logs = self.db.get_logs_for_task('Harian')
+        self.assertEqual([(l['nama_file'], l['effective_date'], l['download_day']) for l in logs], [
+            ('a.xlsx', '2025-11-01', '2025-11-03'),
+            ('b.xlsx', '2025-11-04', '2025-11-04'),
+            ('c.xlsx', '2025-11-05', '2025-11-05'),
+        ])
+        self.assertEqual([l['nama_file'] for l in self.db.get_logs_for_task('Harian', '2025-11-02', '2025-11-04')],
+                         ['b.xlsx'])
+
+    def test_batchable_tasks_ranges(self):
+        task = self.db.get_batchable_tasks()[0]
+        self.assertEqual((task['task_name'], task['total_logs']), ('Harian', 3))
+        self.assertEqual((task['first_download'], task['last_download']), ('2025-11-03', '2025-11-05'))
+        self.assertEqual((task['first_data_date'], task['last_data_date']), ('2025-11-01', '2025-11-05'))
+
+    def test_queries_use_indexes(self):
+        self.assertIn('idx_logs_task_effective', self.plan(
+            "SELECT * FROM download_logs WHERE task_name = ? AND effective_date >= date(?) "
+            "ORDER BY effective_date ASC, id ASC", ('Harian', '2025-11-01')))
+        self.assertIn('COVERING INDEX idx_logs_task_effective', self.plan(
+            "SELECT task_name, COUNT(*), MIN(download_day), MAX(effective_date) FROM download_logs "
+            "WHERE task_name IS NOT NULL AND task_name <> '' GROUP BY task_name"))
+        self.assertIn('idx_logs_download_day', self.plan(
+            "SELECT * FROM download_logs WHERE download_day = ? ORDER BY tanggal_download DESC", ('2025-11-04',)))
+
+
+if __name__ == '__main__':
+    unittest.main()
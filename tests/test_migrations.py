@@ -0,0 +1,99 @@
+"""
+Test versioned schema migrations (schema_version table, run-once, rollback)
+"""
+import unittest
+import sys
+import os
+import sqlite3
+import shutil
+import tempfile
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import migrations as migrations_module
+from app.migrations import Migration, run_migrations, current_version
+from app.migrations.crawler_db import MIGRATIONS as CRAWLER_MIGRATIONS
+from app.migrations.users_db import MIGRATIONS as USERS_MIGRATIONS
+
+
+class MigrationRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.addCleanup(self.conn.close)
+
+    def test_runs_once_then_skips(self):
+        applied = run_migrations(self.conn, CRAWLER_MIGRATIONS, 'crawler.db')
+        self.assertEqual(applied, [m.version for m in CRAWLER_MIGRATIONS])
+        self.assertEqual(current_version(self.conn), CRAWLER_MIGRATIONS[-1].version)
+
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        self.assertEqual(run_migrations(self.conn, CRAWLER_MIGRATIONS, 'crawler.db'), [])
+        self.conn.set_trace_callback(None)
+        self.assertFalse([s for s in statements if 'CREATE' in s.upper()])
+
+    def test_adopts_pre_migration_database(self):
+        self.conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, "
+                          "password_hash TEXT NOT NULL, email TEXT, full_name TEXT, role TEXT, is_active INTEGER, "
+                          "created_at TEXT NOT NULL, last_login TEXT)")
+        self.conn.execute("INSERT INTO users (username, password_hash, created_at) VALUES ('budi', 'x', 'now')")
+        self.conn.commit()
+
+        run_migrations(self.conn, USERS_MIGRATIONS, 'users.db')
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM users').fetchone()[0], 1)
+        self.assertGreater(self.conn.execute('SELECT COUNT(*) FROM app_settings').fetchone()[0], 0)
+
+    def test_failed_migration_rolls_back(self):
+        def broken(cursor):
+            cursor.execute('CREATE TABLE half_done (id INTEGER)')
+            cursor.execute('INSERT INTO missing_table VALUES (1)')
+
+        migrations = [Migration(1, 'ok', lambda c: c.execute('CREATE TABLE a (id INTEGER)')),
+                      Migration(2, 'broken', broken)]
+        with self.assertRaises(sqlite3.OperationalError):
+            run_migrations(self.conn, migrations, 'test')
+        self.assertEqual(current_version(self.conn), 1)
+        tables = {r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertNotIn('half_done', tables)
+
+    def test_skips_migration_applied_by_another_process(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        path = os.path.join(tmp, 'crawler.db')
+        calls = []
+        migrations = [Migration(1, 'a', lambda c: calls.append(1) or c.execute('CREATE TABLE a (id INTEGER)')),
+                      Migration(2, 'b', lambda c: calls.append(2) or c.execute('CREATE TABLE b (id INTEGER)'))]
+
+        other = sqlite3.connect(path)
+        self.addCleanup(other.close)
+        conn = sqlite3.connect(path)
+        self.addCleanup(conn.close)
+        statements = []
+        conn.set_trace_callback(statements.append)
+
+        self.assertEqual(run_migrations(other, migrations, 'other'), [1, 2])
+
+        # This process read v0 before the other one applied everything
+        real_version = current_version
+        stale_reads = [conn]
+
+        def version(c):
+            if c in stale_reads:
+                stale_reads.remove(c)
+                return 0
+            return real_version(c)
+
+        with mock.patch.object(migrations_module, 'current_version', side_effect=version):
+            self.assertEqual(run_migrations(conn, migrations, 'crawler.db'), [])
+        self.assertEqual(calls, [1, 2])  # not applied twice
+        self.assertIn('BEGIN IMMEDIATE', statements)
+        self.assertEqual(real_version(conn), 2)
+
+    def test_rejects_unordered_versions(self):
+        noop = lambda c: None
+        with self.assertRaises(ValueError):
+            run_migrations(self.conn, [Migration(2, 'b', noop), Migration(1, 'a', noop)], 'test')
+
+
+if __name__ == '__main__':
+    unittest.main()
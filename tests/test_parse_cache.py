@@ -0,0 +1,159 @@
+"""
+Test the parsed-file cache: unchanged Excel downloads are read back from Feather
+instead of being parsed again, with LRU eviction by disk budget
+"""
+import unittest
+import sys
+import os
+import time
+import tempfile
+import shutil
+import importlib.util
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.parse_cache import ParseCache
+
+HAS_DEPS = all(importlib.util.find_spec(m) is not None for m in ('pandas', 'pyarrow', 'openpyxl'))
+
+
+@unittest.skipUnless(HAS_DEPS, 'pandas/pyarrow/openpyxl not installed')
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        import pandas as pd
+        self.pd = pd
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.cache = ParseCache(path=os.path.join(self.dir, 'cache'), max_bytes=10 * 1024 * 1024)
+        self.calls = []
+
+    def write_file(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def parser(self, rows=3):
+        def parse(filepath):
+            self.calls.append(filepath)
+            return self.pd.DataFrame({'id': list(range(rows)), 'nama': [f'n{i}' for i in range(rows)]})
+        return parse
+
+    def test_hit_skips_parser(self):
+        path = self.write_file('a.xlsx', 'v1')
+        first = self.cache.load(path, self.parser())
+        second = self.cache.load(path, self.parser())
+        self.assertEqual(len(self.calls), 1)
+        self.pd.testing.assert_frame_equal(first, second)
+
+        # Same content under a new mtime (e.g. re-downloaded) is still a hit
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        self.cache.load(path, self.parser())
+        self.assertEqual(len(self.calls), 1)
+
+        # Changed content is parsed again
+        self.write_file('a.xlsx', 'v2')
+        self.cache.load(path, self.parser())
+        self.assertEqual(len(self.calls), 2)
+        stats = self.cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (2, 2, 2))
+
+    def test_fingerprint_not_rehashed_for_unchanged_file(self):
+        path = self.write_file('a.xlsx', 'v1')
+        digest = self.cache.fingerprint(path)
+        with mock.patch('app.parse_cache.hashlib.sha256') as sha:
+            self.assertEqual(self.cache.fingerprint(path), digest)
+            sha.assert_not_called()
+
+    def test_lru_eviction_by_disk_budget(self):
+        paths = [self.write_file(f'f{i}.xlsx', f'content {i}') for i in range(3)]
+        self.cache.load(paths[0], self.parser(500))
+        entry_size = self.cache.get_stats()['size_bytes']
+        self.cache.max_bytes = int(entry_size * 2.5)  # room for two entries
+
+        self.cache.load(paths[1], self.parser(500))
+        old = time.time() - 100
+        os.utime(self.cache.entry_path(self.cache.fingerprint(paths[1])), (old, old))
+        self.cache.load(paths[0], self.parser(500))  # hit: f0 becomes most recently used
+        self.cache.load(paths[2], self.parser(500))  # evicts f1, the least recently used
+
+        self.assertEqual(self.cache.get_stats()['evictions'], 1)
+        self.assertFalse(os.path.exists(self.cache.entry_path(self.cache.fingerprint(paths[1]))))
+        self.assertTrue(os.path.exists(self.cache.entry_path(self.cache.fingerprint(paths[0]))))
+        self.assertLessEqual(self.cache.get_stats()['size_bytes'], self.cache.max_bytes)
+
+    def test_uncacheable_frame_is_returned(self):
+        path = self.write_file('mixed.xlsx', 'x')
+        mixed = lambda p: self.pd.DataFrame({'nilai': [1, 'dua', 3.0]})  # mixed types: no Arrow column
+        df = self.cache.load(path, mixed)
+        self.assertEqual(list(df['nilai']), [1, 'dua', 3.0])
+        stats = self.cache.get_stats()
+        self.assertEqual((stats['entries'], stats['uncacheable']), (0, 1))
+        self.assertEqual(os.listdir(self.cache.path), [])  # no temp file left behind
+
+    def test_disabled_with_zero_budget(self):
+        cache = ParseCache(path=os.path.join(self.dir, 'off'), max_bytes=0)
+        path = self.write_file('a.xlsx', 'v1')
+        cache.load(path, self.parser())
+        cache.load(path, self.parser())
+        self.assertEqual(len(self.calls), 2)
+        self.assertFalse(os.path.exists(cache.path))
+        self.assertEqual((cache.get_stats()['enabled'], cache.get_stats()['disabled_reason']),
+                         (False, 'PARSE_CACHE_MAX_MB=0'))
+        self.assertIsNone(self.cache.get_stats()['disabled_reason'])
+
+    def test_disabled_without_pyarrow(self):
+        cache = ParseCache(path=os.path.join(self.dir, 'nopyarrow'), max_bytes=1024)
+        with mock.patch.dict(sys.modules, {'pyarrow.feather': None}):
+            self.assertEqual(cache.get_stats()['disabled_reason'], 'pyarrow tidak terinstall')
+        path = self.write_file('a.xlsx', 'v1')
+        cache.load(path, self.parser())
+        self.assertFalse(os.path.exists(cache.path))
+
+    def test_repeated_batch_skips_openpyxl(self):
+        from app import batch_merge
+        from app.batch_merge import PreviewWriter, merge_logs
+
+        path = os.path.join(self.dir, 'susenas.xlsx')
+        self.pd.DataFrame({'id': [1, 2], 'nama': ['a', 'b']}).to_excel(path, index=False)
+        logs = [{'nama_file': path, 'data_tanggal': '2025-11-01'}]
+
+        with mock.patch.object(batch_merge, 'parse_cache', self.cache):
+            first = merge_logs(logs, PreviewWriter(), workers=1)
+            with mock.patch.object(self.pd, 'read_excel', side_effect=AssertionError('parsed again')):
+                writer = PreviewWriter()
+                second = merge_logs(logs, writer, workers=1)
+        self.assertEqual(second['skipped'], [])
+        self.assertEqual(first['total_rows'], second['total_rows'])
+        self.assertEqual(writer.rows()[1], ['2', 'b', '2025-11-01', path])
+
+    def test_pool_uses_parent_cache_and_stats(self):
+        from app import batch_merge
+        from app.batch_merge import PreviewWriter, merge_logs
+
+        logs = []
+        for i in range(3):
+            path = os.path.join(self.dir, f'file{i}.xlsx')
+            self.pd.DataFrame({'id': [i], 'nama': [f'n{i}']}).to_excel(path, index=False)
+            logs.append({'nama_file': path, 'data_tanggal': '2025-11-01'})
+
+        with mock.patch.object(batch_merge, 'parse_cache', self.cache):
+            pool = batch_merge.start_parse_pool(2)  # workers forked with this cache
+            self.addCleanup(batch_merge.stop_parse_pool)
+            first = merge_logs(logs, PreviewWriter(), workers=2)
+            # Misses parsed and stored by the workers are counted in this process
+            self.assertEqual(first['workers'], 2)
+            self.assertEqual((self.cache.stats['misses'], self.cache.stats['stored'], self.cache.stats['hits']),
+                             (3, 3, 0))
+            self.assertEqual(len(self.cache._fingerprints), 3)  # hashed here, not in the workers
+
+            with mock.patch.object(pool, 'submit', side_effect=AssertionError('hit sent to a worker')):
+                writer = PreviewWriter()
+                second = merge_logs(logs, writer, workers=2)
+        self.assertEqual(second['skipped'], [])
+        self.assertEqual([r[0] for r in writer.rows()], ['0', '1', '2'])
+        self.assertEqual(self.cache.get_stats()['hits'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
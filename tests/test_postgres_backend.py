@@ -0,0 +1,176 @@
+"""
+Test the PostgreSQL backend (same Database/AuthManager methods as on SQLite)
+
+Runs only against a local server, e.g.
+TEST_DATABASE_URL=postgresql://postgres@localhost:5432/crawler_test python -m unittest tests.test_postgres_backend
+(the "crawler" and "auth" schemas of that database are dropped first).
+"""
+import unittest
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db_pool import create_pool
+from app.migrations.crawler_pg import MIGRATIONS
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL', '')
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, 'TEST_DATABASE_URL not set')
+class PostgresBackendTest(unittest.TestCase):
+    def setUp(self):
+        pool = create_pool(TEST_DATABASE_URL)
+        with pool.connection() as conn:
+            conn.execute('DROP SCHEMA IF EXISTS crawler CASCADE')
+            conn.execute('DROP SCHEMA IF EXISTS auth CASCADE')
+        pool.close_all()
+
+        from app.database import Database
+        self.db = Database(TEST_DATABASE_URL)
+        self.addCleanup(self.db.pool.close_all)
+
+    def add_job(self, job_id='job-1'):
+        self.db.add_job({
+            'id': job_id, 'name': 'Harian', 'crawler_type': 'seruti', 'start_date': '2025-11-01',
+            'end_date': '2025-11-30', 'hour': 8, 'minute': 0, 'created_at': '2025-11-01 00:00:00',
+        })
+
+    def test_schema_and_download_logs(self):
+        self.assertEqual(self.db.dialect, 'postgresql')
+        self.assertEqual(self.db.schema_version(), MIGRATIONS[-1].version)
+        self.assertNotIn('secret', self.db.db_path)
+
+        log_id = self.db.add_download_log('a.xlsx', '2025-11-01 09:00:00', 'SerutiCrawler', '2025-11-01',
+                                          'Harian', file_size=100)
+        self.assertIsInstance(log_id, int)
+        self.db.add_download_logs_bulk([
+            {'nama_file': 'b.xlsx', 'tanggal_download': '2025-11-02 07:00:00', 'laman_web': 'SerutiCrawler',
+             'data_tanggal': '05 Nov 2025', 'task_name': 'Harian', 'file_size': 300},
+            {'nama_file': 'c.xlsx', 'tanggal_download': '2025-11-03 08:00:00', 'laman_web': 'SusenasCrawler',
+             'task_name': 'Harian'},
+        ])
+
+        logs = self.db.get_logs_for_task('Harian', '2025-11-01', '2025-11-02')
+        self.assertEqual([l['nama_file'] for l in logs], ['a.xlsx', 'b.xlsx'])  # unparseable data date -> download day
+        self.assertTrue(self.db.check_download_exists('SerutiCrawler', '2025-11-01'))
+        self.assertEqual(self.db.get_latest_by_source('SusenasCrawler')['nama_file'], 'c.xlsx')
+        self.assertEqual(self.db.get_batchable_tasks()[0]['total_logs'], 3)
+
+        coverage = self.db.get_task_coverage('Harian')
+        self.assertEqual([(r['day'], r['log_count'], r['total_bytes']) for r in coverage],
+                         [('2025-11-01', 1, 100), ('2025-11-02', 1, 300), ('2025-11-03', 1, 0)])
+        self.assertEqual(self.db.count_covered_days('Harian', '2025-11-01', '2025-11-30'), 3)
+
+        page = self.db.list_download_logs_page(limit=2)
+        self.assertEqual([l['nama_file'] for l in page['logs']], ['c.xlsx', 'b.xlsx'])
+        page = self.db.list_download_logs_page(limit=2, cursor=page['next_cursor'])
+        self.assertEqual(([l['nama_file'] for l in page['logs']], page['has_more']), (['a.xlsx'], False))
+        self.assertEqual(len(self.db.get_download_logs_by_date('2025-11-02')), 1)
+
+    def test_jobs_claims_and_history(self):
+        self.add_job()
+        self.assertEqual(self.db.add_jobs_bulk([{
+            'id': 'job-1', 'name': 'dup', 'crawler_type': 'seruti', 'start_date': 'x', 'end_date': 'x',
+            'hour': 1, 'minute': 1, 'created_at': 'x',
+        }]), 0)
+        self.db.update_job_status('job-1', 'failed', 'Error: timeout')
+        self.assertEqual(self.db.get_job('job-1')['last_message'], 'Error: timeout')
+
+        self.assertEqual(self.db.claim_download('SerutiCrawler', '2025-11-05', 'run-1'), (True, None))
+        self.assertEqual(self.db.claim_download('SerutiCrawler', '2025-11-05', 'run-2'), (False, 'claimed'))
+        self.assertTrue(self.db.release_download_claim('SerutiCrawler', '2025-11-05', 'run-1'))
+        self.assertEqual(self.db.claim_download('SerutiCrawler', '2025-11-05', 'run-2'), (True, None))
+
+        first = self.db.add_download_log('a.xlsx', '2025-11-01 09:00:00', 'SerutiCrawler', '2025-11-01', 'Harian')
+        second = self.db.add_download_log('b.xlsx', '2025-11-02 09:00:00', 'SerutiCrawler', '2025-11-02', 'Harian')
+        history_id = self.db.add_batch_history('Harian', '2025-11-01', '2025-11-30', 'xlsx', 10, ['a'], '/out/b.xlsx',
+                                               log_ids=[first])
+        self.assertEqual(self.db.get_batch_history(history_id)['total_rows'], 10)
+        self.assertEqual([l['id'] for l in self.db.get_logs_for_task('Harian', exclude_batches=[history_id])],
+                         [second])
+        version_id = self.db.add_batch_history('Harian', '2025-11-01', '2025-11-30', 'xlsx', 12, ['a'], '/out/v2.xlsx',
+                                               mode='incremental', version=2, parent_id=history_id, max_log_id=second,
+                                               log_ids=[second])
+        self.assertEqual(self.db.get_latest_batch('Harian', '2025-11-01', '2025-11-30', 'xlsx')['id'], version_id)
+        self.assertEqual([b['version'] for b in self.db.get_batch_lineage(version_id)], [1, 2])
+        self.assertEqual(len(self.db.list_batch_history()), 2)
+        self.db.add_latency_sample('SerutiCrawler', 'download', 2.5)
+        self.assertEqual(self.db.get_latency_samples('SerutiCrawler', 'download'), [2.5])
+
+    def test_search(self):
+        self.add_job()
+        log_id = self.db.add_download_log('Progres_Seruti_2025-11-01.xlsx', '2025-11-01 09:00:00', 'SerutiCrawler',
+                                          '2025-11-01', 'Harian')
+        self.db.add_download_log('Pencacahan_Susenas.xlsx', '2025-11-02 09:00:00', 'SusenasCrawler',
+                                 '2025-11-02', 'Bulanan')
+        self.db.update_job_status('job-1', 'failed', 'Error: timeout menunggu tombol download')
+
+        result = self.db.search('progres 2025')['results']
+        self.assertEqual([(r['kind'], r['ref'], r['title']) for r in result],
+                         [('download_log', log_id, 'Progres_Seruti_2025-11-01.xlsx')])
+        result = self.db.search('timeout tomb', kinds=['job'])['results']
+        self.assertEqual([(r['kind'], r['ref']) for r in result], [('job', 'job-1')])
+        self.assertIn('[timeout]', result[0]['snippet'])
+        # Title matches rank above task-name matches
+        self.assertEqual([r['kind'] for r in self.db.search('harian')['results']], ['job', 'download_log'])
+        page = self.db.search('xlsx', limit=1)
+        self.assertEqual((len(page['results']), page['has_more']), (1, True))
+        self.assertEqual(self.db.search('"(*')['results'], [])
+
+        self.db.update_job_status('job-1', 'success', 'Download selesai')
+        self.assertEqual(self.db.search('timeout')['results'], [])
+        self.db.delete_job('job-1')
+        self.assertEqual(self.db.search('selesai')['results'], [])
+
+    def test_concurrent_migrations(self):
+        with self.db.pool.connection() as conn:
+            conn.execute('DROP SCHEMA crawler CASCADE')
+        from app.database import Database
+        errors, databases = [], []
+
+        def start():
+            try:
+                databases.append(Database(TEST_DATABASE_URL))
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=start) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for db in databases:
+            db.pool.close_all()
+        self.assertEqual(errors, [])
+        with self.db.pool.connection() as conn:
+            versions = [r[0] for r in conn.execute('SELECT version FROM crawler.schema_version ORDER BY version')]
+        self.assertEqual(versions, [m.version for m in MIGRATIONS])
+
+    def test_concurrent_writers(self):
+        def crawl(worker):
+            for i in range(20):
+                self.db.add_download_log(f'w{worker}_{i}.xlsx', f'2025-11-{i + 1:02d} 08:00:00',
+                                         'SerutiCrawler', None, 'Harian')
+        threads = [threading.Thread(target=crawl, args=(w,)) for w in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.db.count_covered_days('Harian', '2025-11-01', '2025-11-30'), 20)
+        self.assertEqual(sum(r['log_count'] for r in self.db.get_task_coverage('Harian')), 120)
+        self.assertLessEqual(self.db.get_pool_stats()['open_connections'], self.db.pool.max_size)
+
+    def test_auth_manager(self):
+        from app.auth import AuthManager
+        auth = AuthManager(TEST_DATABASE_URL, settings_ttl=float('inf'))
+        self.addCleanup(auth.pool.close_all)
+        self.assertIsNotNone(auth.verify_user('admin', 'admin123'))
+        user_id = auth.create_user('budi', 'secret')
+        self.assertIsInstance(user_id, int)
+        self.assertIsNone(auth.create_user('budi', 'other'))
+        self.assertTrue(auth.update_setting('auto_backup', 'false', 'admin'))
+        self.assertFalse(auth.get_bool_setting('auto_backup'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Test remote WebDriver downloads (Selenium Grid managed-downloads file API)
+"""
+import unittest
+import sys
+import os
+import io
+import base64
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.crawlers import remote_driver
+from app.crawlers.remote_driver import RemoteDownloads
+
+
+def zipped(name, data):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr(name, data)
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+class FakeGrid:
+    """Answers GET/POST /session/<id>/se/files"""
+
+    def __init__(self, files):
+        self.files = files
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        return self._response({'names': list(self.files)})
+
+    def post(self, url, json=None, timeout=None):
+        name = json['name']
+        return self._response({'filename': name, 'contents': zipped(name, self.files[name])})
+
+    @staticmethod
+    def _response(value):
+        response = mock.Mock()
+        response.json.return_value = {'value': value}
+        return response
+
+
+class RemoteDownloadsTest(unittest.TestCase):
+    def setUp(self):
+        self.target = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.target, True)
+        self.grid = FakeGrid({'report.xlsx': b'new', 'big.xlsx.crdownload': b''})
+        patcher = mock.patch.object(remote_driver, 'requests', self.grid)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        driver = mock.Mock(session_id='abc123')
+        self.downloads = RemoteDownloads(driver, self.target, base_url='http://grid:4444/wd/hub/')
+
+    def test_sync_fetches_completed_files_once(self):
+        with open(os.path.join(self.target, 'report.xlsx'), 'wb') as f:
+            f.write(b'old')
+
+        self.assertEqual(self.downloads.sync(), ['report (1).xlsx'])
+        self.assertEqual(self.downloads.sync(), [])
+        self.assertEqual(self.grid.urls[0], 'http://grid:4444/wd/hub/session/abc123/se/files')
+        with open(os.path.join(self.target, 'report (1).xlsx'), 'rb') as f:
+            self.assertEqual(f.read(), b'new')
+        self.assertFalse(os.path.exists(os.path.join(self.target, 'big.xlsx.crdownload')))
+
+
+if __name__ == '__main__':
+    unittest.main()
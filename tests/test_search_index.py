@@ -0,0 +1,84 @@
+"""
+Test FTS5 search over download logs, job messages and batch/report notes (trigger sync, ranking, paging)
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+        self.db.write_queue.enabled = False
+        self.db.add_download_logs_bulk([
+            {'nama_file': 'Progres_Seruti_2024-03-01.xlsx', 'tanggal_download': '2024-03-01 08:00:00',
+             'laman_web': 'SerutiCrawler', 'data_tanggal': '2024-03-01', 'task_name': 'Harian Seruti'},
+            {'nama_file': 'Pencacahan_Susenas_2025-11-01.xlsx', 'tanggal_download': '2025-11-01 08:00:00',
+             'laman_web': 'SusenasCrawler', 'data_tanggal': '2025-11-01', 'task_name': 'Harian Susenas'},
+        ])
+        self.db.add_job({
+            'id': 'job-1', 'name': 'Harian Seruti', 'crawler_type': 'seruti', 'start_date': '2025-11-01',
+            'end_date': '2025-11-30', 'hour': 8, 'minute': 0, 'created_at': '2025-11-01 00:00:00',
+        })
+
+    def titles(self, query, **kwargs):
+        return [r['title'] for r in self.db.search(query, **kwargs)['results']]
+
+    def test_finds_logs_by_file_and_task(self):
+        self.assertEqual(self.titles('susenas 2025'), ['Pencacahan_Susenas_2025-11-01.xlsx'])
+        self.assertEqual(self.titles('progres', kinds=['download_log']), ['Progres_Seruti_2024-03-01.xlsx'])
+        self.assertEqual(self.titles('seruti', kinds=['download_log', 'batch']), ['Progres_Seruti_2024-03-01.xlsx'])
+        self.assertEqual(self.db.search('"(*')['results'], [])  # punctuation only, no FTS syntax error
+
+    def test_job_messages_follow_updates(self):
+        self.db.update_job_status('job-1', 'failed', 'Error: timeout menunggu tombol download')
+        result = self.db.search('timeout tombol')['results']
+        self.assertEqual([(r['kind'], r['ref']) for r in result], [('job', 'job-1')])
+        self.assertIn('[timeout]', result[0]['snippet'])
+
+        self.db.update_job_status('job-1', 'success', 'Download selesai')
+        self.assertEqual(self.db.search('timeout')['results'], [])
+        self.db.delete_job('job-1')
+        self.assertEqual(self.db.search('selesai')['results'], [])
+
+    def test_batch_and_report_notes(self):
+        self.db.add_batch_history('Harian Seruti', '2025-11-01', '2025-11-30', 'xlsx', 10, ['a'],
+                                  '/out/batch.xlsx', note='kolom tanggal kosong di 3 file')
+        self.db.add_report_history('Harian Seruti', 'seruti', '2025-11-01', '2025-11-30', 10,
+                                   '/out/laporan.xlsx', note='laporan bulanan kolom lengkap')
+        self.assertEqual({r['kind'] for r in self.db.search('kolom')['results']}, {'batch', 'report'})
+        self.assertEqual([r['kind'] for r in self.db.search('bulanan')['results']], ['report'])
+
+    def test_ranking_and_paging(self):
+        self.db.add_download_logs_bulk([
+            {'nama_file': f'Harian_{i}.xlsx', 'tanggal_download': '2025-11-02 08:00:00',
+             'laman_web': 'SerutiCrawler', 'task_name': 'Lainnya'} for i in range(5)
+        ])
+        first = self.db.search('harian', limit=4)
+        self.assertTrue(first['has_more'])
+        rest = self.db.search('harian', limit=4, offset=4)
+        self.assertFalse(rest['has_more'])
+        scores = [r['score'] for r in first['results'] + rest['results']]
+        self.assertEqual(len(scores), 8)
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_archived_logs_stay_searchable(self):
+        keep_days = (datetime.now() - datetime(2025, 1, 1)).days  # archive only the 2024 log
+        self.assertEqual(self.db.archive_download_logs(keep_days, os.path.join(self.tmp, 'archive')), {'2024': 1})
+        self.assertEqual(self.titles('progres seruti'), ['Progres_Seruti_2024-03-01.xlsx'])
+        with self.db.get_connection() as conn:
+            conn.execute('DELETE FROM download_logs')
+        self.assertEqual(self.titles('susenas', kinds=['download_log']), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
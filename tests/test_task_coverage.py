@@ -0,0 +1,94 @@
+"""
+Test task_daily_coverage maintenance (insert/delete triggers, backfill) and its range reads
+"""
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+from app.migrations import run_migrations
+from app.migrations.crawler_db import MIGRATIONS
+
+
+class TaskCoverageTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+
+    def test_insert_updates_coverage(self):
+        self.db.add_download_log('a.xlsx', '2025-11-01 09:00:00', 'Seruti', '2025-11-01', 'Harian', file_size=100)
+        self.db.add_download_log('b.xlsx', '2025-11-02 07:00:00', 'Seruti', '2025-11-01', 'Harian',
+                                 artifact='b', file_size=300)
+        self.db.add_download_logs_bulk([
+            {'nama_file': 'c.xlsx', 'tanggal_download': '2025-11-03 08:00:00',
+             'laman_web': 'Seruti', 'data_tanggal': '2025-11-03', 'task_name': 'Harian'},
+        ])
+
+        rows = self.db.get_task_coverage('Harian')
+        self.assertEqual([(r['day'], r['log_count']) for r in rows], [('2025-11-01', 2), ('2025-11-03', 1)])
+        first = rows[0]
+        self.assertEqual((first['first_download'], first['last_download']),
+                         ('2025-11-01 09:00:00', '2025-11-02 07:00:00'))
+        self.assertEqual((first['total_bytes'], first['sized_count'], first['min_bytes'], first['max_bytes']),
+                         (400, 2, 100, 300))
+        self.assertEqual((rows[1]['total_bytes'], rows[1]['sized_count']), (0, 0))
+
+        self.assertEqual(self.db.count_covered_days('Harian', '2025-11-01', '2025-11-02'), 1)
+        self.assertEqual(self.db.count_covered_days('Harian', '2025-11-01', '2025-11-03'), 2)
+        self.assertEqual([r['day'] for r in self.db.get_task_coverage('Harian', '2025-11-02')], ['2025-11-03'])
+
+    def test_file_size_read_from_download_path(self):
+        path = os.path.join(self.tmp, 'sized.xlsx')
+        with open(path, 'wb') as f:
+            f.write(b'x' * 42)
+        self.db.add_download_log(path, '2025-11-01 09:00:00', 'Seruti', '2025-11-01', 'Harian')
+        self.assertEqual(self.db.get_task_coverage('Harian')[0]['total_bytes'], 42)
+
+    def test_delete_recomputes_day(self):
+        first = self.db.add_download_log('a.xlsx', '2025-11-01 09:00:00', 'Seruti', '2025-11-01', 'Harian',
+                                         file_size=100)
+        self.db.add_download_log('b.xlsx', '2025-11-02 07:00:00', 'Seruti', '2025-11-01', 'Harian',
+                                 artifact='b', file_size=300)
+        with self.db.get_connection() as conn:
+            conn.execute('DELETE FROM download_logs WHERE id = ?', (first,))
+        row = self.db.get_task_coverage('Harian')[0]
+        self.assertEqual((row['log_count'], row['first_download'], row['min_bytes']),
+                         (1, '2025-11-02 07:00:00', 300))
+
+        with self.db.get_connection() as conn:
+            conn.execute('DELETE FROM download_logs')
+        self.assertEqual(self.db.get_task_coverage('Harian'), [])
+
+    def test_backfill_existing_logs(self):
+        path = os.path.join(self.tmp, 'legacy.db')
+        conn = sqlite3.connect(path)
+        run_migrations(conn, MIGRATIONS[:5])
+        conn.executemany('''
+            INSERT INTO download_logs (nama_file, tanggal_download, laman_web, data_tanggal, task_name,
+                                       effective_date, download_day)
+            VALUES (?, ?, 'Seruti', ?, 'Harian', ?, date(?))
+        ''', [('a.xlsx', '2025-11-01 09:00:00', '2025-11-01', '2025-11-01', '2025-11-01 09:00:00'),
+              ('b.xlsx', '2025-11-01 10:00:00', '2025-11-01', '2025-11-01', '2025-11-01 10:00:00'),
+              ('c.xlsx', '2025-11-02 10:00:00', None, '2025-11-02', '2025-11-02 10:00:00')])
+        conn.commit()
+        run_migrations(conn, MIGRATIONS)
+        rows = conn.execute('SELECT day, log_count FROM task_daily_coverage ORDER BY day').fetchall()
+        conn.close()
+        self.assertEqual(rows, [('2025-11-01', 2), ('2025-11-02', 1)])
+
+    def test_range_read_uses_primary_key(self):
+        with self.db.get_connection() as conn:
+            plan = ' '.join(row['detail'] for row in conn.execute(
+                'EXPLAIN QUERY PLAN SELECT COUNT(*) FROM task_daily_coverage '
+                'WHERE task_name = ? AND day BETWEEN date(?) AND date(?)', ('Harian', '2025-11-01', '2025-11-30')))
+        self.assertIn('PRIMARY KEY', plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+Test the browser watchdog (session ceilings, deadline-based hung detection, orphan reaping)
+against a fake psutil process table
+"""
+import unittest
+import sys
+import os
+import time
+import types
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.crawlers import watchdog
+from app.crawlers.watchdog import BrowserWatchdog, SESSION_SWITCH
+
+MB = 1024 * 1024
+
+
+class FakeError(Exception):
+    pass
+
+
+class FakeProcess:
+    def __init__(self, table, pid, name, ppid=1, cmdline=(), rss=100 * MB, cpu=1.0, age=3600):
+        self.table = table
+        self.pid = pid
+        self.ppid = ppid
+        self.name = name
+        self._cmdline = list(cmdline)
+        self.rss = rss
+        self.cpu = cpu
+        self.create_time = time.time() - age
+        self.killed = False
+        table[pid] = self
+
+    @property
+    def info(self):
+        return {'pid': self.pid, 'name': self.name, 'ppid': self.ppid,
+                'cmdline': self._cmdline, 'create_time': self.create_time}
+
+    def _check(self):
+        if self.killed:
+            raise FakeError(self.pid)
+
+    def children(self, recursive=False):
+        self._check()
+        direct = [p for p in self.table.values() if p.ppid == self.pid and not p.killed]
+        if not recursive:
+            return direct
+        return direct + [c for p in direct for c in p.children(recursive=True)]
+
+    def cmdline(self):
+        self._check()
+        return self._cmdline
+
+    def memory_info(self):
+        self._check()
+        return types.SimpleNamespace(rss=self.rss)
+
+    def cpu_percent(self, interval=None):
+        self._check()
+        return self.cpu
+
+    def kill(self):
+        self._check()
+        self.killed = True
+
+
+def fake_psutil(table):
+    def process(pid):
+        proc = table.get(pid)
+        if proc is None or proc.killed:
+            raise FakeError(pid)
+        return proc
+
+    return types.SimpleNamespace(
+        Error=FakeError,
+        Process=process,
+        process_iter=lambda attrs=None: [p for p in list(table.values()) if not p.killed],
+        pid_exists=lambda pid: pid in table and not table[pid].killed,
+        wait_procs=lambda procs, timeout=None: ([p for p in procs if p.killed], [p for p in procs if not p.killed]),
+    )
+
+
+class FakeCrawler:
+    def __init__(self, session_id, driver_pid, deadline=None):
+        self.session_id = session_id
+        self.deadline = deadline
+        self.driver = types.SimpleNamespace(service=types.SimpleNamespace(process=types.SimpleNamespace(pid=driver_pid)))
+
+
+class WatchdogTest(unittest.TestCase):
+    def setUp(self):
+        self.table = {}
+        patcher = mock.patch.object(watchdog, 'psutil', fake_psutil(self.table))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.watchdog = BrowserWatchdog(interval=1, reap_interval=1)
+        self.watchdog.start = lambda: None  # no background thread in tests
+        self.watchdog.max_rss_bytes = 1000 * MB
+        self.watchdog.max_cpu_percent = 90
+        self.watchdog.cpu_strikes = 2
+        self.watchdog.hung_grace = 60
+
+    def session(self, n, deadline=None, rss=100 * MB, cpu=1.0):
+        """chromedriver (pid n) -> chrome (n+1) -> renderer (n+2), tracked for a fake crawler"""
+        owner = f'{os.getpid()}-s{n}'
+        FakeProcess(self.table, n, 'chromedriver', ppid=os.getpid())
+        FakeProcess(self.table, n + 1, 'chrome', ppid=n, cmdline=['chrome', SESSION_SWITCH + owner], rss=rss, cpu=cpu)
+        FakeProcess(self.table, n + 2, 'chrome', ppid=n + 1, cmdline=['chrome', '--type=renderer'])
+        crawler = FakeCrawler(f's{n}', n, deadline)
+        self.watchdog.register(crawler)
+        return crawler
+
+    def killed(self):
+        return sorted(pid for pid, p in self.table.items() if p.killed)
+
+    def test_rss_and_cpu_ceilings(self):
+        self.session(100, rss=2000 * MB)
+        self.session(200, cpu=95)
+        self.session(300)
+
+        self.watchdog.check_sessions()
+        self.assertEqual(self.killed(), [100, 101, 102])  # RSS: killed at once
+        self.watchdog.check_sessions()
+        self.assertEqual(self.killed(), [100, 101, 102, 200, 201, 202])  # CPU: after 2 strikes
+        self.assertEqual(self.watchdog.get_stats()['sessions_killed'], 2)
+        self.assertEqual(self.watchdog.get_stats()['active_sessions'], 1)
+
+    def test_hung_is_relative_to_each_crawl_deadline(self):
+        now = time.monotonic()
+        self.session(100, deadline=now + 3600)     # long manual budget: still running
+        self.session(200, deadline=None)           # time_budget=0: never hung
+        self.session(300, deadline=now - 30)       # past deadline, within grace
+        self.session(400, deadline=now - 120)      # past deadline + grace: hung
+        for session in self.watchdog._sessions.values():
+            session['started'] = now - 7200
+
+        self.watchdog.check_sessions()
+        self.assertEqual(self.killed(), [400, 401, 402])
+
+    def test_finished_session_is_untracked(self):
+        crawler = self.session(100)
+        for pid in (100, 101, 102):
+            self.table[pid].killed = True
+        self.watchdog.check_sessions()
+        self.assertEqual(self.watchdog.get_stats()['active_sessions'], 0)
+        self.assertFalse(self.watchdog.kill_session(crawler))
+
+    def test_reap_orphans(self):
+        self.session(100)  # tracked: never reaped
+        dead_owner = 999999
+        # Chrome of a crashed earlier server process (owner pid gone)
+        FakeProcess(self.table, 200, 'chrome', cmdline=['chrome', f'{SESSION_SWITCH}{dead_owner}-old'])
+        FakeProcess(self.table, 201, 'chrome', ppid=200, cmdline=['chrome', '--type=renderer'])
+        # chromedriver whose parent is gone, driving only our browsers
+        FakeProcess(self.table, 300, 'chromedriver', ppid=1)
+        FakeProcess(self.table, 301, 'chrome', ppid=300, cmdline=['chrome', f'{SESSION_SWITCH}{dead_owner}-x'])
+        # User's desktop Chrome and a chromedriver driving it: not ours
+        FakeProcess(self.table, 400, 'chrome', cmdline=['chrome', '--profile-directory=Default'])
+        FakeProcess(self.table, 500, 'chromedriver', ppid=1)
+        FakeProcess(self.table, 501, 'chrome', ppid=500, cmdline=['chrome'])
+        # Too young to be an orphan yet
+        FakeProcess(self.table, 600, 'chrome', cmdline=['chrome', f'{SESSION_SWITCH}{dead_owner}-new'], age=5)
+        # Shared browser (protected)
+        FakeProcess(self.table, 700, 'chromedriver', ppid=os.getpid())
+        FakeProcess(self.table, 701, 'chrome', ppid=700, cmdline=['chrome', f'{SESSION_SWITCH}{os.getpid()}-shared'])
+        self.watchdog.protect(700)
+
+        killed, reclaimed = self.watchdog.reap_orphans()
+        self.assertEqual(self.killed(), [200, 201, 300, 301])
+        self.assertEqual((killed, reclaimed), (4, 4 * 100 * MB))
+        self.assertEqual(self.watchdog.get_stats()['orphans_reaped'], 4)
+
+    def test_disabled_without_psutil(self):
+        with mock.patch.object(watchdog, 'psutil', None):
+            self.assertFalse(self.watchdog.available)
+            self.assertEqual(self.watchdog.reap_orphans(), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Test the write-behind queue (single writer thread, group commit, durable acks, ordering)
+"""
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+
+
+class WriteQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.db = Database(os.path.join(self.tmp, 'crawler.db'))
+        self.addCleanup(self.db.pool.close_all)
+        self.addCleanup(self.db.write_queue.stop)
+        self.db.write_queue.enabled = True
+        self.db.add_job({
+            'id': 'job-1', 'name': 'Harian', 'crawler_type': 'seruti', 'start_date': '2025-11-01',
+            'end_date': '2025-11-30', 'hour': 8, 'minute': 0, 'created_at': '2025-11-01 00:00:00',
+        })
+
+    def count_logs(self):
+        with self.db.get_connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM download_logs').fetchone()[0]
+
+    def test_concurrent_writers_are_group_committed(self):
+        def crawl(worker):
+            for i in range(25):
+                self.db.add_download_log(f'w{worker}_{i}.xlsx', '2025-11-01 08:00:00', 'SerutiCrawler',
+                                         f'2025-11-{i + 1:02d}', f'Task{worker}', artifact=str(worker))
+                self.db.update_job_status('job-1', 'running', f'w{worker} {i}')
+
+        threads = [threading.Thread(target=crawl, args=(w,)) for w in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(self.db.flush_writes(timeout=10))
+
+        self.assertEqual(self.count_logs(), 200)
+        stats = self.db.get_pool_stats()
+        self.assertEqual(stats['busy_errors'], 0)
+        self.assertEqual(stats['write_queue']['failed'], 0)
+        self.assertLess(stats['write_queue']['batches'], stats['write_queue']['submitted'])
+
+    def test_durable_ack_returns_result_and_order_is_kept(self):
+        log_id = self.db.add_download_log('a.xlsx', '2025-11-01 08:00:00', 'SerutiCrawler', '2025-11-01', 'Harian')
+        self.assertEqual(self.db.get_logs_for_task('Harian')[0]['id'], log_id)
+
+        for status in ['running', 'retrying', 'failed', 'success']:
+            self.db.update_job_status('job-1', status, status)
+        self.db.flush_writes()
+        self.assertEqual(self.db.get_job('job-1')['status'], 'success')
+
+        self.db.cancel_job('job-1')  # durable: visible immediately
+        self.assertEqual(self.db.get_job('job-1')['status'], 'cancelled')
+
+    def test_failed_op_does_not_abort_its_batch(self):
+        self.db.write_queue.group_wait = 0.2
+        pending = [self.db.update_job_status('job-1', 'running', 'first')]
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.add_download_log(None, '2025-11-01 08:00:00', 'SerutiCrawler', file_size=0)
+        pending.append(self.db.update_job_status('job-1', 'success', 'second'))
+        for future in pending:
+            future.result(timeout=5)
+        self.assertEqual(self.db.get_job('job-1')['last_message'], 'second')
+        self.assertEqual(self.db.get_pool_stats()['write_queue']['failed'], 1)
+
+    def test_disabled_queue_writes_inline(self):
+        self.db.write_queue.enabled = False
+        self.assertIsNone(self.db.update_job_status('job-1', 'paused'))
+        self.assertEqual(self.db.get_job('job-1')['status'], 'paused')
+        self.assertIsNone(self.db.write_queue._thread)
+
+
+if __name__ == '__main__':
+    unittest.main()